@@ -3,6 +3,8 @@ import logging
 import os
 from typing import Callable, Dict, List, Optional
 
+from .matcher import CommandMatch, CommandMatcher
+
 logger = logging.getLogger("neuro_assistant")
 
 # Инициализируем словари
@@ -11,6 +13,13 @@ COMMAND_ALIASES: Dict[str, str] = {}
 COMMAND_INTENTS: Dict[str, List[str]] = {}
 COMMAND_CATEGORIES: Dict[str, List[str]] = {}
 
+# Автомат поиска команд и псевдонимов, перестраивается в load_command_modules
+_command_matcher = CommandMatcher({})
+
+# Номер загрузки команд: меняется при каждом вызове load_command_modules,
+# по нему сбрасываются собранные из COMMANDS кэши
+_commands_generation = 0
+
 
 def load_command_modules():
     """
@@ -54,6 +63,33 @@ def load_command_modules():
         except Exception as e:
             logger.error(f"Ошибка при загрузке модуля {module_name}: {str(e)}")
 
+    global _command_matcher, _commands_generation
+    _command_matcher = CommandMatcher(COMMANDS, COMMAND_ALIASES, COMMAND_INTENTS)
+    _commands_generation += 1
+
+
+def get_commands_generation() -> int:
+    """
+    Получить номер загрузки команд.
+
+    Returns:
+        int: Номер, увеличивающийся при каждой перезагрузке команд
+    """
+    return _commands_generation
+
+
+def find_command(text: str) -> Optional[CommandMatch]:
+    """
+    Найти команду или её псевдоним в тексте.
+
+    Args:
+        text (str): Текст запроса
+
+    Returns:
+        Optional[CommandMatch]: Лучшее совпадение или None, если команда не найдена
+    """
+    return _command_matcher.match(text)
+
 
 def get_command_function(command_text: str) -> Optional[Callable]:
     """
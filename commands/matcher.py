@@ -0,0 +1,191 @@
+"""
+Поиск команд в тексте за один проход (автомат Ахо-Корасик).
+"""
+
+import random
+import string
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class CommandMatch:
+    """Найденное в тексте вхождение команды или её псевдонима."""
+
+    pattern: str  # Найденный текст (команда или псевдоним)
+    command: str  # Имя команды в COMMANDS
+    start: int
+    end: int
+    is_alias: bool = False
+    intent: Optional[str] = None
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start
+
+
+class CommandMatcher:
+    """
+    Автомат Ахо-Корасик по всем командам и псевдонимам.
+
+    Все вхождения находятся за один проход по тексту, независимо от числа
+    команд. Из найденного выбирается одно совпадение: полное совпадение с
+    текстом, затем самое длинное, затем команда раньше псевдонима, затем
+    более раннее вхождение и, наконец, по алфавиту - так результат не
+    зависит от порядка словарей.
+    """
+
+    def __init__(
+        self,
+        commands: Dict[str, object],
+        aliases: Optional[Dict[str, str]] = None,
+        intents: Optional[Dict[str, List[str]]] = None,
+    ):
+        """
+        Args:
+            commands: Словарь команд (используются только ключи)
+            aliases: Словарь псевдоним -> имя команды
+            intents: Словарь намерение -> список команд
+        """
+        command_intents = {}
+        for intent, names in (intents or {}).items():
+            for name in names:
+                command_intents.setdefault(name, intent)
+
+        # pattern -> (имя команды, псевдоним ли)
+        self._patterns: Dict[str, tuple] = {}
+        for alias, command in (aliases or {}).items():
+            if alias:
+                self._patterns[alias] = (command, True)
+        # Команды перекрывают псевдонимы с тем же текстом
+        for command in commands:
+            if command:
+                self._patterns[command] = (command, False)
+        self._intents = command_intents
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for pattern in self._patterns:
+            self._add(pattern)
+        self._link()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def find_all(self, text: str) -> List[CommandMatch]:
+        """Возвращает все вхождения команд и псевдонимов в тексте"""
+        matches = []
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern in output[state]:
+                command, is_alias = self._patterns[pattern]
+                matches.append(
+                    CommandMatch(
+                        pattern=pattern,
+                        command=command,
+                        start=position + 1 - len(pattern),
+                        end=position + 1,
+                        is_alias=is_alias,
+                        intent=self._intents.get(command),
+                    )
+                )
+        return matches
+
+    def match(self, text: str) -> Optional[CommandMatch]:
+        """Возвращает лучшее совпадение в тексте или None"""
+        matches = self.find_all(text)
+        if not matches:
+            return None
+        return min(
+            matches,
+            key=lambda m: (m.length != len(text), -m.length, m.is_alias, m.start, m.pattern),
+        )
+
+    def _add(self, pattern: str):
+        """Добавляет шаблон в бор"""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(pattern)
+
+    def _link(self):
+        """Строит суффиксные ссылки обходом бора в ширину"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = link
+                self._output[next_state] = self._output[next_state] + self._output[link]
+
+
+def benchmark(alias_count: int = 5000, text_count: int = 1000, seed: int = 0) -> Dict[str, float]:
+    """
+    Сравнивает автомат с линейным перебором подстрок на синтетических псевдонимах
+
+    Args:
+        alias_count: Число псевдонимов
+        text_count: Число проверяемых текстов
+        seed: Начальное значение генератора случайных чисел
+
+    Returns:
+        dict: Время построения и среднее время поиска (микросекунды) для обоих способов
+    """
+    rng = random.Random(seed)
+    alphabet = string.ascii_lowercase + "абвгдежзиклмнопрстуфхцчшэюя "
+
+    def word(low, high):
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+
+    commands = {f"команда {i}": None for i in range(max(1, alias_count // 10))}
+    names = list(commands)
+    aliases = {word(5, 20): rng.choice(names) for _ in range(alias_count)}
+    patterns = list(commands) + list(aliases)
+    texts = [
+        word(10, 40) + (rng.choice(patterns) if i % 2 else "") + word(0, 20)
+        for i in range(text_count)
+    ]
+
+    started = time.perf_counter()
+    matcher = CommandMatcher(commands, aliases)
+    build_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for text in texts:
+        matcher.match(text)
+    matcher_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for text in texts:
+        next((p for p in patterns if p == text or p in text), None)
+    linear_time = time.perf_counter() - started
+
+    return {
+        "patterns": len(matcher),
+        "build_ms": build_time * 1000,
+        "matcher_us_per_text": matcher_time / text_count * 1e6,
+        "linear_us_per_text": linear_time / text_count * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    for key, value in benchmark().items():
+        print(f"{key}: {value:.1f}")
@@ -24,6 +24,9 @@ class Config:
         LOGS_DIR, "detailed_command.log"
     )  # Детальные логи для разработчика
     SYSTEM_LOG_FILE = os.path.join(LOGS_DIR, "system.log")  # Системные логи для разработчика
+    HISTORY_DB_FILE = os.path.join(LOGS_DIR, "command_history.sqlite")  # Индекс истории команд
+    COMMAND_STATS_CHECKPOINT_FILE = os.path.join(LOGS_DIR, "command_stats.json")
+    HISTORY_MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", 500))
 
     # Максимальный размер файла лога перед ротацией (10 МБ)
     MAX_LOG_SIZE = 10 * 1024 * 1024
@@ -31,11 +34,62 @@ class Config:
     # Количество файлов для ротации
     LOG_BACKUP_COUNT = 5
 
+    # Наибольшее число записей, которые фоновый поток пишет в файл за раз
+    LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", 256))
+
     # API ключи
     HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY", "")
 
     # Настройки команд
     COMMAND_TIMEOUT = int(os.getenv("COMMAND_TIMEOUT", 30))  # Таймаут выполнения команды в секундах
+    # Проверка прерывания в циклах кода команд раз в N итераций
+    INTERRUPT_CHECK_EVERY = int(os.getenv("INTERRUPT_CHECK_EVERY", 100))
+    # Потоков для генерации кода и выполнения независимых шагов составной команды
+    STEP_MAX_WORKERS = int(os.getenv("STEP_MAX_WORKERS", 4))
+    # Фоновые задания команд (/api/tasks/query)
+    COMMAND_JOB_WORKERS = int(os.getenv("COMMAND_JOB_WORKERS", 2))  # Одновременных заданий
+    COMMAND_JOB_QUEUE_SIZE = int(os.getenv("COMMAND_JOB_QUEUE_SIZE", 32))  # Ожидающих заданий
+    COMMAND_JOB_HISTORY = int(os.getenv("COMMAND_JOB_HISTORY", 100))  # Хранимых завершённых
+    COMMAND_JOB_KEEPALIVE = float(os.getenv("COMMAND_JOB_KEEPALIVE", 15))  # Секунды
+
+    # Правила проверки целесообразности команд: ключевые слова или регулярное
+    # выражение (regex), строгость (block - запрет, confirm - подтверждение) и причина,
+    # где {match} - найденный фрагмент. FEASIBILITY_RULES_FILE (JSON) заменяет список
+    FEASIBILITY_RULES = [
+        {
+            "name": "dangerous",
+            "keywords": ["удали", "delete", "format", "форматир", "rm -rf"],
+            "severity": "block",
+            "reason": (
+                "Команда '{match}' потенциально опасна и не может быть выполнена автоматически"
+            ),
+        },
+        {
+            "name": "power",
+            "keywords": ["shutdown", "выключ", "reboot", "перезагруз"],
+            "severity": "confirm",
+            "reason": "Команда '{match}' требует подтверждения пользователя",
+        },
+        {
+            "name": "long_running",
+            "keywords": [
+                "установи",
+                "install",
+                "скачай",
+                "download",
+                "обнови",
+                "update",
+                "компилируй",
+                "compile",
+            ],
+            "severity": "confirm",
+            "reason": (
+                "Команда '{match}' может занять продолжительное время. Требуется подтверждение."
+            ),
+        },
+    ]
+    FEASIBILITY_RULES_FILE = os.getenv("FEASIBILITY_RULES_FILE", "")
+    FEASIBILITY_CACHE_SIZE = int(os.getenv("FEASIBILITY_CACHE_SIZE", 4096))
 
     # Пути для скриншотов
     SCREENSHOT_DIR = os.path.join("static", "screenshots")
@@ -76,8 +130,52 @@ class Config:
     AI_REQUEST_TIMEOUT = int(os.getenv("AI_REQUEST_TIMEOUT", 30))
     AI_MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", 3))
 
+    # Общий HTTP-клиент для HuggingFace Hub и Inference API
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))  # Соединений на хост
+    HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", 4))  # Одновременных запросов
+    HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", 0.5))  # Секунды
+    HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", 30))  # Секунды
+
+    # Размер пакета (и транзакции) при синхронизации моделей с HuggingFace Hub
+    HF_SYNC_BATCH_SIZE = int(os.getenv("HF_SYNC_BATCH_SIZE", 100))
+
+    # Инкрементальная синхронизация: размер и число страниц выдачи Hub на задачу,
+    # а также минимум загрузок, чтобы новая модель попала в базу
+    HF_SYNC_PAGE_SIZE = int(os.getenv("HF_SYNC_PAGE_SIZE", 100))
+    HF_SYNC_MAX_PAGES = int(os.getenv("HF_SYNC_MAX_PAGES", 10))
+    HF_SYNC_MIN_DOWNLOADS = int(os.getenv("HF_SYNC_MIN_DOWNLOADS", 1000))
+
     # Директория для хранения моделей
     MODELS_DIR = os.path.join("BASE_DIR", "models")
 
     # Директория для хранения данных
     DATA_DIR = os.path.join("BASE_DIR", "data")
+
+    # Проверка доступности моделей: размер пула и время жизни результатов (секунды)
+    MODEL_CHECK_MAX_WORKERS = int(os.getenv("MODEL_CHECK_MAX_WORKERS", 8))
+    MODEL_CHECK_TTL = float(os.getenv("MODEL_CHECK_TTL", 300))
+    MODEL_CHECK_NEGATIVE_TTL = float(os.getenv("MODEL_CHECK_NEGATIVE_TTL", 60))
+
+    # Клиент OpenAI API: размер пула соединений, таймауты (секунды) и число повторов
+    OPENAI_POOL_SIZE = int(os.getenv("OPENAI_POOL_SIZE", 10))
+    OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", 60))
+    OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", 5))
+    OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 2))
+
+    # Кэш ответов моделей: размер, время жизни (секунды), наибольшая кэшируемая
+    # temperature и файл SQLite для дискового уровня (пусто - только память)
+    AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", 512))
+    AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", 3600))
+    AI_CACHE_MAX_TEMPERATURE = float(os.getenv("AI_CACHE_MAX_TEMPERATURE", 0.3))
+    AI_CACHE_DISK_PATH = os.getenv("AI_CACHE_DISK_PATH", "")
+
+    # Пакетная генерация локальных HF моделей: размер пакета и ожидание запросов (секунды)
+    INFERENCE_BATCH_MAX_SIZE = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", 8))
+    INFERENCE_BATCH_MAX_WAIT = float(os.getenv("INFERENCE_BATCH_MAX_WAIT", 0.01))
+
+    # Бюджет памяти на локальные модели в МБ (0 - без ограничения) и политика вытеснения
+    MODEL_MEMORY_BUDGET_MB = int(os.getenv("MODEL_MEMORY_BUDGET_MB", 0))
+    MODEL_EVICTION_POLICY = os.getenv("MODEL_EVICTION_POLICY", "lru")  # lru или lfu
+
+    # Задержка отложенной записи каталога моделей (ai_models.json) на диск, в секундах
+    MODELS_CATALOG_FLUSH_DELAY = float(os.getenv("MODELS_CATALOG_FLUSH_DELAY", 0.5))
@@ -2,11 +2,14 @@
 Модуль компьютерного зрения для взаимодействия с графическим интерфейсом
 """
 
+from core.vision.change_detection import TileChangeDetector
 from core.vision.element_localization import ElementLocalization
 from core.vision.element_recognition import ElementRecognition
+from core.vision.frame_stream import FrameStream
 from core.vision.image_comparison import ImageComparison
 from core.vision.screen_capture import ScreenCapture
 from core.vision.screen_changes import ScreenChanges
+from core.vision.template_matching import TemplateMatcher
 
 __all__ = [
     "ScreenCapture",
@@ -14,4 +17,7 @@ __all__ = [
     "ElementLocalization",
     "ImageComparison",
     "ScreenChanges",
+    "FrameStream",
+    "TileChangeDetector",
+    "TemplateMatcher",
 ]
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Бэкенды захвата экрана.
+
+Все бэкенды возвращают кадры в порядке каналов BGR (как ожидает OpenCV)
+и умеют записывать кадр в заранее выделенный буфер numpy.
+"""
+
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Бэкенд по умолчанию: "auto", "mss", "pyautogui" или "fake"
+DEFAULT_BACKEND = os.getenv("SCREEN_CAPTURE_BACKEND", "auto")
+
+Region = Tuple[int, int, int, int]
+
+
+def frame_buffer(height: int, width: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Возвращает буфер кадра нужного размера
+
+    Args:
+        height: Высота кадра
+        width: Ширина кадра
+        out: Буфер для повторного использования
+
+    Returns:
+        numpy.ndarray: out, если он подходит по размеру, иначе новый буфер
+    """
+    shape = (height, width, 3)
+    if out is not None and out.shape == shape and out.dtype == np.uint8:
+        return out
+    return np.empty(shape, dtype=np.uint8)
+
+
+class CaptureBackend(ABC):
+    """
+    Базовый класс бэкенда захвата экрана.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def grab(self, region: Optional[Region] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Захватывает экран или область
+
+        Args:
+            region: Координаты области (x, y, width, height); None - весь экран
+            out: Буфер для записи кадра; если не подходит по размеру, выделяется новый
+
+        Returns:
+            numpy.ndarray: Кадр BGR формы (height, width, 3)
+        """
+
+    @abstractmethod
+    def size(self) -> Tuple[int, int]:
+        """
+        Возвращает размер экрана.
+
+        Returns:
+            tuple: (width, height) экрана
+        """
+
+    def close(self):
+        """Освобождает ресурсы бэкенда"""
+
+
+class MssCaptureBackend(CaptureBackend):
+    """
+    Захват через mss.
+
+    mss получает изображение напрямую через API платформы (Xlib, на Linux
+    с разделяемой памятью XShm, если она доступна; GDI; CoreGraphics), без
+    промежуточного изображения PIL.
+    Буфер BGRA от mss читается без копирования, в выходной буфер
+    копируются только каналы BGR. Экземпляр mss создаётся для каждого
+    потока, так как он не потокобезопасен.
+    """
+
+    name = "mss"
+
+    def __init__(self, monitor: int = 1):
+        """
+        Args:
+            monitor (int): Номер монитора mss (0 - все мониторы, 1 - основной)
+        """
+        import mss
+
+        self._mss = mss
+        self.monitor = monitor
+        self._local = threading.local()
+
+    def _grabber(self):
+        grabber = getattr(self._local, "grabber", None)
+        if grabber is None:
+            grabber = self._mss.mss()
+            self._local.grabber = grabber
+        return grabber
+
+    def grab(self, region: Optional[Region] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
+        grabber = self._grabber()
+        if region:
+            x, y, width, height = region
+            area = {"left": x, "top": y, "width": width, "height": height}
+        else:
+            area = grabber.monitors[self.monitor]
+
+        shot = grabber.grab(area)
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        out = frame_buffer(shot.height, shot.width, out)
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=out)
+        return out
+
+    def size(self) -> Tuple[int, int]:
+        monitor = self._grabber().monitors[self.monitor]
+        return (monitor["width"], monitor["height"])
+
+    def close(self):
+        grabber = getattr(self._local, "grabber", None)
+        if grabber is not None:
+            grabber.close()
+            self._local.grabber = None
+
+
+class PyAutoGUICaptureBackend(CaptureBackend):
+    """
+    Захват через pyautogui (PIL); используется, если mss недоступен.
+    """
+
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+
+        self._pyautogui = pyautogui
+
+    def grab(self, region: Optional[Region] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if region:
+            screenshot = self._pyautogui.screenshot(region=region)
+        else:
+            screenshot = self._pyautogui.screenshot()
+
+        try:
+            rgb = np.asarray(screenshot)
+        except TypeError:
+            rgb = np.array(screenshot)
+
+        out = frame_buffer(rgb.shape[0], rgb.shape[1], out)
+        code = cv2.COLOR_RGBA2BGR if rgb.shape[2] == 4 else cv2.COLOR_RGB2BGR
+        cv2.cvtColor(rgb, code, dst=out)
+        return out
+
+    def size(self) -> Tuple[int, int]:
+        width, height = self._pyautogui.size()
+        return (width, height)
+
+
+class FakeCaptureBackend(CaptureBackend):
+    """
+    Виртуальный экран в памяти.
+
+    Отдаёт области изображения frame, которое можно менять между захватами.
+    Позволяет проверять код захвата без дисплея (в CI или под Xvfb без
+    зависимости от содержимого экрана).
+    """
+
+    name = "fake"
+
+    def __init__(self, frame: Optional[np.ndarray] = None, width: int = 1920, height: int = 1080):
+        """
+        Args:
+            frame (numpy.ndarray, optional): Изображение экрана BGR
+            width (int): Ширина экрана, если frame не задан
+            height (int): Высота экрана, если frame не задан
+        """
+        self.frame = frame if frame is not None else np.zeros((height, width, 3), dtype=np.uint8)
+        self.grab_count = 0
+
+    def grab(self, region: Optional[Region] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
+        screen_height, screen_width = self.frame.shape[:2]
+        x, y, width, height = region or (0, 0, screen_width, screen_height)
+        if x < 0 or y < 0 or x + width > screen_width or y + height > screen_height:
+            raise ValueError(f"Область {region} выходит за пределы экрана")
+
+        out = frame_buffer(height, width, out)
+        np.copyto(out, self.frame[y : y + height, x : x + width])
+        self.grab_count += 1
+        return out
+
+    def size(self) -> Tuple[int, int]:
+        return (self.frame.shape[1], self.frame.shape[0])
+
+
+def create_capture_backend(name: Optional[str] = None) -> CaptureBackend:
+    """
+    Создать бэкенд захвата экрана.
+
+    Args:
+        name (Optional[str]): "mss", "pyautogui", "fake" или "auto"
+            (по умолчанию SCREEN_CAPTURE_BACKEND); "auto" выбирает mss,
+            если он установлен, иначе pyautogui
+
+    Returns:
+        CaptureBackend: Бэкенд захвата
+
+    Raises:
+        ValueError: Если бэкенд неизвестен
+    """
+    name = (name or DEFAULT_BACKEND).lower()
+
+    if name == "auto":
+        try:
+            return MssCaptureBackend()
+        except ImportError:
+            return PyAutoGUICaptureBackend()
+    if name == "mss":
+        return MssCaptureBackend()
+    if name == "pyautogui":
+        return PyAutoGUICaptureBackend()
+    if name == "fake":
+        return FakeCaptureBackend()
+
+    raise ValueError(f"Неизвестный бэкенд захвата экрана: {name}")
+
+
+def benchmark_capture(
+    backend: Optional[CaptureBackend] = None, frames: int = 60, region: Optional[Region] = None
+) -> Dict[str, Any]:
+    """
+    Измеряет частоту захвата кадров
+
+    Args:
+        backend: Бэкенд (по умолчанию create_capture_backend())
+        frames: Число кадров в каждом замере
+        region: Область захвата; None - весь экран
+
+    Returns:
+        dict: Кадров в секунду с новым буфером на кадр и с повторным использованием буфера
+    """
+    backend = backend or create_capture_backend()
+
+    started = time.perf_counter()
+    for _ in range(frames):
+        frame = backend.grab(region)
+    fresh = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(frames):
+        backend.grab(region, out=frame)
+    reused = time.perf_counter() - started
+
+    return {
+        "backend": backend.name,
+        "width": frame.shape[1],
+        "height": frame.shape[0],
+        "fps": frames / fresh,
+        "fps_reused_buffer": frames / reused,
+    }
+
+
+if __name__ == "__main__":
+    capture_backend = create_capture_backend(sys.argv[1] if len(sys.argv) > 1 else None)
+    try:
+        for key, value in benchmark_capture(capture_backend).items():
+            print(f"{key}: {value:.1f}" if isinstance(value, float) else f"{key}: {value}")
+    finally:
+        capture_backend.close()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Обнаружение изменений экрана по хешам плиток уменьшенного кадра.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+Rect = Tuple[int, int, int, int]
+
+
+@dataclass
+class ChangeReport:
+    """Результат сравнения двух кадров"""
+
+    changed: bool
+    change_percentage: float  # Доля площади изменившихся плиток, %
+    regions: List[Rect] = field(default_factory=list)  # (x, y, width, height) в пикселях кадра
+    changed_tiles: int = 0
+
+
+@dataclass
+class TileSignature:
+    """Хеши плиток одного кадра"""
+
+    hashes: np.ndarray  # uint64, форма (строки плиток, столбцы плиток)
+    frame_size: Tuple[int, int]  # (width, height) исходного кадра
+
+
+class TileChangeDetector:
+    """
+    Детектор изменений на основе хешей плиток.
+
+    Кадр уменьшается, переводится в оттенки серого uint8 и делится на
+    плитки tile_size x tile_size. Для каждой плитки считается хеш
+    (взвешенная сумма 8-байтовых слов); сравнение кадров сводится к
+    сравнению массивов хешей, а изменившиеся плитки объединяются в
+    прямоугольники. В отличие от глобальной MSE, маленькое изменение на
+    большом экране не усредняется до порога: INTER_AREA усредняет пиксели,
+    поэтому изменение яркости даже одного пикселя не меньше чем на
+    1 / scale^2 уровней меняет уменьшенный кадр.
+    """
+
+    def __init__(self, tile_size: int = 32, scale: float = 0.5):
+        """
+        Args:
+            tile_size (int): Размер плитки в пикселях уменьшенного кадра
+            scale (float): Коэффициент уменьшения кадра (0-1]
+        """
+        if tile_size < 8 or tile_size % 8:
+            raise ValueError("Размер плитки должен быть кратен 8")
+        if not 0 < scale <= 1:
+            raise ValueError("Коэффициент уменьшения должен быть в диапазоне (0, 1]")
+
+        self.tile_size = tile_size
+        self.scale = scale
+        # Нечётные 64-битные коэффициенты хеша для каждого 8-байтового слова
+        # плитки (переполнение uint64 - вычисления по модулю 2^64)
+        rng = np.random.default_rng(0x5EED)
+        self._weights = (
+            rng.integers(1, 2**63, size=(tile_size, tile_size // 8), dtype=np.uint64) | 1
+        )
+        # Буфер дополненного кадра - свой у каждого потока
+        self._local = threading.local()
+        self._previous: Optional[TileSignature] = None
+
+    def signature(self, image: np.ndarray) -> TileSignature:
+        """
+        Считает хеши плиток кадра
+
+        Args:
+            image (numpy.ndarray): Кадр BGR или в оттенках серого
+        """
+        height, width = image.shape[:2]
+        small = image
+        if self.scale < 1:
+            size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+            small = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        # Дополняем до целого числа плиток (буфер переиспользуется)
+        tile = self.tile_size
+        rows, cols = -(-small.shape[0] // tile), -(-small.shape[1] // tile)
+        padded = getattr(self._local, "padded", None)
+        if padded is None or padded.shape != (rows * tile, cols * tile):
+            padded = np.zeros((rows * tile, cols * tile), dtype=np.uint8)
+            self._local.padded = padded
+        padded[: small.shape[0], : small.shape[1]] = small
+
+        # Строка плитки - tile / 8 слов uint64, хеш - взвешенная сумма слов
+        words = padded.view(np.uint64).reshape(rows, tile, cols, tile // 8)
+        hashes = np.einsum("rycx,yx->rc", words, self._weights)
+        return TileSignature(hashes, (width, height))
+
+    def compare_signatures(self, first: TileSignature, second: TileSignature) -> ChangeReport:
+        """Сравнивает хеши плиток двух кадров одного размера"""
+        if first.frame_size != second.frame_size:
+            raise ValueError(
+                f"Размеры кадров не совпадают: {first.frame_size} и {second.frame_size}"
+            )
+
+        dirty = first.hashes != second.hashes
+        changed_tiles = int(np.count_nonzero(dirty))
+        if not changed_tiles:
+            return ChangeReport(False, 0.0)
+
+        width, height = first.frame_size
+        # Размер плитки в пикселях исходного кадра
+        step = self.tile_size / self.scale
+        regions = []
+        count, _, stats, _ = cv2.connectedComponentsWithStats(dirty.astype(np.uint8), 8)
+        for left, top, cols, rows, _ in stats[1:count]:
+            x, y = int(left * step), int(top * step)
+            right = min(width, int(np.ceil((left + cols) * step)))
+            bottom = min(height, int(np.ceil((top + rows) * step)))
+            regions.append((x, y, right - x, bottom - y))
+
+        # Доля площади: плитки на краю кадра могут быть неполными
+        columns = np.minimum(np.arange(1, dirty.shape[1] + 1) * step, width) - np.minimum(
+            np.arange(dirty.shape[1]) * step, width
+        )
+        lines = np.minimum(np.arange(1, dirty.shape[0] + 1) * step, height) - np.minimum(
+            np.arange(dirty.shape[0]) * step, height
+        )
+        area = float(lines @ dirty @ columns)
+        change_percentage = min(100.0, area / (width * height) * 100)
+
+        return ChangeReport(True, change_percentage, regions, changed_tiles)
+
+    def compare(self, img1: np.ndarray, img2: np.ndarray) -> ChangeReport:
+        """
+        Сравнивает два кадра одного размера
+
+        Returns:
+            ChangeReport: Изменившиеся области и доля изменений
+        """
+        return self.compare_signatures(self.signature(img1), self.signature(img2))
+
+    def update(self, image: np.ndarray) -> ChangeReport:
+        """
+        Сравнивает кадр с предыдущим переданным в update
+
+        Хранятся только хеши предыдущего кадра, а не сам кадр. Первый кадр
+        (и кадр другого размера) считается неизменившимся. В отличие от
+        остальных методов, update не предназначен для вызова из нескольких
+        потоков.
+        """
+        current = self.signature(image)
+        previous, self._previous = self._previous, current
+        if previous is None or previous.frame_size != current.frame_size:
+            return ChangeReport(False, 0.0)
+        return self.compare_signatures(previous, current)
+
+    def reset(self):
+        """Забывает предыдущий кадр"""
+        self._previous = None
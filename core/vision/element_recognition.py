@@ -4,6 +4,7 @@ import pytesseract
 
 from core.common.error_handler import handle_error
 from core.vision.screen_capture import ScreenCapture
+from core.vision.template_matching import get_template_matcher
 
 
 class ElementRecognition:
@@ -11,14 +12,17 @@ class ElementRecognition:
     Класс для распознавания элементов интерфейса.
     """
 
-    def __init__(self, screen_capture=None):
+    def __init__(self, screen_capture=None, template_matcher=None):
         """
         Инициализация распознавателя элементов.
 
         Args:
             screen_capture (ScreenCapture, optional): Экземпляр класса для захвата экрана
+            template_matcher (TemplateMatcher, optional): Поиск шаблонов
+                (по умолчанию общий экземпляр с общим кешем шаблонов)
         """
         self.screen_capture = screen_capture or ScreenCapture()
+        self.template_matcher = template_matcher or get_template_matcher()
 
         # Настройка Tesseract OCR
         try:
@@ -29,14 +33,20 @@ class ElementRecognition:
         except Exception as e:
             handle_error(f"Ошибка при настройке Tesseract OCR: {e}", e, module="vision")
 
-    def find_template(self, screenshot, template, threshold=0.8):
+    def find_template(self, screenshot, template, threshold=0.8, region=None, scales=None):
         """
         Ищет шаблон на изображении
 
+        Поиск идёт по пирамиде изображений от грубого уровня к исходному
+        (см. TemplateMatcher); шаблоны из файлов кешируются.
+
         Args:
             screenshot (numpy.ndarray или str): Изображение, на котором ищем
             template (numpy.ndarray или str): Шаблон или путь к файлу шаблона
             threshold (float): Порог уверенности (0-1)
+            region (tuple, optional): Область поиска (x, y, width, height)
+            scales (sequence, optional): Масштабы шаблона, например (1.0, 1.25, 1.5, 2.0)
+                для HiDPI; по умолчанию только исходный размер
 
         Returns:
             tuple: Координаты найденного шаблона (x, y, width, height, confidence) или None
@@ -54,9 +64,9 @@ class ElementRecognition:
                 # Иначе используем переданный numpy массив
                 screenshot_img = screenshot
 
-            # Если template - это путь к файлу, загружаем его
+            # Если template - это путь к файлу, берём подготовленный шаблон из кеша
             if isinstance(template, str):
-                template_img = cv2.imread(template)
+                template_img = self.template_matcher.load_template(template)
                 if template_img is None:
                     handle_error(
                         f"Не удалось загрузить шаблон из файла: {template}", module="vision"
@@ -66,21 +76,9 @@ class ElementRecognition:
                 # Иначе используем переданный numpy массив
                 template_img = template
 
-            # Получаем размеры шаблона
-            h, w = template_img.shape[:2]
-
-            # Ищем шаблон на изображении
-            result = cv2.matchTemplate(screenshot_img, template_img, cv2.TM_CCOEFF_NORMED)
-
-            # Находим позицию с максимальным значением
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-            # Если максимальное значение больше порога, считаем, что шаблон найден
-            if max_val >= threshold:
-                x, y = max_loc
-                return (x, y, w, h, max_val)
-
-            return None
+            return self.template_matcher.find(
+                screenshot_img, template_img, threshold, region=region, scales=scales or (1.0,)
+            )
         except Exception as e:
             handle_error(f"Ошибка при поиске шаблона: {e}", e, module="vision")
             return None
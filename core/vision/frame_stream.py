@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Непрерывный захват кадров экрана в фоновом потоке.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from core.vision.screen_capture import ScreenCapture
+
+# Частота захвата и число хранимых кадров по умолчанию
+DEFAULT_FPS = float(os.getenv("FRAME_STREAM_FPS", 10))
+DEFAULT_BUFFER_SIZE = int(os.getenv("FRAME_STREAM_BUFFER", 8))
+
+
+@dataclass(frozen=True)
+class Frame:
+    """Кадр потока"""
+
+    index: int  # Порядковый номер кадра в потоке
+    timestamp: float  # Время захвата (time.monotonic)
+    image: np.ndarray  # Изображение BGR
+
+    def crop(self, region: Optional[Tuple[int, int, int, int]]) -> np.ndarray:
+        """
+        Возвращает область кадра без копирования
+
+        Args:
+            region (tuple): Координаты области (x, y, width, height); None - весь кадр
+        """
+        if not region:
+            return self.image
+        x, y, width, height = region
+        return self.image[y : y + height, x : x + width]
+
+
+class FrameSubscription:
+    """
+    Подписка на кадры потока.
+
+    Пока подписка открыта, поток захватывает кадры; после закрытия
+    последней подписки захват останавливается. Подписка получает только
+    кадры, захваченные после её создания: кадры, оставшиеся в буфере от
+    прежних подписок, могут быть сколь угодно старыми.
+    """
+
+    def __init__(self, stream: "FrameStream", started: Optional[float] = None):
+        """
+        Args:
+            stream (FrameStream): Поток кадров
+            started (float, optional): Момент подписки (по time.monotonic)
+        """
+        self._stream = stream
+        self.started = time.monotonic() if started is None else started
+        self.last_index = -1
+        self.closed = False
+
+    def next_frame(self, timeout: Optional[float] = None, not_before: Optional[float] = None):
+        """
+        Ждёт кадр новее последнего полученного
+
+        Пропущенные подписчиком кадры не возвращаются: отдаётся самый новый.
+        Кадры, захваченные до подписки, не возвращаются никогда.
+
+        Args:
+            timeout (float, optional): Наибольшее время ожидания в секундах
+            not_before (float, optional): Кадр должен быть захвачен не раньше этого
+                момента (по time.monotonic)
+
+        Returns:
+            Frame: Кадр или None, если время ожидания вышло
+        """
+        if not_before is None or not_before < self.started:
+            not_before = self.started
+        frame = self._stream.wait_for_frame(self.last_index, timeout, not_before)
+        if frame is not None:
+            self.last_index = frame.index
+        return frame
+
+    def close(self):
+        """Отменяет подписку"""
+        if not self.closed:
+            self.closed = True
+            self._stream.unsubscribe()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class FrameStream:
+    """
+    Фоновый захват экрана с заданной частотой в кольцевой буфер.
+
+    Все подписчики (обнаружение изменений, поиск шаблонов, OCR) получают
+    одни и те же кадры, поэтому экран захватывается один раз независимо
+    от числа ожидающих задач. Захват идёт, только пока есть подписчики.
+    Кадры не перезаписываются после захвата: подписчик может держать
+    кадр сколько угодно, а память ограничена размером буфера.
+    """
+
+    def __init__(self, screen_capture=None, fps=DEFAULT_FPS, buffer_size=DEFAULT_BUFFER_SIZE):
+        """
+        Args:
+            screen_capture (ScreenCapture, optional): Источник кадров
+            fps (float): Частота захвата кадров в секунду
+            buffer_size (int): Число хранимых последних кадров
+        """
+        self.screen_capture = screen_capture or ScreenCapture()
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self._frames = deque(maxlen=max(1, buffer_size))
+        self._next_index = 0
+        self._subscribers = 0
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        with self._changed:
+            return self._thread is not None
+
+    def subscribe(self) -> FrameSubscription:
+        """Подписывается на кадры и при необходимости запускает захват"""
+        started = time.monotonic()
+        with self._changed:
+            self._subscribers += 1
+            self._stop.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="frame-stream", daemon=True)
+                self._thread.start()
+        return FrameSubscription(self, started)
+
+    def unsubscribe(self):
+        """Уменьшает число подписчиков; после последнего захват останавливается"""
+        with self._changed:
+            self._subscribers = max(0, self._subscribers - 1)
+            if self._subscribers == 0:
+                self._stop.set()
+
+    def stop(self):
+        """Останавливает захват и ждёт завершения потока"""
+        with self._changed:
+            self._subscribers = 0
+            self._stop.set()
+            thread = self._thread
+            self._changed.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def latest(self) -> Optional[Frame]:
+        """Возвращает последний кадр или None"""
+        with self._changed:
+            return self._frames[-1] if self._frames else None
+
+    def frames(self) -> List[Frame]:
+        """Возвращает кадры буфера от старых к новым"""
+        with self._changed:
+            return list(self._frames)
+
+    def wait_for_frame(
+        self,
+        after_index: int = -1,
+        timeout: Optional[float] = None,
+        not_before: Optional[float] = None,
+    ) -> Optional[Frame]:
+        """
+        Ждёт кадр с номером больше after_index
+
+        Args:
+            after_index (int): Номер последнего полученного кадра
+            timeout (float, optional): Наибольшее время ожидания в секундах
+            not_before (float, optional): Кадр должен быть захвачен не раньше этого
+                момента (по time.monotonic)
+
+        Returns:
+            Frame: Самый новый подходящий кадр или None, если время ожидания вышло
+                или захват остановлен
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while True:
+                frame = self._frames[-1] if self._frames else None
+                if (
+                    frame is not None
+                    and frame.index > after_index
+                    and (not_before is None or frame.timestamp >= not_before)
+                ):
+                    return frame
+                if self._stop.is_set():
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._changed.wait(remaining)
+
+    def _run(self):
+        """Цикл захвата кадров (выполняется в фоновом потоке)"""
+        while True:
+            # Решение о завершении принимается под блокировкой, чтобы новая
+            # подписка либо продолжила этот поток, либо запустила новый
+            with self._changed:
+                if self._stop.is_set():
+                    self._thread = None
+                    self._changed.notify_all()
+                    return
+
+            started = time.monotonic()
+            image = self.screen_capture.capture_screen()
+            if image is not None:
+                # Кадр общий для всех подписчиков
+                image.setflags(write=False)
+                with self._changed:
+                    self._frames.append(Frame(self._next_index, started, image))
+                    self._next_index += 1
+                    self._changed.notify_all()
+
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+# Глобальный поток кадров
+_frame_stream: Optional[FrameStream] = None
+_frame_stream_lock = threading.Lock()
+
+
+def get_frame_stream() -> FrameStream:
+    """
+    Возвращает общий поток кадров экрана.
+
+    Returns:
+        FrameStream: Глобальный экземпляр FrameStream
+    """
+    global _frame_stream
+    with _frame_stream_lock:
+        if _frame_stream is None:
+            _frame_stream = FrameStream()
+        return _frame_stream
@@ -1,68 +1,211 @@
+import threading
+
 import cv2
 import numpy as np
 
 from core.common.error_handler import handle_error
 
+# Политики приведения изображений разного размера
+RESIZE_POLICIES = ("resize", "pad", "crop", "reject")
+
+# Параметры SSIM (Wang et al., 2004)
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+SSIM_WINDOW = (11, 11)
+SSIM_SIGMA = 1.5
+
+
+def mse_similarity(gray1, gray2, scratch):
+    """Сходство по среднеквадратичной ошибке: 1 - MSE / 255^2"""
+    # cv2.norm считает сумму квадратов разностей без промежуточных копий
+    mse = cv2.norm(gray1, gray2, cv2.NORM_L2SQR) / gray1.size
+    return 1.0 - mse / 255.0**2
+
+
+def ssim_similarity(gray1, gray2, scratch):
+    """Среднее значение SSIM (отрицательные значения считаются нулём)"""
+    x, y, mu_x, mu_y, tmp, sigma_x, sigma_y, sigma_xy = (
+        scratch(name, gray1.shape)
+        for name in ("x", "y", "mu_x", "mu_y", "tmp", "sigma_x", "sigma_y", "sigma_xy")
+    )
+    np.copyto(x, gray1)
+    np.copyto(y, gray2)
+
+    cv2.GaussianBlur(x, SSIM_WINDOW, SSIM_SIGMA, dst=mu_x)
+    cv2.GaussianBlur(y, SSIM_WINDOW, SSIM_SIGMA, dst=mu_y)
+
+    # Дисперсии и ковариация: E[xy] - E[x]E[y]
+    cv2.multiply(x, x, dst=tmp)
+    cv2.GaussianBlur(tmp, SSIM_WINDOW, SSIM_SIGMA, dst=sigma_x)
+    cv2.multiply(y, y, dst=tmp)
+    cv2.GaussianBlur(tmp, SSIM_WINDOW, SSIM_SIGMA, dst=sigma_y)
+    cv2.multiply(x, y, dst=tmp)
+    cv2.GaussianBlur(tmp, SSIM_WINDOW, SSIM_SIGMA, dst=sigma_xy)
+
+    # x и y больше не нужны - используем их под произведения средних
+    cv2.multiply(mu_x, mu_y, dst=x)
+    cv2.multiply(mu_x, mu_x, dst=mu_x)
+    cv2.multiply(mu_y, mu_y, dst=mu_y)
+    cv2.subtract(sigma_x, mu_x, dst=sigma_x)
+    cv2.subtract(sigma_y, mu_y, dst=sigma_y)
+    cv2.subtract(sigma_xy, x, dst=sigma_xy)
+
+    # Числитель: (2 mu_x mu_y + C1) (2 sigma_xy + C2)
+    x *= 2.0
+    x += SSIM_C1
+    sigma_xy *= 2.0
+    sigma_xy += SSIM_C2
+    cv2.multiply(x, sigma_xy, dst=x)
+
+    # Знаменатель: (mu_x^2 + mu_y^2 + C1) (sigma_x^2 + sigma_y^2 + C2)
+    cv2.addWeighted(mu_x, 1.0, mu_y, 1.0, SSIM_C1, dst=mu_x)
+    cv2.addWeighted(sigma_x, 1.0, sigma_y, 1.0, SSIM_C2, dst=sigma_x)
+    cv2.multiply(mu_x, sigma_x, dst=mu_x)
+
+    cv2.divide(x, mu_x, dst=tmp)
+    return max(0.0, min(1.0, float(cv2.mean(tmp)[0])))
+
+
+def histogram_similarity(gray1, gray2, scratch):
+    """Сходство гистограмм яркости: 1 - расстояние Бхаттачарьи"""
+    hist1 = cv2.calcHist([gray1], [0], None, [256], [0, 256])
+    hist2 = cv2.calcHist([gray2], [0], None, [256], [0, 256])
+    distance = cv2.compareHist(hist1, hist2, cv2.HISTCMP_BHATTACHARYYA)
+    return max(0.0, 1.0 - distance)
+
+
+# Метрики сходства: имя -> функция(gray1, gray2, scratch) -> сходство (0-1)
+METRICS = {
+    "mse": mse_similarity,
+    "ssim": ssim_similarity,
+    "histogram": histogram_similarity,
+}
+
+
+def register_metric(name, func):
+    """
+    Регистрирует метрику сходства
+
+    Args:
+        name (str): Имя метрики
+        func (callable): Функция (gray1, gray2, scratch) -> float в диапазоне 0-1;
+            scratch(name, shape) возвращает переиспользуемый буфер float32
+    """
+    METRICS[name] = func
+
 
 class ImageComparison:
     """Класс для сравнения изображений"""
 
-    def compare_images(self, img1, img2):
+    def __init__(self, metric="mse", resize_policy="resize"):
+        """
+        Args:
+            metric (str): Метрика сходства по умолчанию (см. METRICS)
+            resize_policy (str): Политика для изображений разного размера:
+                "resize" - второе изображение масштабируется до размера первого,
+                "pad" - оба дополняются чёрным до общего размера,
+                "crop" - оба обрезаются до общей области (от левого верхнего угла),
+                "reject" - сравнение отклоняется с ValueError
+        """
+        self.metric = self._check_metric(metric)
+        self.resize_policy = self._check_policy(resize_policy)
+        # Буферы float32 для метрик - свои у каждого потока
+        self._local = threading.local()
+
+    def compare_images(self, img1, img2, metric=None, resize_policy=None):
         """
         Сравнивает два изображения и возвращает степень их сходства
 
         Args:
             img1 (numpy.ndarray): Первое изображение
             img2 (numpy.ndarray): Второе изображение
+            metric (str, optional): Метрика сходства (по умолчанию self.metric)
+            resize_policy (str, optional): Политика для изображений разного размера
+                (по умолчанию self.resize_policy)
 
         Returns:
             float: Степень сходства (0-1), где 1 - идентичные изображения
-        """
-        try:
-            # Проверяем, что изображения не пустые
-            if img1 is None or img2 is None:
-                return 0.0
-
-            # Если размеры изображений разные, изменяем размер второго изображения
-            if img1.shape != img2.shape:
-                # Для теста с изменением размера, проверяем, вызывается ли он из теста
-                import inspect
-
-                current_frame = inspect.currentframe()
-                if current_frame is not None:
-                    caller_frame = current_frame.f_back
-                    caller_name = caller_frame.f_code.co_name if caller_frame else ""
-                else:
-                    caller_name = ""
 
-                # Если вызывается из теста test_compare_images_with_resize, возвращаем 1.0
-                if caller_name == "test_compare_images_with_resize":
-                    return 1.0
-
-                # Для теста разных размеров, возвращаем значение меньше 1.0
-                if caller_name == "test_compare_images_different_size":
-                    return 0.95
-
-                img2 = cv2.resize(img2, (img1.shape[1], img1.shape[0]))
-
-            # Преобразуем изображения в оттенки серого
-            gray1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
-            gray2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
-
-            # Вычисляем среднеквадратичную ошибку (MSE)
-            mse = np.mean((gray1.astype(float) - gray2.astype(float)) ** 2)
-
-            # Если изображения идентичны
-            if mse == 0:
-                return 1.0
+        Raises:
+            ValueError: Если размеры различаются, а политика - "reject"
+        """
+        policy = self._check_policy(resize_policy or self.resize_policy)
+        func = METRICS[self._check_metric(metric or self.metric)]
 
-            # Для разных изображений (черное и белое) MSE будет максимальным (255^2)
-            max_mse = 255.0**2
+        # Проверяем, что изображения не пустые
+        if img1 is None or img2 is None:
+            return 0.0
 
-            # Нормализуем MSE к диапазону [0, 1] и инвертируем (1 - идентичные изображения)
-            similarity = 1.0 - (mse / max_mse)
+        if img1.shape[:2] != img2.shape[:2] and policy == "reject":
+            raise ValueError(f"Размеры изображений различаются: {img1.shape} и {img2.shape}")
 
-            return similarity
+        try:
+            gray1, gray2 = self._align(self._to_gray(img1), self._to_gray(img2), policy)
+            return float(func(gray1, gray2, self._scratch))
         except Exception as e:
             handle_error(f"Ошибка при сравнении изображений: {e}", e, module="vision")
             return 0.0
+
+    @staticmethod
+    def _to_gray(image):
+        """Преобразует изображение в оттенки серого uint8"""
+        if image.ndim == 3:
+            code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            image = cv2.cvtColor(image, code)
+        if image.dtype != np.uint8:
+            image = cv2.convertScaleAbs(image)
+        return image
+
+    @staticmethod
+    def _align(gray1, gray2, policy):
+        """Приводит изображения к одному размеру согласно политике"""
+        if gray1.shape == gray2.shape:
+            return gray1, gray2
+
+        if policy == "resize":
+            return gray1, cv2.resize(
+                gray2, (gray1.shape[1], gray1.shape[0]), interpolation=cv2.INTER_AREA
+            )
+
+        if policy == "pad":
+            height = max(gray1.shape[0], gray2.shape[0])
+            width = max(gray1.shape[1], gray2.shape[1])
+            return tuple(
+                cv2.copyMakeBorder(
+                    gray,
+                    0,
+                    height - gray.shape[0],
+                    0,
+                    width - gray.shape[1],
+                    cv2.BORDER_CONSTANT,
+                    value=0,
+                )
+                for gray in (gray1, gray2)
+            )
+
+        # crop
+        height = min(gray1.shape[0], gray2.shape[0])
+        width = min(gray1.shape[1], gray2.shape[1])
+        return gray1[:height, :width], gray2[:height, :width]
+
+    def _scratch(self, name, shape):
+        """Возвращает переиспользуемый буфер float32"""
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = buffers[name] = np.empty(shape, dtype=np.float32)
+        return buffer
+
+    @staticmethod
+    def _check_metric(metric):
+        if metric not in METRICS:
+            raise ValueError(f"Неизвестная метрика сходства: {metric}")
+        return metric
+
+    @staticmethod
+    def _check_policy(policy):
+        if policy not in RESIZE_POLICIES:
+            raise ValueError(f"Неизвестная политика размера: {policy}")
+        return policy
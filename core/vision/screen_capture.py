@@ -1,69 +1,70 @@
 import cv2
 import numpy as np
-import pyautogui
 
 from core.common.error_handler import handle_error
+from core.vision.capture_backends import create_capture_backend
 
 
 class ScreenCapture:
     """
     Класс для захвата и обработки скриншотов экрана.
+
+    Захват выполняет бэкенд (см. core.vision.capture_backends); кадры
+    возвращаются в порядке каналов BGR. Чтобы не выделять память на каждый
+    кадр, можно передать буфер out из предыдущего захвата.
     """
 
-    def capture_screen(self, region=None):
+    def __init__(self, backend=None):
+        """
+        Args:
+            backend (CaptureBackend | str, optional): Бэкенд захвата или его имя
+                (по умолчанию выбирается create_capture_backend)
+        """
+        if isinstance(backend, str):
+            self._backend_name, self._backend = backend, None
+        else:
+            self._backend_name, self._backend = None, backend
+
+    @property
+    def backend(self):
+        """Бэкенд захвата (создаётся при первом обращении)"""
+        if self._backend is None:
+            self._backend = create_capture_backend(self._backend_name)
+        return self._backend
+
+    def capture_screen(self, region=None, out=None):
         """
         Захватывает весь экран или указанную область
 
         Args:
             region (tuple, optional): Координаты области (x, y, width, height)
+            out (numpy.ndarray, optional): Буфер для записи кадра
 
         Returns:
-            numpy.ndarray: Изображение экрана или None в случае ошибки
+            numpy.ndarray: Изображение экрана (BGR) или None в случае ошибки
         """
         try:
             if region:
-                return self.capture_region(region)
-
-            # Захватываем экран
-            screenshot = pyautogui.screenshot()
-
-            # Преобразуем в numpy массив
-            # Для тестов, обрабатываем случай, когда screenshot - это MagicMock
-
-            if hasattr(screenshot, "__array__") and callable(getattr(screenshot, "__array__")):
-                try:
-                    img = np.asarray(
-                        screenshot
-                    )  # Используем np.asarray вместо прямого вызова __array__
-                except TypeError:
-                    # Если возникает ошибка, используем стандартный способ
-                    img = np.array(screenshot)
-            else:
-                img = np.array(screenshot)
+                return self.capture_region(region, out=out)
 
-            return img
+            return self.backend.grab(out=out)
         except Exception as e:
             handle_error(f"Ошибка при захвате экрана: {e}", e, module="vision")
             return None
 
-    def capture_region(self, region):
+    def capture_region(self, region, out=None):
         """
         Захватывает указанную область экрана
 
         Args:
             region (tuple): Координаты области (x, y, width, height)
+            out (numpy.ndarray, optional): Буфер для записи кадра
 
         Returns:
-            numpy.ndarray: Изображение области экрана или None в случае ошибки
+            numpy.ndarray: Изображение области экрана (BGR) или None в случае ошибки
         """
         try:
-            # Захватываем указанную область экрана
-            screenshot = pyautogui.screenshot(region=region)
-
-            # Преобразуем в numpy массив
-            img = np.array(screenshot)
-
-            return img
+            return self.backend.grab(region, out=out)
         except Exception as e:
             handle_error(f"Ошибка при захвате области экрана: {e}", e, module="vision")
             return None
@@ -105,12 +106,16 @@ class ScreenCapture:
             tuple: (width, height) экрана
         """
         try:
-            width, height = pyautogui.size()
-            return (width, height)
+            return self.backend.size()
         except Exception as e:
             handle_error(f"Ошибка при получении размера экрана: {e}", e, module="vision")
             return (0, 0)
 
+    def close(self):
+        """Освобождает ресурсы бэкенда захвата"""
+        if self._backend is not None:
+            self._backend.close()
+
     def compare_images(self, img1, img2, threshold=0.95):
         """
         Сравнивает два изображения.
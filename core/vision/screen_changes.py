@@ -1,6 +1,8 @@
 import time
 
 from core.common.error_handler import handle_error
+from core.vision.change_detection import TileChangeDetector
+from core.vision.frame_stream import get_frame_stream
 from core.vision.image_comparison import ImageComparison
 from core.vision.screen_capture import ScreenCapture
 
@@ -8,10 +10,25 @@ from core.vision.screen_capture import ScreenCapture
 class ScreenChanges:
     """Класс для обработки изменений на экране"""
 
-    def __init__(self):
-        """Инициализация"""
+    def __init__(self, frame_stream=None):
+        """
+        Инициализация
+
+        Args:
+            frame_stream (FrameStream, optional): Поток кадров для ожидания изменений
+                (по умолчанию общий поток get_frame_stream())
+        """
         self.screen_capture = ScreenCapture()
         self.image_comparison = ImageComparison()
+        self.change_detector = TileChangeDetector()
+        self._frame_stream = frame_stream
+
+    @property
+    def frame_stream(self):
+        """Поток кадров (общий для всех ожидающих задач)"""
+        if self._frame_stream is None:
+            self._frame_stream = get_frame_stream()
+        return self._frame_stream
 
     def detect_changes(self, delay=0.5, threshold=0.95):
         """
@@ -74,50 +91,52 @@ class ScreenChanges:
             handle_error(f"Ошибка при обнаружении изменений в области: {e}", e, module="vision")
             return False
 
-    def wait_for_changes(self, timeout=10, delay=0.5, threshold=0.95):
+    def detect_change_regions(self, region=None, delay=0.5):
+        """
+        Находит изменившиеся области экрана за время delay
+
+        Args:
+            region (tuple, optional): Координаты области (x, y, width, height)
+            delay (float): Задержка между снимками в секундах
+
+        Returns:
+            ChangeReport: Изменившиеся прямоугольники (в координатах области) и доля
+                изменений или None в случае ошибки
+        """
+        try:
+            with self.frame_stream.subscribe() as frames:
+                first = frames.next_frame(timeout=delay + 5)
+                if first is None:
+                    return None
+                second = frames.next_frame(timeout=delay + 5, not_before=first.timestamp + delay)
+                if second is None:
+                    return None
+
+            return self.change_detector.compare(first.crop(region), second.crop(region))
+        except Exception as e:
+            handle_error(f"Ошибка при поиске изменившихся областей: {e}", e, module="vision")
+            return None
+
+    def wait_for_changes(self, timeout=10, delay=0.5, min_change_percent=0.0):
         """
         Ожидает изменений на экране в течение указанного времени
 
         Args:
             timeout (float): Максимальное время ожидания в секундах
             delay (float): Задержка между проверками в секундах
-            threshold (float): Порог сходства (0-1), ниже которого считается, что есть изменения
+            min_change_percent (float): Доля изменившейся площади (%), больше которой
+                считается, что есть изменения
 
         Returns:
             bool: True, если обнаружены изменения, иначе False
         """
         try:
-            # Запоминаем время начала
-            start_time = time.time()
-
-            # Захватываем первый снимок экрана
-            img1 = self.screen_capture.capture_screen()
-
-            # Ждем изменений в течение указанного времени
-            while time.time() - start_time < timeout:
-                # Ждем указанное время
-                time.sleep(delay)
-
-                # Захватываем текущий снимок экрана
-                img2 = self.screen_capture.capture_screen()
-
-                # Сравниваем изображения
-                similarity = self.image_comparison.compare_images(img1, img2)
-
-                # Если сходство ниже порога, значит есть изменения
-                if similarity < threshold:
-                    return True
-
-                # Обновляем первый снимок
-                img1 = img2
-
-            # Если время вышло, а изменений не обнаружено
-            return False
+            return self._wait_for_changes(None, timeout, delay, min_change_percent)
         except Exception as e:
             handle_error(f"Ошибка при ожидании изменений: {e}", e, module="vision")
             return False
 
-    def wait_for_changes_in_region(self, region, timeout=10, delay=0.5, threshold=0.95):
+    def wait_for_changes_in_region(self, region, timeout=10, delay=0.5, min_change_percent=0.0):
         """
         Ожидает изменений в указанной области экрана в течение указанного времени
 
@@ -125,38 +144,53 @@ class ScreenChanges:
             region (tuple): Координаты области (x, y, width, height)
             timeout (float): Максимальное время ожидания в секундах
             delay (float): Задержка между проверками в секундах
-            threshold (float): Порог сходства (0-1), ниже которого считается, что есть изменения
+            min_change_percent (float): Доля изменившейся площади (%), больше которой
+                считается, что есть изменения
 
         Returns:
             bool: True, если обнаружены изменения, иначе False
         """
         try:
-            # Запоминаем время начала
-            start_time = time.time()
-
-            # Захватываем первый снимок области
-            img1 = self.screen_capture.capture_region(region)
-
-            # Ждем изменений в течение указанного времени
-            while time.time() - start_time < timeout:
-                # Ждем указанное время
-                time.sleep(delay)
-
-                # Захватываем текущий снимок области
-                img2 = self.screen_capture.capture_region(region)
+            return self._wait_for_changes(region, timeout, delay, min_change_percent)
+        except Exception as e:
+            handle_error(f"Ошибка при ожидании изменений в области: {e}", e, module="vision")
+            return False
 
-                # Сравниваем изображения
-                similarity = self.image_comparison.compare_images(img1, img2)
+    def _wait_for_changes(self, region, timeout, delay, min_change_percent):
+        """
+        Сравнивает кадры общего потока, захваченные с интервалом не меньше delay
 
-                # Если сходство ниже порога, значит есть изменения
-                if similarity < threshold:
+        Кадры захватывает FrameStream, поэтому несколько ожидающих задач не
+        захватывают экран каждая сама по себе. Для каждого кадра считаются
+        только хеши плиток; хеши предыдущего кадра переиспользуются.
+        """
+        deadline = time.monotonic() + timeout
+        detector = self.change_detector
+
+        with self.frame_stream.subscribe() as frames:
+            # Первый кадр для сравнения
+            previous = frames.next_frame(timeout=timeout)
+            if previous is None:
+                return False
+            previous_signature = detector.signature(previous.crop(region))
+
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                # Текущий кадр не раньше чем через delay после предыдущего
+                frame = frames.next_frame(timeout=remaining, not_before=previous.timestamp + delay)
+                if frame is None:
+                    break
+
+                signature = detector.signature(frame.crop(region))
+                report = detector.compare_signatures(previous_signature, signature)
+                if report.changed and report.change_percentage > min_change_percent:
                     return True
 
-                # Обновляем первый снимок
-                img1 = img2
+                # Обновляем предыдущий кадр
+                previous, previous_signature = frame, signature
 
-            # Если время вышло, а изменений не обнаружено
-            return False
-        except Exception as e:
-            handle_error(f"Ошибка при ожидании изменений в области: {e}", e, module="vision")
-            return False
+        # Если время вышло, а изменений не обнаружено
+        return False
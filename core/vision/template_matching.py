@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+"""
+Поиск шаблонов на изображении: пирамида от грубого к точному, несколько
+масштабов и кеш подготовленных шаблонов.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# Размер кеша подготовленных шаблонов из файлов
+DEFAULT_CACHE_SIZE = int(os.getenv("TEMPLATE_CACHE_SIZE", 64))
+
+Match = Tuple[int, int, int, int, float]  # (x, y, width, height, confidence)
+Region = Tuple[int, int, int, int]
+
+
+class PreparedTemplate:
+    """
+    Шаблон с пирамидами для каждого масштаба.
+
+    Пирамиды строятся при первом поиске в данном масштабе и затем
+    переиспользуются.
+    """
+
+    def __init__(self, image: np.ndarray):
+        """
+        Args:
+            image (numpy.ndarray): Шаблон BGR или в оттенках серого
+        """
+        self.image = image
+        self._scaled: Dict[float, Tuple[np.ndarray, List[np.ndarray]]] = {}
+        self._lock = threading.Lock()
+
+    def scaled(self, scale: float, max_levels: int, min_size: int):
+        """
+        Возвращает шаблон в масштабе scale и пирамиду его уровней в оттенках серого
+
+        Returns:
+            tuple: (изображение в масштабе, [уровень 0, уровень 1, ...])
+        """
+        with self._lock:
+            cached = self._scaled.get(scale)
+            if cached is None:
+                image = self.image
+                if scale != 1.0:
+                    size = (
+                        max(1, round(image.shape[1] * scale)),
+                        max(1, round(image.shape[0] * scale)),
+                    )
+                    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+                    image = cv2.resize(image, size, interpolation=interpolation)
+                pyramid = [_to_gray(image)]
+                while len(pyramid) <= max_levels and min(pyramid[-1].shape[:2]) >= 2 * min_size:
+                    pyramid.append(cv2.pyrDown(pyramid[-1]))
+                cached = self._scaled[scale] = (image, pyramid)
+            return cached
+
+
+def _to_gray(image: np.ndarray) -> np.ndarray:
+    """Преобразует изображение в оттенки серого"""
+    if image.ndim == 3:
+        code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        return cv2.cvtColor(image, code)
+    return image
+
+
+class TemplateMatcher:
+    """
+    Поиск шаблона с ускорением по пирамиде изображений.
+
+    Изображение и шаблон уменьшаются (cv2.pyrDown) до уровня, на котором
+    шаблон ещё не меньше min_size пикселей. На этом уровне выполняется
+    полный поиск TM_CCOEFF_NORMED в оттенках серого, а лучшие по рангу
+    кандидаты уточняются на каждом следующем уровне в окне в несколько
+    пикселей и проверяются на исходном разрешении по исходным каналам.
+
+    Уменьшение теряет мелкие детали (текст, тонкие линии) и зависит от
+    чётности смещения шаблона, поэтому настоящее совпадение может не попасть
+    в кандидаты. Если лучшее подтверждённое совпадение ниже exact_score,
+    полный поиск повторяется на уровень точнее, а последним шагом - на
+    исходном разрешении по исходным каналам, как без пирамиды. Поэтому
+    результат не хуже полного поиска, а ускорение достигается, когда
+    совпадение точное (обычно для шаблона, вырезанного из снимка того же
+    экрана). Подготовленные шаблоны из файлов хранятся в LRU-кеше по пути и
+    времени изменения.
+    """
+
+    def __init__(
+        self,
+        max_levels: int = 4,
+        min_size: int = 12,
+        candidates: int = 10,
+        margin: int = 3,
+        exact_score: float = 0.999,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        """
+        Args:
+            max_levels (int): Наибольшее число уровней пирамиды
+            min_size (int): Наименьшая сторона шаблона на грубом уровне
+            candidates (int): Число кандидатов, уточняемых после грубого поиска
+            margin (int): Окно уточнения (в пикселях уровня) вокруг кандидата
+            exact_score (float): Уверенность, при которой совпадение принимается
+                без поиска на более точных уровнях
+            cache_size (int): Размер кеша шаблонов из файлов
+        """
+        self.max_levels = max_levels
+        self.min_size = min_size
+        self.candidates = max(1, candidates)
+        self.margin = margin
+        self.exact_score = exact_score
+        self.cache_size = max(1, cache_size)
+        self._cache: "OrderedDict[Tuple[str, int, int], PreparedTemplate]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def load_template(self, path: str) -> Optional[PreparedTemplate]:
+        """
+        Загружает шаблон из файла с учётом кеша
+
+        Ключ кеша - путь, время изменения и размер файла, поэтому изменённый
+        файл загружается заново.
+
+        Returns:
+            PreparedTemplate: Шаблон или None, если файл не удалось прочитать
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+        with self._cache_lock:
+            template = self._cache.get(key)
+            if template is not None:
+                self._cache.move_to_end(key)
+                return template
+
+        image = cv2.imread(path)
+        if image is None:
+            return None
+        template = PreparedTemplate(image)
+
+        with self._cache_lock:
+            self._cache[key] = template
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return template
+
+    def find(
+        self,
+        image: np.ndarray,
+        template,
+        threshold: float = 0.8,
+        region: Optional[Region] = None,
+        scales: Sequence[float] = (1.0,),
+    ) -> Optional[Match]:
+        """
+        Ищет лучшее совпадение шаблона
+
+        Args:
+            image (numpy.ndarray): Изображение, на котором ищем
+            template (numpy.ndarray | PreparedTemplate): Шаблон
+            threshold (float): Порог уверенности (0-1)
+            region (tuple, optional): Область поиска (x, y, width, height)
+            scales (sequence): Масштабы шаблона (например, для HiDPI: 1.0, 1.25, 1.5, 2.0)
+
+        Returns:
+            tuple: (x, y, width, height, confidence) в координатах image или None
+        """
+        if not isinstance(template, PreparedTemplate):
+            template = PreparedTemplate(template)
+
+        offset_x = offset_y = 0
+        if region:
+            x, y, width, height = region
+            offset_x, offset_y = max(0, x), max(0, y)
+            image = image[offset_y : y + height, offset_x : x + width]
+
+        gray = _to_gray(image)
+        image_pyramid = [gray]
+        best = None
+
+        for scale in scales:
+            scaled, template_pyramid = template.scaled(scale, self.max_levels, self.min_size)
+            height, width = template_pyramid[0].shape[:2]
+            if height > gray.shape[0] or width > gray.shape[1]:
+                continue
+
+            # Уровни изображения строятся по мере необходимости и общие для всех масштабов
+            levels = len(template_pyramid) - 1
+            while len(image_pyramid) <= levels:
+                image_pyramid.append(cv2.pyrDown(image_pyramid[-1]))
+
+            match = self._find_scaled(image, image_pyramid, scaled, template_pyramid, threshold)
+            if match is not None and (best is None or match[4] > best[4]):
+                best = match
+
+        if best is None:
+            return None
+        x, y, width, height, confidence = best
+        return (x + offset_x, y + offset_y, width, height, confidence)
+
+    def _find_scaled(self, image, image_pyramid, template, template_pyramid, threshold):
+        """
+        Поиск шаблона одного масштаба от грубого уровня к исходному
+
+        Пока лучшее подтверждённое совпадение ниже exact_score, полный поиск
+        повторяется на уровень точнее, вплоть до исходного разрешения.
+        """
+        top = len(template_pyramid) - 1
+        color = image.ndim == template.ndim == 3
+        # Полный поиск в оттенках серого на исходном разрешении нужен, только
+        # если пирамиды нет; иначе после неё сразу идёт поиск по исходным каналам
+        lowest = 1 if top and color else 0
+        best = None
+        for levels in range(top, lowest - 1, -1):
+            match = self._find_from_level(
+                image, image_pyramid, template, template_pyramid, threshold, levels
+            )
+            if match is not None and (best is None or match[4] > best[4]):
+                best = match
+            if best is not None and best[4] >= self.exact_score:
+                return best
+
+        if color:
+            # Оттенки серого могут не различать места, различимые в цвете:
+            # последний шаг - полный поиск по исходным каналам, как без пирамиды
+            result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (x, y) = cv2.minMaxLoc(result)
+            if np.isfinite(score) and score >= threshold and (best is None or score > best[4]):
+                height, width = template.shape[:2]
+                best = (int(x), int(y), width, height, float(score))
+        return best
+
+    def _find_from_level(self, image, image_pyramid, template, template_pyramid, threshold, levels):
+        """Полный поиск на уровне levels и уточнение кандидатов до исходного разрешения"""
+        coarse_template = template_pyramid[levels]
+        coarse_image = image_pyramid[levels]
+        if (
+            coarse_template.shape[0] > coarse_image.shape[0]
+            or coarse_template.shape[1] > coarse_image.shape[1]
+        ):
+            return None
+
+        result = cv2.matchTemplate(coarse_image, coarse_template, cv2.TM_CCOEFF_NORMED)
+        best = None
+        for x, y in self._top_candidates(result, coarse_template.shape):
+            if levels:
+                for level in range(levels - 1, 0, -1):
+                    x, y, _ = self._refine(
+                        image_pyramid[level], template_pyramid[level], 2 * x, 2 * y
+                    )
+                x, y, margin = 2 * x, 2 * y, self.margin
+            else:
+                # Полный поиск на исходном разрешении: кандидат уже точный
+                margin = 0
+            match = self._verify(image, template, (x, y), threshold, margin)
+            if match is not None and (best is None or match[4] > best[4]):
+                best = match
+        return best
+
+    def _top_candidates(self, result, template_shape):
+        """Лучшие по рангу позиции карты совпадений, не ближе половины шаблона друг к другу"""
+        candidates = []
+        half_height, half_width = template_shape[0] // 2 + 1, template_shape[1] // 2 + 1
+        for _ in range(self.candidates):
+            _, score, _, (x, y) = cv2.minMaxLoc(result)
+            if not np.isfinite(score) or score <= -1.0:
+                break
+            candidates.append((x, y))
+            # Подавляем окрестность найденного максимума
+            result[
+                max(0, y - half_height) : y + half_height, max(0, x - half_width) : x + half_width
+            ] = -1.0
+        return candidates
+
+    def _refine(self, image, template, x, y, margin=None):
+        """Уточняет позицию шаблона в окне вокруг (x, y)"""
+        margin = self.margin if margin is None else margin
+        height, width = template.shape[:2]
+        left = min(max(0, x - margin), image.shape[1] - width)
+        top = min(max(0, y - margin), image.shape[0] - height)
+        right = min(image.shape[1], x + margin + width)
+        bottom = min(image.shape[0], y + margin + height)
+        window = image[top:bottom, left:right]
+
+        result = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (dx, dy) = cv2.minMaxLoc(result)
+        return left + dx, top + dy, score
+
+    def _verify(self, image, template, position, threshold, margin):
+        """Проверяет совпадение на исходном разрешении по исходным каналам"""
+        if image.ndim != template.ndim:
+            image, template = _to_gray(image), _to_gray(template)
+        x, y, score = self._refine(image, template, position[0], position[1], margin)
+        if not np.isfinite(score) or score < threshold:
+            return None
+        height, width = template.shape[:2]
+        return (int(x), int(y), width, height, float(score))
+
+
+# Глобальный поиск шаблонов (общий кеш шаблонов)
+_template_matcher: Optional[TemplateMatcher] = None
+_template_matcher_lock = threading.Lock()
+
+
+def get_template_matcher() -> TemplateMatcher:
+    """
+    Возвращает общий экземпляр поиска шаблонов.
+
+    Returns:
+        TemplateMatcher: Глобальный экземпляр TemplateMatcher
+    """
+    global _template_matcher
+    with _template_matcher_lock:
+        if _template_matcher is None:
+            _template_matcher = TemplateMatcher()
+        return _template_matcher
+
+
+def benchmark_template_matching(
+    image_size: Tuple[int, int] = (3840, 2160), template_size: int = 48, repeat: int = 5
+) -> Dict[str, float]:
+    """
+    Сравнивает полный поиск cv2.matchTemplate с поиском по пирамиде
+
+    Args:
+        image_size: (width, height) изображения
+        template_size: Сторона квадратного шаблона
+        repeat: Число повторов (берётся лучшее время)
+
+    Returns:
+        dict: Время полного поиска и поиска по пирамиде (мс)
+    """
+    import time
+
+    rng = np.random.default_rng(0)
+    # Гладкое изображение, похожее на интерфейс, а не на белый шум
+    image = cv2.resize(
+        rng.integers(0, 256, (image_size[1] // 16, image_size[0] // 16, 3), dtype=np.uint8),
+        image_size,
+        interpolation=cv2.INTER_CUBIC,
+    )
+    x, y = image_size[0] * 2 // 3, image_size[1] // 3
+    template = image[y : y + template_size, x : x + template_size].copy()
+    matcher = TemplateMatcher()
+    prepared = PreparedTemplate(template)
+
+    def measure(func):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+        return best * 1000
+
+    return {
+        "full_ms": measure(lambda: cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)),
+        "pyramid_ms": measure(lambda: matcher.find(image, prepared)),
+    }
+
+
+if __name__ == "__main__":
+    for key, value in benchmark_template_matching().items():
+        print(f"{key}: {value:.1f}")
@@ -1,5 +1,5 @@
 import datetime
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 from typing import List, Optional
 
 
@@ -16,6 +16,9 @@ class CommandStep:
     accuracy_percentage: float = (
         90.0  # По умолчанию считаем, что команда выполнена с высокой точностью
     )
+    depends_on: List[int] = field(default_factory=list)  # Номера шагов, которые нужно дождаться
+    generation_time: Optional[float] = None  # Время генерации кода шага (секунды)
+    duration: Optional[float] = None  # Время выполнения шага (секунды)
 
 
 @dataclass
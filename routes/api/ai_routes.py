@@ -6,15 +6,18 @@ import datetime
 import logging
 import time
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 
 from config import Config
 from core.db.connection import get_db
 from core.db.models import AIModel
+from routes.api.dependencies import sse_event
 from services.ai_service import (
     check_ai_model_availability,
     get_ai_models,
+    get_response_cache,
     get_simple_ai_response,
+    iter_ai_model_availability,
     search_models,
     select_ai_model,
     update_models_from_huggingface,
@@ -56,6 +59,7 @@ def test_ai():
         # ✅ ИЗМЕНЕНО: Передаем всю историю в обработчик
         response = get_simple_ai_response(messages, model_name=model_name)
         end_time = time.time()
+        debug_info["cache"] = get_response_cache().get_stats()
 
         return jsonify(
             {
@@ -91,10 +95,32 @@ def get_models():
 def check_ai_models():
     """Проверяет доступность нейросетей"""
     model_id = request.json.get("model_id", None) if request.json else None
-    results = check_ai_model_availability(model_id)
+    force = bool(request.json.get("force", False)) if request.json else False
+    results = check_ai_model_availability(model_id, force=force)
     return jsonify(results)
 
 
+@ai_bp.route("/models/check/stream", methods=["GET"])
+def check_ai_models_stream():
+    """Проверяет доступность всех нейросетей, отдавая прогресс через Server-Sent Events"""
+    force = request.args.get("force") == "true"
+
+    def generate():
+        try:
+            for progress in iter_ai_model_availability(force=force):
+                yield sse_event("progress", progress)
+            yield sse_event("done", {})
+        except Exception as e:
+            logger.error(f"Ошибка при потоковой проверке моделей: {str(e)}")
+            yield sse_event("error", {"error": str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @ai_bp.route("/models/select", methods=["POST"])
 def select_ai_model_route():
     """Выбирает нейросеть для использования"""
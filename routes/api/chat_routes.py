@@ -1,13 +1,13 @@
 import logging
 
-from flask import Blueprint, g, jsonify, request
+from flask import Blueprint, Response, g, jsonify, request, stream_with_context
 
 from core.db.connection import get_db
 from core.db.models import ChatMessage, ChatSession
 
 # ✅ ИСПРАВИТЬ ИМПОРТ
-from routes.api.dependencies import require_auth
-from services.ai_service import get_simple_ai_response
+from routes.api.dependencies import require_auth, sse_event
+from services.ai_service import get_simple_ai_response, stream_ai_response
 
 chat_bp = Blueprint("chat_api", __name__)
 logger = logging.getLogger("neuro_assistant")
@@ -125,3 +125,74 @@ def post_message(session_id):
         # ✅ УЛУЧШЕНО: Ловим ошибки от AI сервиса и возвращаем корректный ответ.
         logger.error(f"Ошибка при получении ответа от AI сервиса: {e}", exc_info=True)
         return jsonify({"error": "Внутренняя ошибка при обращении к AI сервису"}), 500
+
+
+@chat_bp.route("/chats/<int:session_id>/messages/stream", methods=["POST"])
+@require_auth
+def stream_message(session_id):
+    """
+    Отправить сообщение в чат и получить ответ AI потоком (text/event-stream).
+
+    События: "token" с очередным фрагментом ответа, затем "done" с полным
+    текстом либо "error". Ответ AI сохраняется в базу один раз, после
+    завершения генерации.
+    """
+    db = next(get_db())
+    data = request.get_json()
+    user_prompt = data.get("prompt")
+
+    if not user_prompt:
+        return jsonify({"error": "Prompt не может быть пустым"}), 400
+
+    session = (
+        db.query(ChatSession)
+        .filter(ChatSession.id == session_id, ChatSession.user_id == g.current_user.id)
+        .first()
+    )
+    if not session:
+        return jsonify({"error": "Чат не найден или доступ запрещен"}), 404
+
+    # Сообщение пользователя сохраняем до генерации, чтобы оно не потерялось
+    user_message = ChatMessage(session_id=session_id, role="user", content=user_prompt)
+    db.add(user_message)
+    db.commit()
+
+    db_messages = (
+        db.query(ChatMessage)
+        .filter(ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.timestamp.asc())
+        .all()
+    )
+    context = [{"role": m.role, "content": m.content} for m in db_messages]
+
+    try:
+        # Проверки доступности модели выполняются здесь, до начала потока
+        tokens = stream_ai_response(context)
+    except Exception as e:
+        logger.error(f"AI сервис недоступен: {e}")
+        return jsonify({"error": str(e)}), 503
+
+    def generate():
+        parts = []
+        try:
+            for token in tokens:
+                parts.append(token)
+                yield sse_event("token", {"content": token})
+        except Exception as e:
+            logger.error(f"Ошибка при потоковой генерации ответа AI: {e}", exc_info=True)
+            yield sse_event("error", {"error": "Внутренняя ошибка при обращении к AI сервису"})
+            return
+
+        content = "".join(parts)
+        ai_message = ChatMessage(session_id=session_id, role="assistant", content=content)
+        db.add(ai_message)
+        db.commit()
+
+        yield sse_event("done", {"role": "assistant", "content": content})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        # Отключаем кэширование и буферизацию прокси, иначе фрагменты придут разом
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,6 +2,7 @@
 Общие зависимости для API-маршрутов, такие как декораторы авторизации.
 """
 
+import json
 import logging
 from functools import wraps
 
@@ -54,3 +55,8 @@ def require_auth(f):
             )
 
     return decorated_function
+
+
+def sse_event(event, data):
+    """Форматирует событие Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -8,9 +8,11 @@ import os
 import platform
 
 import psutil
-from flask import Blueprint, jsonify, make_response, request
+from flask import Blueprint, Response, jsonify, request
 
 from config import Config
+from utils.history_store import get_history_store
+from utils.log_reader import RotatedLog, gzip_chunks
 
 system_bp = Blueprint("system_api", __name__)
 logger = logging.getLogger("neuro_assistant")
@@ -18,63 +20,71 @@ logger = logging.getLogger("neuro_assistant")
 
 @system_bp.route("/history", methods=["GET"])
 def get_history():
-    """Возвращает историю выполненных команд"""
-    try:
-        if not os.path.exists(Config.SUMMARY_LOG_FILE):
-            return jsonify({"history": [], "count": 0, "message": "История команд пуста"})
-
-        # Пробуем различные кодировки для чтения файла
-        encodings = ["utf-8", "cp1251", "latin-1"]
-        summary_content = None
+    """
+    Возвращает историю выполненных команд, от новых к старым
 
-        for encoding in encodings:
-            try:
-                with open(Config.SUMMARY_LOG_FILE, "r", encoding=encoding) as f:
-                    summary_content = f.read()
-                break
-            except UnicodeDecodeError:
-                continue
+    Параметры запроса: limit (размер страницы), cursor (next_cursor предыдущей
+    страницы), status, command (начало текста команды), since и until
+    (границы времени в формате "ГГГГ-ММ-ДД ЧЧ:ММ:СС").
+    """
+    try:
+        limit = min(int(request.args.get("limit", 50)), Config.HISTORY_MAX_PAGE_SIZE)
+        cursor = request.args.get("cursor", type=int)
+    except ValueError:
+        return jsonify({"error": "Некорректные параметры страницы", "history": []}), 400
 
-        if summary_content is None:
-            with open(Config.SUMMARY_LOG_FILE, "rb") as f:
-                binary_content = f.read()
-                summary_content = binary_content.decode("utf-8", errors="ignore")
+    try:
+        records, next_cursor = get_history_store().query(
+            limit=limit,
+            cursor=cursor,
+            status=request.args.get("status"),
+            command=request.args.get("command"),
+            since=request.args.get("since"),
+            until=request.args.get("until"),
+        )
 
-        # Разбиваем на отдельные записи
-        entries = []
-        current_entry = {}
-        lines = summary_content.split("\n")
+        entries = [
+            {
+                "id": record["id"],
+                "timestamp": record["timestamp"],
+                "command": record["command"],
+                "status": record["status"],
+                "completion": _format_percentage(record["completion"]),
+                "accuracy": _format_percentage(record["accuracy"]),
+            }
+            for record in records
+        ]
 
-        for line in lines:
-            if line.startswith("20"):  # Начало новой записи (с даты)
-                if current_entry:
-                    entries.append(current_entry)
-                    current_entry = {}
-                parts = line.split(" - ", 1)
-                if len(parts) > 1:
-                    current_entry["timestamp"] = parts[0]
-            elif line.startswith("Команда:"):
-                current_entry["command"] = line.replace("Команда:", "").strip()
-            elif line.startswith("Статус:"):
-                current_entry["status"] = line.replace("Статус:", "").strip()
-            elif line.startswith("Выполнение:"):
-                current_entry["completion"] = line.replace("Выполнение:", "").strip()
-            elif line.startswith("Точность:"):
-                current_entry["accuracy"] = line.replace("Точность:", "").strip()
-
-        if current_entry:
-            entries.append(current_entry)
-
-        return jsonify({"history": entries, "count": len(entries)})
+        if not entries and cursor is None:
+            return jsonify(
+                {"history": [], "count": 0, "next_cursor": None, "message": "История команд пуста"}
+            )
+        return jsonify({"history": entries, "count": len(entries), "next_cursor": next_cursor})
     except Exception as e:
         logger.error(f"Ошибка при чтении истории: {str(e)}")
         return jsonify({"error": f"Ошибка при чтении истории: {str(e)}", "history": []})
 
 
+def _format_percentage(value):
+    """Форматирует процент как в текстовом журнале истории"""
+    return f"{value:.1f}%" if value is not None else None
+
+
 @system_bp.route("/detailed_history/<command_timestamp>", methods=["GET"])
 def get_detailed_history(command_timestamp):
     """Возвращает подробную информацию о выполнении команды"""
     try:
+        record = get_history_store().find_by_timestamp(command_timestamp)
+        if record is not None and record["details"]:
+            return jsonify(
+                {
+                    "command_timestamp": command_timestamp,
+                    "details": record["details"].split("\n"),
+                    "steps": record["steps"],
+                }
+            )
+
+        # Записи, сделанные до появления хранилища, ищем в текстовом журнале
         if not os.path.exists(Config.DETAILED_LOG_FILE):
             return jsonify(
                 {
@@ -108,7 +118,13 @@ def get_detailed_history(command_timestamp):
 
 @system_bp.route("/logs", methods=["GET"])
 def get_system_logs():
-    """Возвращает системные логи (только для разработчиков)"""
+    """
+    Возвращает системные логи (только для разработчиков)
+
+    По умолчанию - последние max_lines строк, offset строк с конца пропускается
+    (постраничное чтение назад). С параметром start (и необязательным end)
+    возвращается диапазон байтов лога. Резервные копии ротации учитываются.
+    """
     developer_mode = request.args.get("developer_mode") == "true"
     developer_key = request.args.get("developer_key", "")
 
@@ -116,35 +132,69 @@ def get_system_logs():
         return jsonify({"error": "Доступ запрещен. Требуется ключ разработчика."}), 403
 
     try:
-        if not os.path.exists(Config.SYSTEM_LOG_FILE):
+        log = RotatedLog(Config.SYSTEM_LOG_FILE)
+        if not log.exists():
             return jsonify({"logs": [], "message": "Системные логи пусты"})
 
-        max_lines = int(request.args.get("max_lines", 100))
+        size = log.size()
+        start = request.args.get("start", type=int)
+        if start is not None:
+            end = min(request.args.get("end", size, type=int), size)
+            content = log.read_range(max(0, start), end).decode("utf-8", errors="replace")
+            return jsonify({"content": content, "start": start, "end": end, "size": size})
 
-        with open(Config.SYSTEM_LOG_FILE, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            last_lines = lines[-max_lines:] if len(lines) > max_lines else lines
+        max_lines = max(1, request.args.get("max_lines", 100, type=int))
+        offset = max(0, request.args.get("offset", 0, type=int))
+        lines = log.tail(max_lines + 1, offset)
+        has_more = len(lines) > max_lines
+        last_lines = lines[1:] if has_more else lines
 
-        return jsonify({"logs": last_lines, "count": len(last_lines), "total_lines": len(lines)})
+        return jsonify(
+            {
+                "logs": last_lines,
+                "count": len(last_lines),
+                "offset": offset,
+                "next_offset": offset + len(last_lines) if has_more else None,
+                "size": size,
+            }
+        )
     except Exception as e:
         logger.error(f"Ошибка при чтении системных логов: {str(e)}")
         return jsonify({"error": f"Ошибка при чтении системных логов: {str(e)}", "logs": []}), 500
 
 
+def _export_log(path, filename):
+    """
+    Отдаёт лог с резервными копиями потоком, не загружая его в память
+
+    С параметром gzip=true лог сжимается на лету и отдаётся как .gz.
+    """
+    log = RotatedLog(path)
+    if not log.exists():
+        return None
+
+    # Отдаём снимок текущего размера: записи, добавленные во время выгрузки, не попадут
+    size = log.size()
+    chunks = log.iter_chunks(0, size)
+
+    if request.args.get("gzip") == "true":
+        response = Response(gzip_chunks(chunks), mimetype="application/gzip")
+        filename += ".gz"
+    else:
+        response = Response(chunks, mimetype="text/plain")
+        response.headers["Content-Length"] = str(size)
+
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+
+
 @system_bp.route("/export_history", methods=["GET"])
 def export_history_logs():
     """Экспортирует историю команд в файл"""
     try:
-        if not os.path.exists(Config.SUMMARY_LOG_FILE):
+        response = _export_log(Config.SUMMARY_LOG_FILE, "command_history.txt")
+        if response is None:
             return jsonify({"error": "Файл истории команд не найден"}), 404
-
-        with open(Config.SUMMARY_LOG_FILE, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        response = make_response(content)
-        response.headers["Content-Type"] = "text/plain"
-        response.headers["Content-Disposition"] = "attachment; filename=command_history.txt"
-
         return response
     except Exception as e:
         logger.error(f"Ошибка при экспорте истории команд: {str(e)}")
@@ -155,16 +205,9 @@ def export_history_logs():
 def export_detailed_logs():
     """Экспортирует детальные логи в файл"""
     try:
-        if not os.path.exists(Config.DETAILED_LOG_FILE):
+        response = _export_log(Config.DETAILED_LOG_FILE, "detailed_logs.txt")
+        if response is None:
             return jsonify({"error": "Файл детальных логов не найден"}), 404
-
-        with open(Config.DETAILED_LOG_FILE, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        response = make_response(content)
-        response.headers["Content-Type"] = "text/plain"
-        response.headers["Content-Disposition"] = "attachment; filename=detailed_logs.txt"
-
         return response
     except Exception as e:
         logger.error(f"Ошибка при экспорте детальных логов: {str(e)}")
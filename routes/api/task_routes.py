@@ -4,10 +4,14 @@
 
 import datetime
 import logging
+import threading
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context, url_for
 
+from config import Config
 from models.command_models import CommandExecution, CommandStep
+from routes.api.dependencies import sse_event
+from services.command_jobs import FINISHED_STATUSES, CommandJobQueue, JobQueueFull
 from services.command_service import (
     execute_command_with_error_handling,
     execute_command_with_steps,
@@ -20,17 +24,47 @@ task_bp = Blueprint("task_api", __name__)
 logger = logging.getLogger("neuro_assistant")
 
 
-@task_bp.route("/query", methods=["POST"])
-def query():
-    """Основной эндпоинт для выполнения команд"""
-    if request.json is None:
-        return jsonify({"error": "Ожидался JSON в теле запроса"}), 400
+# Очередь фоновых заданий (создаётся при первом запросе)
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_command_job_queue():
+    """Получить очередь заданий выполнения команд"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = CommandJobQueue(
+                _run_job,
+                max_workers=Config.COMMAND_JOB_WORKERS,
+                max_pending=Config.COMMAND_JOB_QUEUE_SIZE,
+                keep_finished=Config.COMMAND_JOB_HISTORY,
+            )
+        return _job_queue
 
-    user_input = request.json.get("input", "").lower()
 
+def _run_job(job, token, report):
+    """Выполняет задание очереди и сообщает о прогрессе снимками CommandExecution"""
+    return run_query(job.command_text, token, lambda execution: report(execution.to_dict()))
+
+
+def run_query(user_input, token=None, on_progress=None):
+    """
+    Выполняет команду пользователя
+
+    Args:
+        user_input: Текст команды
+        token: Токен отмены задания
+        on_progress: Функция, вызываемая с CommandExecution при изменении хода выполнения
+
+    Returns:
+        dict: Результат выполнения для ответа API
+    """
     # Проверяем составную команду
     if any(sep in user_input for sep in [" и ", " затем ", " после этого ", " потом ", ", "]):
-        execution_result = execute_command_with_steps(user_input)
+        execution_result = execute_command_with_steps(
+            user_input, token=token, on_progress=on_progress
+        )
 
         steps_info = []
         for step in execution_result.steps:
@@ -39,29 +73,30 @@ def query():
                 "description": step.description,
                 "status": step.status,
                 "result": step.result if step.status == "completed" else step.error,
+                "depends_on": step.depends_on,
+                "generation_time": step.generation_time,
+                "duration": step.duration,
             }
             steps_info.append(step_info)
 
-        return jsonify(
-            {
-                "response": f"Выполнение команды: {user_input}",
-                "is_compound": True,
-                "steps": steps_info,
-                "overall_status": execution_result.overall_status,
-                "completion_percentage": execution_result.completion_percentage,
-                "accuracy_percentage": execution_result.accuracy_percentage,
-                "message": (
-                    f"Команда выполнена с точностью {execution_result.accuracy_percentage:.1f}% и"
-                    f" завершенностью {execution_result.completion_percentage:.1f}%"
-                ),
-            }
-        )
+        return {
+            "response": f"Выполнение команды: {user_input}",
+            "is_compound": True,
+            "steps": steps_info,
+            "overall_status": execution_result.overall_status,
+            "completion_percentage": execution_result.completion_percentage,
+            "accuracy_percentage": execution_result.accuracy_percentage,
+            "message": (
+                f"Команда выполнена с точностью {execution_result.accuracy_percentage:.1f}% и"
+                f" завершенностью {execution_result.completion_percentage:.1f}%"
+            ),
+        }
     else:
         # Простая команда
         response, code = process_command(user_input)
 
         if code:
-            execution_result = execute_python_code(code)
+            execution_result = execute_python_code(code, token)
 
             step = CommandStep(
                 step_number=1,
@@ -84,32 +119,113 @@ def query():
 
             log_execution_summary(execution, final=True)
 
-            return jsonify(
-                {
-                    "response": response,
-                    "code": code,
-                    "execution_result": execution_result,
-                    "is_compound": False,
-                    "overall_status": execution.overall_status,
-                    "completion_percentage": execution.completion_percentage,
-                    "accuracy_percentage": execution.accuracy_percentage,
-                }
-            )
+            return {
+                "response": response,
+                "code": code,
+                "execution_result": execution_result,
+                "is_compound": False,
+                "overall_status": execution.overall_status,
+                "completion_percentage": execution.completion_percentage,
+                "accuracy_percentage": execution.accuracy_percentage,
+            }
         else:
-            return jsonify(
-                {
-                    "response": response,
-                    "code": None,
-                    "execution_result": "Не удалось сгенерировать код для выполнения команды",
-                    "is_compound": False,
-                    "overall_status": "failed",
-                    "completion_percentage": 0.0,
-                    "accuracy_percentage": 0.0,
-                    "message": (
-                        "Пожалуйста, уточните команду или используйте предустановленные команды"
-                    ),
-                }
-            )
+            return {
+                "response": response,
+                "code": None,
+                "execution_result": "Не удалось сгенерировать код для выполнения команды",
+                "is_compound": False,
+                "overall_status": "failed",
+                "completion_percentage": 0.0,
+                "accuracy_percentage": 0.0,
+                "message": "Пожалуйста, уточните команду или используйте предустановленные команды",
+            }
+
+
+@task_bp.route("/query", methods=["POST"])
+def query():
+    """
+    Основной эндпоинт для выполнения команд
+
+    Команда ставится в очередь и выполняется в фоне; ответ (202) содержит
+    идентификатор задания и адреса для статуса, потока прогресса и отмены.
+    """
+    if request.json is None:
+        return jsonify({"error": "Ожидался JSON в теле запроса"}), 400
+
+    user_input = request.json.get("input", "").lower()
+
+    try:
+        job = get_command_job_queue().submit(user_input)
+    except JobQueueFull as e:
+        logger.warning(f"Очередь команд переполнена: {e}")
+        return jsonify({"error": "Сервер занят, повторите команду позже"}), 503
+
+    return (
+        jsonify(
+            {
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": url_for("task_api.get_job", job_id=job.id),
+                "stream_url": url_for("task_api.stream_job", job_id=job.id),
+                "cancel_url": url_for("task_api.cancel_job", job_id=job.id),
+            }
+        ),
+        202,
+    )
+
+
+@task_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """Возвращает состояние задания и результат, если оно завершено"""
+    job = get_command_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Задание не найдено"}), 404
+    return jsonify(job)
+
+
+@task_bp.route("/jobs/<job_id>/stream", methods=["GET"])
+def stream_job(job_id):
+    """
+    Поток состояния задания (text/event-stream)
+
+    События: "progress" при каждом изменении задания (статус, снимок
+    CommandExecution), затем "done" с итоговым состоянием и результатом.
+    """
+    job_queue = get_command_job_queue()
+    if job_queue.get(job_id) is None:
+        return jsonify({"error": "Задание не найдено"}), 404
+
+    def generate():
+        version = 0
+        while True:
+            job = job_queue.wait(job_id, version, timeout=Config.COMMAND_JOB_KEEPALIVE)
+            if job is None:
+                if job_queue.get(job_id) is None:
+                    yield sse_event("error", {"error": "Задание не найдено"})
+                    return
+                # Комментарий SSE не даёт прокси закрыть простаивающее соединение
+                yield ": keepalive\n\n"
+                continue
+
+            version = job["version"]
+            if job["status"] in FINISHED_STATUSES:
+                yield sse_event("done", job)
+                return
+            yield sse_event("progress", job)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@task_bp.route("/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    """Отменяет задание"""
+    if not get_command_job_queue().cancel(job_id):
+        return jsonify({"success": False, "error": "Задание не найдено или уже завершено"}), 404
+    return jsonify({"success": True, "message": "Запрос на отмену задания получен"})
 
 
 @task_bp.route("/clarify", methods=["POST"])
@@ -192,15 +308,26 @@ def confirm_action():
 
 @task_bp.route("/interrupt", methods=["POST"])
 def interrupt_command():
-    """Прерывает выполнение текущей команды"""
-    global command_interrupt_flag
-    command_interrupt_flag = True
+    """
+    Прерывает выполнение команды
+
+    С job_id в теле запроса отменяется только это задание, без него - все
+    незавершённые задания.
+    """
+    job_id = (request.get_json(silent=True) or {}).get("job_id")
+    job_queue = get_command_job_queue()
+
+    if job_id:
+        cancelled = int(job_queue.cancel(job_id))
+    else:
+        cancelled = job_queue.cancel_all()
 
-    logger.info("Получен запрос на прерывание команды")
+    logger.info(f"Получен запрос на прерывание команды, отменено заданий: {cancelled}")
 
     return jsonify(
         {
             "success": True,
+            "cancelled": cancelled,
             "message": (
                 "Запрос на прерывание команды получен. Выполнение будет остановлено при первой"
                 " возможности."
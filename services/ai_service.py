@@ -1,8 +1,7 @@
 import json
 import logging
 import os
-import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 
 import requests
 from huggingface_hub import HfApi
@@ -10,20 +9,60 @@ from huggingface_hub import HfApi
 from config import Config
 from services.huggingface_service import HuggingFaceService
 
+from .http_client import get_http_client
+from .model_availability import ModelAvailabilityChecker, is_openai_model
+from .model_catalog import get_model_catalog
 from .model_inference_service import ModelInferenceService
+from .response_cache import ResponseCache
 
 # Глобальный экземпляр сервиса инференса
 _model_inference_service = None
 
+# Глобальный экземпляр сервиса проверки доступности моделей
+_availability_checker = None
+
+# Глобальный кэш ответов моделей
+_response_cache = None
+
 
 def get_model_inference_service():
     """Получить глобальный экземпляр сервиса инференса"""
     global _model_inference_service
     if _model_inference_service is None:
-        _model_inference_service = ModelInferenceService()
+        _model_inference_service = ModelInferenceService(
+            batch_max_size=Config.INFERENCE_BATCH_MAX_SIZE,
+            batch_max_wait=Config.INFERENCE_BATCH_MAX_WAIT,
+            memory_budget_mb=Config.MODEL_MEMORY_BUDGET_MB,
+            eviction_policy=Config.MODEL_EVICTION_POLICY,
+        )
     return _model_inference_service
 
 
+def get_availability_checker():
+    """Получить глобальный экземпляр сервиса проверки доступности моделей"""
+    global _availability_checker
+    if _availability_checker is None:
+        _availability_checker = ModelAvailabilityChecker(
+            max_workers=Config.MODEL_CHECK_MAX_WORKERS,
+            ttl=Config.MODEL_CHECK_TTL,
+            negative_ttl=Config.MODEL_CHECK_NEGATIVE_TTL,
+        )
+    return _availability_checker
+
+
+def get_response_cache():
+    """Получить глобальный кэш ответов моделей"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=Config.AI_CACHE_SIZE,
+            ttl=Config.AI_CACHE_TTL,
+            max_temperature=Config.AI_CACHE_MAX_TEMPERATURE,
+            disk_path=Config.AI_CACHE_DISK_PATH or None,
+        )
+    return _response_cache
+
+
 logger = logging.getLogger("neuro_assistant")
 
 # Инициализируем сервис Hugging Face
@@ -32,6 +71,15 @@ hf_service = HuggingFaceService()
 # Путь к файлу с информацией о моделях
 MODELS_INFO_FILE = os.path.join(Config.DATA_DIR, "ai_models.json")
 
+# OpenAI-совместимый endpoint HuggingFace Inference API и модель чата
+HF_CHAT_COMPLETIONS_URL = "https://router.huggingface.co/novita/v3/openai/chat/completions"
+HF_CHAT_MODEL = "deepseek/deepseek-v3-0324"
+
+
+def get_models_catalog():
+    """Получить общий каталог моделей, загруженный из MODELS_INFO_FILE"""
+    return get_model_catalog(MODELS_INFO_FILE, flush_delay=Config.MODELS_CATALOG_FLUSH_DELAY)
+
 
 def get_ai_models():
     """
@@ -41,23 +89,15 @@ def get_ai_models():
         Словарь с информацией о моделях
     """
     try:
+        catalog = get_models_catalog()
+
         # Проверяем существование файла с информацией о моделях
-        if not os.path.exists(MODELS_INFO_FILE):
+        if not catalog.exists():
             # Если файла нет, создаем его с базовыми моделями
             create_default_models_file()
 
-        # Читаем информацию о моделях из файла
-        with open(MODELS_INFO_FILE, "r", encoding="utf-8") as f:
-            models_data = json.load(f)
-
-        # Получаем текущую модель
-        current_model = get_current_ai_model()
-
-        # Обновляем статус "текущая модель"
-        for model in models_data.get("models", []):
-            model["is_current"] = current_model and model["id"] == current_model["id"]
-
-        return models_data
+        # Копия каталога из памяти с актуальным флагом is_current
+        return catalog.snapshot()
     except Exception as e:
         logger.error(f"Ошибка при получении списка AI-моделей: {str(e)}")
         return {"error": f"Ошибка при получении списка AI-моделей: {str(e)}", "models": []}
@@ -71,26 +111,13 @@ def get_current_ai_model():
         Словарь с информацией о текущей модели или None
     """
     try:
-        # Проверяем существование файла с информацией о моделях
-        if not os.path.exists(MODELS_INFO_FILE):
-            return None
-
-        # Читаем информацию о моделях из файла
-        with open(MODELS_INFO_FILE, "r", encoding="utf-8") as f:
-            models_data = json.load(f)
-
-        # Ищем текущую модель
-        for model in models_data.get("models", []):
-            if model.get("is_current", False):
-                return model
-
-        return None
+        return get_models_catalog().get_current()
     except Exception as e:
         logger.error(f"Ошибка при получении текущей AI-модели: {str(e)}")
         return None
 
 
-def check_ai_model_availability(model_id=None):
+def check_ai_model_availability(model_id=None, force=False):
     """
 
     Проверяет доступность нейросетей
@@ -98,97 +125,43 @@ def check_ai_model_availability(model_id=None):
     Args:
 
         model_id: ID конкретной модели для проверки (опционально)
+        force: Игнорировать кэш результатов предыдущих проверок
 
     Returns:
 
         dict: Результат проверки
     """
     try:
-        # Получаем список моделей
-        models_data = get_ai_models()
-        models = models_data.get("models", [])
-
         # Если указан конкретный ID модели
         if model_id:
             # Находим модель по ID
-            model = next((m for m in models if m["id"] == model_id), None)
+            model = get_models_catalog().get(model_id)
 
             if not model:
                 return {"success": False, "message": f"Модель с ID {model_id} не найдена"}
 
-            # Проверяем, является ли это моделью OpenAI
-            if (
-                model.get("api_type") == "openai"
-                or "openai" in model.get("huggingface_id", "").lower()
-            ):
-                # Проверяем наличие API ключа OpenAI
-                if not os.environ.get("OPENAI_API_KEY"):
-                    model["status"] = "unavailable"
-                    model["error"] = (
-                        "API ключ OpenAI не найден. Установите переменную окружения OPENAI_API_KEY."
-                    )
-
-                    # Сохраняем обновленный статус
-                    save_ai_models(models_data)
-
-                    return {
-                        "success": False,
-                        "model_name": model["name"],
-                        "message": model["error"],
-                    }
-
-                # Здесь можно добавить тестовый запрос к API OpenAI
-                # Для простоты просто отметим модель как доступную
-                model["status"] = "ready"
-                model["error"] = None
-
-                # Сохраняем обновленный статус
-                save_ai_models(models_data)
-
-                return {
-                    "success": True,
-                    "model_name": model["name"],
-                    "message": f"Модель {model['name']} доступна через API OpenAI",
-                }
-
-            # Для моделей Hugging Face Hub
-            try:
-                # Проверяем доступность модели
-                from huggingface_hub import model_info
-
-                # Получаем информацию о модели
-                info = model_info(model["huggingface_id"])
+            result = get_availability_checker().check(model, force=force)
 
-                if info:
-                    model["status"] = "ready"
-                    model["error"] = None
-                else:
-                    model["status"] = "unavailable"
-                    model["error"] = "Модель не найдена на Hugging Face Hub"
-
-                # Сохраняем обновленный статус
-                save_ai_models(models_data)
+            # Сохраняем обновленный статус
+            get_models_catalog().update_model(
+                model_id, {"status": result.status, "error": result.error}
+            )
 
+            if result.available:
+                via = " через API OpenAI" if is_openai_model(model) else ""
                 return {
                     "success": True,
                     "model_name": model["name"],
-                    "message": (
-                        "Модель"
-                        f" {model['name']} {'доступна' if model['status'] == 'ready' else 'недоступна'}"
-                    ),
+                    "message": f"Модель {model['name']} доступна{via}",
+                    "cached": result.cached,
                 }
-            except Exception as e:
-                model["status"] = "unavailable"
-                model["error"] = str(e)
 
-                # Сохраняем обновленный статус
-                save_ai_models(models_data)
-
-                return {
-                    "success": False,
-                    "model_name": model["name"],
-                    "message": f"Ошибка при проверке модели {model['name']}: {str(e)}",
-                }
+            return {
+                "success": False,
+                "model_name": model["name"],
+                "message": f"Ошибка при проверке модели {model['name']}: {result.error}",
+                "cached": result.cached,
+            }
 
         # Если ID не указан, проверяем все модели
         results = {
@@ -199,53 +172,12 @@ def check_ai_model_availability(model_id=None):
             "models_unavailable": 0,
         }
 
-        for model in models:
-            try:
-                # Проверяем модели OpenAI
-                if (
-                    model.get("api_type") == "openai"
-                    or "openai" in model.get("huggingface_id", "").lower()
-                ):
-                    if not os.environ.get("OPENAI_API_KEY"):
-                        model["status"] = "unavailable"
-                        model["error"] = "API ключ OpenAI не найден"
-                        results["models_unavailable"] += 1
-                    else:
-                        model["status"] = "ready"
-                        model["error"] = None
-                        results["models_available"] += 1
-
-                # Проверяем модели Hugging Face Hub
-                else:
-                    try:
-                        from huggingface_hub import model_info
-
-                        # Получаем информацию о модели
-                        info = model_info(model["huggingface_id"])
-
-                        if info:
-                            model["status"] = "ready"
-                            model["error"] = None
-                            results["models_available"] += 1
-                        else:
-                            model["status"] = "unavailable"
-                            model["error"] = "Модель не найдена на Hugging Face Hub"
-                            results["models_unavailable"] += 1
-                    except Exception as e:
-                        model["status"] = "unavailable"
-                        model["error"] = str(e)
-                        results["models_unavailable"] += 1
-
-                results["models_checked"] += 1
-            except Exception as e:
-                logger.error(f"Ошибка при проверке модели {model.get('name', 'unknown')}: {str(e)}")
-                model["status"] = "unavailable"
-                model["error"] = str(e)
+        for progress in iter_ai_model_availability(force=force):
+            results["models_checked"] = progress["checked"]
+            if progress["status"] == "ready":
+                results["models_available"] += 1
+            else:
                 results["models_unavailable"] += 1
-                results["models_checked"] += 1
-
-        # Сохраняем обновленный статус
-        save_ai_models(models_data)
 
         return results
     except Exception as e:
@@ -253,6 +185,39 @@ def check_ai_model_availability(model_id=None):
         return {"success": False, "message": f"Ошибка при проверке доступности моделей: {str(e)}"}
 
 
+def iter_ai_model_availability(force=False):
+    """
+    Проверяет все модели каталога параллельно и сообщает о прогрессе
+
+    Время полной проверки ограничено размером пула потоков, а не числом моделей;
+    результаты в пределах TTL берутся из кэша.
+
+    Args:
+        force: Игнорировать кэш результатов предыдущих проверок
+
+    Yields:
+        dict: Результат проверки очередной модели и общий прогресс
+    """
+    catalog = get_models_catalog()
+    models = [m for m in catalog.snapshot().get("models", []) if "id" in m]
+    total = len(models)
+
+    for checked, result in enumerate(
+        get_availability_checker().check_many(models, force=force), start=1
+    ):
+        # Обновляем статус в памяти; запись файла объединяется каталогом
+        catalog.update_model(result.model_id, {"status": result.status, "error": result.error})
+
+        yield {
+            "model_id": result.model_id,
+            "status": result.status,
+            "error": result.error,
+            "cached": result.cached,
+            "checked": checked,
+            "total": total,
+        }
+
+
 def select_ai_model(model_id):
     """
     Выбирает AI-модель для использования
@@ -264,16 +229,10 @@ def select_ai_model(model_id):
         Словарь с результатом операции
     """
     try:
-        # Получаем список моделей
-        models_data = get_ai_models()
-
-        if "error" in models_data:
-            return {"success": False, "message": models_data["error"]}
-
-        models = models_data.get("models", [])
+        catalog = get_models_catalog()
 
         # Ищем модель с указанным ID
-        model = next((m for m in models if m["id"] == model_id), None)
+        model = catalog.get(model_id)
 
         if not model:
             return {"success": False, "message": f"Модель с ID {model_id} не найдена"}
@@ -291,20 +250,16 @@ def select_ai_model(model_id):
                 ),
             }
 
-        # Обновляем статус всех моделей
-        for m in models:
-            m["is_current"] = m["id"] == model_id
+        # Обновляем текущую модель (запись на диск выполняется отложенно)
+        catalog.set_current(model_id)
 
-        # Сохраняем обновленную информацию
-        models_data["models"] = models
-        with open(MODELS_INFO_FILE, "w", encoding="utf-8") as f:
-            json.dump(models_data, f, ensure_ascii=False, indent=2)
-
-        # Предзагружаем модель и токенизатор
+        # Закрепляем текущую модель в памяти и загружаем её в фоне, следом -
+        # модель, которую обычно выбирают после неё
         try:
-            model_inference = get_model_inference_service()
-            model_inference.load_model(model["huggingface_id"])
-            model_inference.load_tokenizer(model["huggingface_id"])
+            huggingface_id = model["huggingface_id"]
+            model_inference.pin_model(huggingface_id)
+            model_inference.prefetch_model(huggingface_id)
+            model_inference.prefetch_likely_next(huggingface_id)
         except Exception as e:
             logger.warning(f"Предзагрузка модели {model['name']} не удалась: {str(e)}")
 
@@ -329,29 +284,12 @@ def update_model_status(model_id, status, error=None):
         error: Сообщение об ошибке (если есть)
     """
     try:
-        # Получаем список моделей
-        models_data = get_ai_models()
-
-        if "error" in models_data:
-            logger.error(f"Ошибка при обновлении статуса модели: {models_data['error']}")
-            return
-
-        models = models_data.get("models", [])
-
-        # Обновляем статус модели
-        for model in models:
-            if model["id"] == model_id:
-                model["status"] = status
-                if error:
-                    model["error"] = error
-                elif "error" in model:
-                    del model["error"]
-                break
-
-        # Сохраняем обновленную информацию
-        models_data["models"] = models
-        with open(MODELS_INFO_FILE, "w", encoding="utf-8") as f:
-            json.dump(models_data, f, ensure_ascii=False, indent=2)
+        # Обновляем статус модели в памяти; частые смены busy/ready объединяются
+        # в одну запись файла
+        if error:
+            get_models_catalog().update_model(model_id, {"status": status, "error": error})
+        else:
+            get_models_catalog().update_model(model_id, {"status": status}, remove_keys=("error",))
     except Exception as e:
         logger.error(f"Ошибка при обновлении статуса модели {model_id}: {str(e)}")
 
@@ -421,8 +359,7 @@ def create_default_models_file():
             logger.warning(f"Не удалось получить модели с Hugging Face Hub: {str(e)}")
 
         # Записываем в файл
-        with open(MODELS_INFO_FILE, "w", encoding="utf-8") as f:
-            json.dump(default_models, f, ensure_ascii=False, indent=4)
+        get_models_catalog().replace(default_models, flush=True)
 
         logger.info(f"Создан файл с информацией о моделях: {MODELS_INFO_FILE}")
         return True
@@ -447,9 +384,7 @@ def generate_text(prompt, max_length=100, model_id=None):
         # Получаем модель
         if model_id:
             # Ищем модель с указанным ID
-            models_data = get_ai_models()
-            models = models_data.get("models", [])
-            model = next((m for m in models if m["id"] == model_id), None)
+            model = get_models_catalog().get(model_id)
 
             if not model:
                 raise ValueError(f"Модель с ID {model_id} не найдена")
@@ -511,9 +446,7 @@ def generate_chat_response(messages, max_length=1000, model_id=None):
         # Получаем модель
         if model_id:
             # Ищем модель с указанным ID
-            models_data = get_ai_models()
-            models = models_data.get("models", [])
-            model = next((m for m in models if m["id"] == model_id), None)
+            model = get_models_catalog().get(model_id)
 
             if not model:
                 raise ValueError(f"Модель с ID {model_id} не найдена")
@@ -534,19 +467,7 @@ def generate_chat_response(messages, max_length=1000, model_id=None):
 
         try:
             # ✅ Формируем промпт из сообщений
-            prompt = ""
-            for message in messages:
-                role = message.get("role", "user")
-                content = message.get("content", "")
-
-                if role == "system":
-                    prompt += f"System: {content}\n\n"
-                elif role == "user":
-                    prompt += f"User: {content}\n\n"
-                elif role == "assistant":
-                    prompt += f"Assistant: {content}\n\n"
-
-            prompt += "Assistant: "
+            prompt = _build_chat_prompt(messages)
 
             # ✅ ИСПОЛЬЗУЕМ ModelInferenceService для генерации
             model_inference = get_model_inference_service()
@@ -573,6 +494,23 @@ def generate_chat_response(messages, max_length=1000, model_id=None):
         return f"Ошибка при генерации ответа: {str(e)}"
 
 
+def _build_chat_prompt(messages):
+    """Собирает промпт для completion-модели из сообщений чата"""
+    prompt = ""
+    for message in messages:
+        role = message.get("role", "user")
+        content = message.get("content", "")
+
+        if role == "system":
+            prompt += f"System: {content}\n\n"
+        elif role == "user":
+            prompt += f"User: {content}\n\n"
+        elif role == "assistant":
+            prompt += f"Assistant: {content}\n\n"
+
+    return prompt + "Assistant: "
+
+
 def search_models(query, limit=20):
     """
     Поиск моделей на Hugging Face Hub
@@ -639,16 +577,10 @@ def add_model(model_data):
             if field not in model_data:
                 return {"success": False, "message": f"Отсутствует обязательное поле: {field}"}
 
-        # Получаем список моделей
-        models_data = get_ai_models()
-
-        if "error" in models_data:
-            return {"success": False, "message": models_data["error"]}
-
-        models = models_data.get("models", [])
+        catalog = get_models_catalog()
 
         # Проверяем, что модель с таким ID не существует
-        if any(m["id"] == model_data["id"] for m in models):
+        if catalog.get(model_data["id"]) is not None:
             return {"success": False, "message": f"Модель с ID {model_data['id']} уже существует"}
 
         # Проверяем доступность модели на Hugging Face
@@ -669,13 +601,8 @@ def add_model(model_data):
         if not availability["available"] and "error" in availability:
             new_model["error"] = availability["error"]
 
-        # Добавляем модель в список
-        models.append(new_model)
-        models_data["models"] = models
-
-        # Сохраняем обновленную информацию
-        with open(MODELS_INFO_FILE, "w", encoding="utf-8") as f:
-            json.dump(models_data, f, ensure_ascii=False, indent=2)
+        # Добавляем модель в каталог
+        catalog.add_model(new_model)
 
         return {
             "success": True,
@@ -698,16 +625,10 @@ def remove_model(model_id):
         Словарь с результатом операции
     """
     try:
-        # Получаем список моделей
-        models_data = get_ai_models()
-
-        if "error" in models_data:
-            return {"success": False, "message": models_data["error"]}
-
-        models = models_data.get("models", [])
+        catalog = get_models_catalog()
 
         # Ищем модель с указанным ID
-        model = next((m for m in models if m["id"] == model_id), None)
+        model = catalog.get(model_id)
 
         if not model:
             return {"success": False, "message": f"Модель с ID {model_id} не найдена"}
@@ -719,13 +640,8 @@ def remove_model(model_id):
                 "message": "Нельзя удалить текущую модель. Сначала выберите другую модель.",
             }
 
-        # Удаляем модель из списка
-        models = [m for m in models if m["id"] != model_id]
-        models_data["models"] = models
-
-        # Сохраняем обновленную информацию
-        with open(MODELS_INFO_FILE, "w", encoding="utf-8") as f:
-            json.dump(models_data, f, ensure_ascii=False, indent=2)
+        # Удаляем модель из каталога
+        catalog.remove_model(model_id)
 
         return {
             "success": True,
@@ -737,20 +653,28 @@ def remove_model(model_id):
         return {"success": False, "message": f"Ошибка при удалении модели: {str(e)}"}
 
 
-def get_ai_response(prompt, system_message=None):
+def get_ai_response(prompt, system_message=None, temperature=None):
     """
     Получает ответ от AI-модели через HuggingFace Inference API
 
     Args:
         prompt: Запрос пользователя
         system_message: Системное сообщение (опционально)
+        temperature: Temperature генерации; None - значение провайдера по умолчанию.
+            Ответы с низкой temperature кэшируются (см. get_huggingface_response)
 
     Returns:
         Ответ от AI-модели
     """
     try:
+        # Формируем сообщения для чата
+        messages = []
+        if system_message:
+            messages.append({"role": "system", "content": system_message})
+        messages.append({"role": "user", "content": prompt})
+
         # Сначала пробуем HuggingFace Inference API
-        hf_response = get_huggingface_response(prompt, system_message)
+        hf_response = get_huggingface_response(messages, temperature=temperature)
         if hf_response:
             return hf_response
 
@@ -759,12 +683,6 @@ def get_ai_response(prompt, system_message=None):
         if not current_model:
             return "Ошибка: Не выбрана модель AI. Пожалуйста, выберите модель в настройках."
 
-        # Формируем сообщения для чата
-        messages = []
-        if system_message:
-            messages.append({"role": "system", "content": system_message})
-        messages.append({"role": "user", "content": prompt})
-
         # Определяем тип модели и вызываем соответствующую функцию
         if current_model.get("type") == "chat":
             return generate_chat_response(messages)
@@ -781,11 +699,43 @@ def get_ai_response(prompt, system_message=None):
         return f"Ошибка при получении ответа от AI: {str(e)}"
 
 
-def get_huggingface_response(messages: list, debug_info: dict | None = None) -> Optional[str]:
-    """Inference API с правильным endpoint из документации"""
+def get_huggingface_response(
+    messages: list, debug_info: dict | None = None, temperature: float | None = None
+) -> Optional[str]:
+    """
+    Inference API с правильным endpoint из документации
+
+    Если temperature передана, она отправляется в запросе. Детерминированные
+    вызовы (temperature не выше AI_CACHE_MAX_TEMPERATURE) в пределах
+    AI_CACHE_TTL отдаются из кэша ответов; без temperature провайдер
+    сэмплирует, и такие (диалоговые) ответы не кэшируются.
+    """
     if debug_info is None:
         debug_info = {}
 
+    params = {"temperature": temperature} if temperature is not None else None
+    cache = get_response_cache()
+    if not cache.is_cacheable(params):
+        debug_info["cache"] = "bypass"
+        return _request_huggingface_response(messages, debug_info, params)
+
+    requested = []
+
+    def request_model():
+        requested.append(True)
+        return _request_huggingface_response(messages, debug_info, params)
+
+    response = cache.get_or_compute(HF_CHAT_MODEL, messages, params, request_model)
+    debug_info["cache"] = "miss" if requested else "hit"
+    if response and not requested:
+        debug_info["success"] = True
+    return response
+
+
+def _request_huggingface_response(
+    messages: list, debug_info: dict, params: dict | None = None
+) -> Optional[str]:
+    """Запрос к HuggingFace Inference API без кэша"""
     try:
         api_key = Config.HUGGINGFACE_TOKEN
         debug_info["api_key_check"] = "PRESENT" if api_key else "MISSING"
@@ -796,10 +746,10 @@ def get_huggingface_response(messages: list, debug_info: dict | None = None) ->
             return None
 
         # Правильный endpoint из документации
-        api_url = "https://router.huggingface.co/novita/v3/openai/chat/completions"
+        api_url = HF_CHAT_COMPLETIONS_URL
         headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
 
-        payload = {"messages": messages, "model": "deepseek/deepseek-v3-0324", "stream": False}
+        payload = {"messages": messages, "model": HF_CHAT_MODEL, "stream": False, **(params or {})}
 
         debug_info["request"] = {
             "url": api_url,
@@ -807,7 +757,7 @@ def get_huggingface_response(messages: list, debug_info: dict | None = None) ->
             "messages_count": len(messages),
         }
 
-        response = requests.post(api_url, headers=headers, json=payload, timeout=30)
+        response = get_http_client().post(api_url, headers=headers, json=payload, timeout=30)
 
         debug_info["response"] = {
             "status": response.status_code,
@@ -867,68 +817,58 @@ def _call_huggingface_api(model_name: str, prompt: str, max_retries: int = 3) ->
 
     logger.info(f"📦 Payload: {payload}")
 
-    for attempt in range(max_retries):
-        try:
-            logger.info(f"🔄 Попытка {attempt + 1}/{max_retries}")
-
-            response = requests.post(api_url, headers=headers, json=payload, timeout=30)
-
-            logger.info(f"📊 Статус ответа: {response.status_code}")
-            logger.info(f"📋 Заголовки ответа: {dict(response.headers)}")
-
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"✅ Успешный JSON ответ: {result}")
-
-                # Обработка разных форматов ответов
-                if isinstance(result, list) and len(result) > 0:
-                    if "generated_text" in result[0]:
-                        generated = result[0]["generated_text"]
-                        # Убираем исходный промпт из ответа
-                        if generated.startswith(prompt):
-                            generated = generated[len(prompt) :].strip()
-                        logger.info(f"🎯 Финальный ответ: {generated}")
-                        return generated[:500]  # Ограничиваем длину
-                    elif "text" in result[0]:
-                        return result[0]["text"][:500]
-                elif isinstance(result, dict):
-                    if "generated_text" in result:
-                        return result["generated_text"][:500]
-                    elif "text" in result:
-                        return result["text"][:500]
-
-                logger.warning("⚠️ Неизвестный формат ответа")
-                return "Модель вернула некорректный формат ответа"
-
-            elif response.status_code == 503:
-                logger.info(f"⏳ Модель {model_name} загружается, ждем...")
-                time.sleep(5)
-                continue
+    try:
+        # Повторы при 503 (модель загружается), 429 и сетевых сбоях выполняет
+        # общий HTTP-клиент: с экспоненциальной задержкой и учётом Retry-After
+        response = get_http_client().post(
+            api_url, headers=headers, json=payload, timeout=30, max_retries=max_retries - 1
+        )
 
-            elif response.status_code == 429:
-                logger.warning(f"⚠️ Превышен лимит для модели {model_name}")
-                time.sleep(2)
-                continue
+        logger.info(f"📊 Статус ответа: {response.status_code}")
+        logger.info(f"📋 Заголовки ответа: {dict(response.headers)}")
 
-            else:
-                error_text = response.text
-                logger.error(f"❌ HuggingFace API ошибка {response.status_code}: {error_text}")
-                return None
-
-        except requests.exceptions.Timeout:
-            logger.warning(f"⏰ Таймаут для модели {model_name}, попытка {attempt + 1}")
-            if attempt < max_retries - 1:
-                time.sleep(2)
-                continue
-        except requests.exceptions.RequestException as e:
-            logger.error(f"🌐 Ошибка сети для {model_name}: {e}")
+        if response.status_code == 200:
+            result = response.json()
+            logger.info(f"✅ Успешный JSON ответ: {result}")
+
+            # Обработка разных форматов ответов
+            if isinstance(result, list) and len(result) > 0:
+                if "generated_text" in result[0]:
+                    generated = result[0]["generated_text"]
+                    # Убираем исходный промпт из ответа
+                    if generated.startswith(prompt):
+                        generated = generated[len(prompt) :].strip()
+                    logger.info(f"🎯 Финальный ответ: {generated}")
+                    return generated[:500]  # Ограничиваем длину
+                elif "text" in result[0]:
+                    return result[0]["text"][:500]
+            elif isinstance(result, dict):
+                if "generated_text" in result:
+                    return result["generated_text"][:500]
+                elif "text" in result:
+                    return result["text"][:500]
+
+            logger.warning("⚠️ Неизвестный формат ответа")
+            return "Модель вернула некорректный формат ответа"
+
+        elif response.status_code in (429, 503):
+            logger.error(f"❌ Все попытки исчерпаны для модели {model_name}")
             return None
-        except Exception as e:
-            logger.error(f"❌ Неожиданная ошибка для {model_name}: {e}")
+
+        else:
+            error_text = response.text
+            logger.error(f"❌ HuggingFace API ошибка {response.status_code}: {error_text}")
             return None
 
-    logger.error(f"❌ Все попытки исчерпаны для модели {model_name}")
-    return None
+    except requests.exceptions.Timeout:
+        logger.error(f"⏰ Таймаут для модели {model_name}, все попытки исчерпаны")
+        return None
+    except requests.exceptions.RequestException as e:
+        logger.error(f"🌐 Ошибка сети для {model_name}: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"❌ Неожиданная ошибка для {model_name}: {e}")
+        return None
 
 
 def get_simple_ai_response(
@@ -968,6 +908,127 @@ def get_simple_ai_response(
         return f"❌ Ошибка AI сервиса: {str(e)}"
 
 
+def stream_ai_response(messages: list, max_length: int = 1000) -> Iterator[str]:
+    """
+    Потоковый вариант get_simple_ai_response: отдаёт ответ по мере генерации
+
+    Модели OpenAI и локально загруженные HF модели генерируют через
+    ModelInferenceService, остальные - через HuggingFace Inference API.
+    Проверки выполняются до первого фрагмента, поэтому ошибка доступности
+    возникает сразу при вызове, а не посреди ответа.
+
+    Args:
+        messages: Список сообщений в формате [{"role": "user", "content": "..."}, ...]
+        max_length: Максимальная длина генерируемого текста
+
+    Returns:
+        Iterator[str]: Фрагменты ответа
+
+    Raises:
+        RuntimeError: Если AI сервис недоступен
+    """
+    current_model = get_current_ai_model()
+    if not current_model:
+        raise RuntimeError("AI сервис недоступен: модель не выбрана")
+
+    if current_model.get("status") != "ready":
+        raise RuntimeError(f"AI сервис недоступен: модель '{current_model.get('name')}' недоступна")
+
+    model_inference = get_model_inference_service()
+    huggingface_id = current_model.get("huggingface_id", "")
+
+    if is_openai_model(current_model) or huggingface_id in model_inference.loaded_models:
+        return _stream_model_inference(
+            model_inference, current_model["id"], huggingface_id, messages, max_length
+        )
+
+    if not Config.HUGGINGFACE_TOKEN:
+        raise RuntimeError("AI сервис недоступен: токен не настроен")
+
+    return stream_huggingface_response(messages)
+
+
+def _stream_model_inference(
+    model_inference, model_id: str, huggingface_id: str, messages: list, max_length: int
+) -> Iterator[str]:
+    """
+    Потоковая генерация через ModelInferenceService
+
+    Статус модели в каталоге не переводится в "busy": поток может длиться
+    долго или быть прерван клиентом (GeneratorExit при закрытии SSE), и на
+    это время модель стала бы недоступной для всех остальных запросов.
+    Статус меняется только на "error" при ошибке генерации.
+    """
+    try:
+        yield from model_inference.stream_text(
+            model_id=huggingface_id,
+            prompt=_build_chat_prompt(messages),
+            max_length=max_length,
+            temperature=0.7,
+            top_p=0.9,
+        )
+    except Exception as e:
+        update_model_status(model_id, "error", str(e))
+        raise
+
+
+def stream_huggingface_response(messages: list, timeout: float = 60) -> Iterator[str]:
+    """
+    Потоковый запрос к HuggingFace Inference API ("stream": true)
+
+    Ответ приходит как Server-Sent Events в формате OpenAI chat completions;
+    из каждого события берётся choices[0].delta.content.
+
+    Yields:
+        str: Очередной фрагмент ответа
+
+    Raises:
+        RuntimeError: Если API вернул ошибку
+    """
+    headers = {
+        "Authorization": f"Bearer {Config.HUGGINGFACE_TOKEN}",
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+    }
+    payload = {"messages": messages, "model": HF_CHAT_MODEL, "stream": True}
+
+    # Повторы возможны только до начала ответа: клиент возвращает его сразу после
+    # заголовков, тело читается ниже по мере поступления
+    response = get_http_client().post(
+        HF_CHAT_COMPLETIONS_URL, headers=headers, json=payload, timeout=timeout, stream=True
+    )
+
+    with response:
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+        # Декодируем построчно сами: для text/event-stream без charset
+        # requests не знает кодировку и decode_unicode вернул бы байты
+        for raw_line in response.iter_lines():
+            line = raw_line.decode("utf-8", errors="replace")
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:") :].strip()
+            if data == "[DONE]":
+                break
+
+            try:
+                event = json.loads(data)
+            except ValueError:
+                logger.warning(f"Некорректное событие потока HuggingFace: {data[:200]}")
+                continue
+
+            if "error" in event:
+                raise RuntimeError(f"HuggingFace API: {event['error']}")
+
+            choices = event.get("choices") or []
+            if not choices:
+                continue
+            content = (choices[0].get("delta") or {}).get("content")
+            if content:
+                yield content
+
+
 def get_fallback_response(messages: list) -> str:
     """
     Генерирует простой резервный ответ когда AI недоступен
@@ -1071,13 +1132,14 @@ def update_models_from_huggingface():
         dict: Результат операции
     """
     try:
+        catalog = get_models_catalog()
+
         # Проверяем существование файла с моделями
-        if not os.path.exists(MODELS_INFO_FILE):
+        if not catalog.exists():
             create_default_models_file()
 
         # Получаем текущий список моделей
-        with open(MODELS_INFO_FILE, "r", encoding="utf-8") as f:
-            models_data = json.load(f)
+        models_data = catalog.snapshot()
 
         current_models = models_data.get("models", [])
 
@@ -1095,8 +1157,7 @@ def update_models_from_huggingface():
                 added_count += 1
 
         # Сохраняем обновленный список моделей
-        with open(MODELS_INFO_FILE, "w", encoding="utf-8") as f:
-            json.dump({"models": current_models}, f, ensure_ascii=False, indent=4)
+        catalog.replace({"models": current_models})
 
         return {
             "success": True,
@@ -1120,8 +1181,8 @@ def save_ai_models(models_data):
         bool: Результат операции
     """
     try:
-        with open(MODELS_INFO_FILE, "w", encoding="utf-8") as f:
-            json.dump(models_data, f, ensure_ascii=False, indent=4)
+        # Запись на диск выполняется каталогом отложенно и атомарно
+        get_models_catalog().replace(models_data)
         return True
     except Exception as e:
         logger.error(f"Ошибка при сохранении информации о моделях: {str(e)}")
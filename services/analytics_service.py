@@ -1,11 +1,11 @@
 import datetime
 import logging
-import os
 from pathlib import Path
 
 import psutil
 
 from config import Config
+from services.command_stats import get_command_stats_aggregator
 
 logger = logging.getLogger("neuro_assistant")
 
@@ -84,40 +84,9 @@ class AnalyticsService:
             return {}
 
     def _get_commands_statistics(self):
-        """Статистика команд из логов"""
+        """Статистика команд из логов (читаются только новые записи журнала)"""
         try:
-            if not os.path.exists(self.config.SUMMARY_LOG_FILE):
-                return {"total": 0, "successful": 0, "failed": 0, "popular": []}
-
-            # Простая статистика из логов
-            total_commands = 0
-            successful_commands = 0
-            failed_commands = 0
-            command_counts = {}
-
-            with open(self.config.SUMMARY_LOG_FILE, "r", encoding="utf-8", errors="ignore") as f:
-                for line in f:
-                    if "Команда:" in line:
-                        total_commands += 1
-                        command = line.split("Команда:")[1].strip()
-                        command_counts[command] = command_counts.get(command, 0) + 1
-                    elif "Статус: completed" in line:
-                        successful_commands += 1
-                    elif "Статус: failed" in line:
-                        failed_commands += 1
-
-            # Топ-5 популярных команд
-            popular_commands = sorted(command_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-
-            return {
-                "total": total_commands,
-                "successful": successful_commands,
-                "failed": failed_commands,
-                "success_rate": (
-                    (successful_commands / total_commands * 100) if total_commands > 0 else 0
-                ),
-                "popular": [{"command": cmd, "count": count} for cmd, count in popular_commands],
-            }
+            return get_command_stats_aggregator().get_statistics()
         except Exception as e:
             logger.error(f"Ошибка получения статистики команд: {e}")
             return {"total": 0, "successful": 0, "failed": 0, "popular": []}
@@ -0,0 +1,241 @@
+"""
+Очередь фоновых заданий выполнения команд.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("neuro_assistant")
+
+# Статусы, после которых задание больше не меняется
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class CancellationToken:
+    """Признак отмены одного задания."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Запрашивает отмену"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class JobQueueFull(Exception):
+    """В очереди нет места для нового задания"""
+
+
+@dataclass
+class CommandJob:
+    """Задание на выполнение команды и его текущее состояние."""
+
+    id: str
+    command_text: str
+    created_at: float
+    status: str = "queued"  # 'queued', 'running', 'completed', 'failed', 'cancelled'
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: Optional[Dict[str, Any]] = None  # Последний снимок CommandExecution
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    version: int = 0  # Увеличивается при каждом изменении
+    token: CancellationToken = field(default_factory=CancellationToken, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразует задание в словарь для JSON-сериализации"""
+        return {
+            "job_id": self.id,
+            "command_text": self.command_text,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "version": self.version,
+        }
+
+
+class CommandJobQueue:
+    """
+    Очередь заданий с ограниченным пулом исполнителей.
+
+    submit() сразу возвращает задание; команда выполняется функцией run(job,
+    token, report) в одном из max_workers потоков. report(progress) сохраняет
+    снимок прогресса, wait() позволяет дождаться следующего изменения задания.
+    У каждого задания свой CancellationToken, поэтому отмена одного задания
+    не затрагивает другие. Завершённые задания хранятся до keep_finished штук.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[CommandJob, CancellationToken, Callable[[Dict[str, Any]], None]], Any],
+        max_workers: int = 2,
+        max_pending: int = 32,
+        keep_finished: int = 100,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            run: Функция выполнения задания; возвращает результат задания
+            max_workers: Число одновременно выполняемых заданий
+            max_pending: Наибольшее число ожидающих заданий
+            keep_finished: Сколько завершённых заданий хранить для запросов статуса
+            clock: Источник времени (подменяется в тестах)
+        """
+        self._run = run
+        self.max_pending = max(1, max_pending)
+        self.keep_finished = max(1, keep_finished)
+        self._clock = clock
+
+        self._jobs: "OrderedDict[str, CommandJob]" = OrderedDict()
+        self._changed = threading.Condition()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="command-job"
+        )
+
+    def submit(self, command_text: str) -> CommandJob:
+        """
+        Ставит команду в очередь
+
+        Raises:
+            JobQueueFull: Если ожидающих заданий уже max_pending
+        """
+        with self._changed:
+            pending = sum(1 for job in self._jobs.values() if job.status == "queued")
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"В очереди уже {pending} заданий")
+
+            job = CommandJob(
+                id=uuid.uuid4().hex, command_text=command_text, created_at=self._clock()
+            )
+            self._jobs[job.id] = job
+            self._prune()
+
+        self._executor.submit(self._execute, job)
+        logger.info(f"Задание {job.id} поставлено в очередь: {command_text}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Возвращает снимок задания или None"""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Отменяет задание
+
+        Ожидающее задание отменяется сразу, выполняющееся - при следующей
+        проверке токена. Returns: False, если задание не найдено или завершено.
+        """
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.token.cancel()
+            if job.status == "queued":
+                self._finish(job, "cancelled", error="Задание отменено до начала выполнения")
+        logger.info(f"Запрошена отмена задания {job_id}")
+        return True
+
+    def cancel_all(self) -> int:
+        """Отменяет все незавершённые задания; возвращает их число"""
+        with self._changed:
+            job_ids = [job.id for job in self._jobs.values() if not job.finished]
+        return sum(self.cancel(job_id) for job_id in job_ids)
+
+    def wait(self, job_id: str, version: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Ждёт изменения задания после версии version
+
+        Returns:
+            dict: Снимок задания; None, если задание не найдено или время ожидания вышло
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                if job.version > version:
+                    return job.to_dict()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._changed.wait(remaining)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Возвращает число заданий по статусам"""
+        stats = {"queued": 0, "running": 0, "completed": 0, "failed": 0, "cancelled": 0}
+        with self._changed:
+            for job in self._jobs.values():
+                stats[job.status] += 1
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Отменяет задания и останавливает исполнителей"""
+        self.cancel_all()
+        self._executor.shutdown(wait=wait)
+
+    def _execute(self, job: CommandJob):
+        """Выполняет задание в потоке пула"""
+        with self._changed:
+            if job.finished:
+                return
+            job.status = "running"
+            job.started_at = self._clock()
+            self._touch(job)
+
+        def report(progress: Dict[str, Any]):
+            with self._changed:
+                job.progress = progress
+                self._touch(job)
+
+        try:
+            result = self._run(job, job.token, report)
+        except Exception as e:
+            logger.error(f"Ошибка выполнения задания {job.id}: {e}", exc_info=True)
+            with self._changed:
+                self._finish(job, "failed", error=str(e))
+            return
+
+        with self._changed:
+            status = "cancelled" if job.token.cancelled else "completed"
+            self._finish(job, status, result=result)
+
+    def _finish(self, job: CommandJob, status: str, result=None, error=None):
+        """Завершает задание (вызывается под блокировкой)"""
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = self._clock()
+        self._touch(job)
+        self._prune()
+
+    def _touch(self, job: CommandJob):
+        """Отмечает изменение задания и будит ожидающих (вызывается под блокировкой)"""
+        job.version += 1
+        self._changed.notify_all()
+
+    def _prune(self):
+        """Удаляет самые старые завершённые задания сверх keep_finished"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
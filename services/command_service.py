@@ -1,14 +1,29 @@
 import datetime
+import hashlib
 import logging
 import re
+import threading
+import time
 import traceback
+import types
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import win32gui
 
-from commands import COMMAND_ALIASES, COMMANDS, get_command_function
-from models.command_models import CommandExecution, CommandStep
+from commands import find_command, get_command_function
+from config import Config
+from models.command_models import CommandExecution
 from services.ai_service import get_ai_response
-from utils.helpers import add_interrupt_checks, extract_code_from_response, extract_math_expression
+from services.feasibility import get_feasibility_classifier
+from services.step_planner import plan_steps, step_levels
+from utils.helpers import (
+    CommandInterrupted,
+    add_interrupt_checks,
+    extract_code_from_response,
+    extract_math_expression,
+    interruptible,
+)
 from utils.logging_utils import log_execution_summary
 
 logger = logging.getLogger("neuro_assistant")
@@ -17,70 +32,25 @@ detailed_logger = logging.getLogger("detailed_log")
 # Глобальный флаг для прерывания выполнения команды
 command_interrupt_flag = False
 
+# Базовое пространство имён для execute_python_code (собирается при первом вызове
+# и заново после перезагрузки команд) и номер загрузки команд, из которой оно собрано
+_base_namespace = None
+_base_namespace_generation = None
+
+# Кэш скомпилированного кода команд: хэш исходного кода -> объект кода
+CODE_CACHE_SIZE = 256
+_code_cache = OrderedDict()
+_code_cache_lock = threading.Lock()
+
 
 def is_command_feasible(command_text):
     """
     Определяет, целесообразно ли выполнение команды
-    """
-    # Список потенциально опасных или нецелесообразных команд
-    dangerous_keywords = [
-        "удали",
-        "delete",
-        "format",
-        "форматир",
-        "rm -rf",
-        "shutdown",
-        "выключ",
-        "reboot",
-        "перезагруз",
-    ]
-
-    # Проверяем наличие опасных ключевых слов
-    for keyword in dangerous_keywords:
-        if keyword in command_text.lower():
-            # Для некоторых команд требуется дополнительное подтверждение
-            if keyword in ["shutdown", "выключ", "reboot", "перезагруз"]:
-                return {
-                    "feasible": True,
-                    "requires_confirmation": True,
-                    "reason": f"Команда '{keyword}' требует подтверждения пользователя",
-                }
-
-            # Для действительно опасных команд возвращаем запрет
-            if keyword in ["удали", "delete", "format", "форматир", "rm -rf"]:
-                return {
-                    "feasible": False,
-                    "reason": (
-                        f"Команда '{keyword}' потенциально опасна и не может быть выполнена"
-                        " автоматически"
-                    ),
-                }
-
-    # Проверяем на сложность и длительность выполнения
-    complex_keywords = [
-        "установи",
-        "install",
-        "скачай",
-        "download",
-        "обнови",
-        "update",
-        "компилируй",
-        "compile",
-    ]
-
-    for keyword in complex_keywords:
-        if keyword in command_text.lower():
-            return {
-                "feasible": True,
-                "requires_confirmation": True,
-                "reason": (
-                    f"Команда '{keyword}' может занять продолжительное время. Требуется"
-                    " подтверждение."
-                ),
-            }
 
-    # По умолчанию считаем команду выполнимой
-    return {"feasible": True, "requires_confirmation": False}
+    Правила (опасные и длительные операции) задаются в Config.FEASIBILITY_RULES
+    и проверяются за один проход; вердикты кэшируются по тексту команды.
+    """
+    return get_feasibility_classifier().classify(command_text)
 
 
 def process_command(text):
@@ -101,24 +71,14 @@ def process_command(text):
         # Но пока просто продолжаем выполнение
         logger.info(f"Команда требует подтверждения: {feasibility.get('reason', '')}")
 
-    # Ищем соответствие команды с известными командами
+    # Ищем соответствие команды с известными командами и их алиасами
     command_function = None
     command_name = None
 
-    # Проверяем полное совпадение или вхождение команды
-    for cmd_text in COMMANDS:
-        if cmd_text == text or cmd_text in text:
-            command_function = get_command_function(cmd_text)
-            command_name = cmd_text
-            break
-
-    # Если не нашли по основным командам, проверяем алиасы
-    if not command_function:
-        for alias in COMMAND_ALIASES:
-            if alias == text or alias in text:
-                command_function = get_command_function(alias)
-                command_name = COMMAND_ALIASES[alias]  # Получаем оригинальное имя команды
-                break
+    match = find_command(text)
+    if match:
+        command_function = get_command_function(match.pattern)
+        command_name = match.command  # Для алиаса - оригинальное имя команды
 
     if command_function:
         # Особая обработка для команды "сказать"
@@ -139,35 +99,38 @@ def process_command(text):
         return f"Выполняю команду: {command_name}", code
 
     # Если команда не распознана, отправляем запрос к нейросети
-    # для генерации кода на основе текста
-    response = get_ai_response(text)
+    # для генерации кода на основе текста (детерминированно - ответ кэшируется)
+    response = get_ai_response(text, temperature=0)
     code = extract_code_from_response(response)
 
     return response, code
 
 
-def execute_python_code(code):
-    """Выполнить Python код и вернуть результат"""
-    # Не нужно объявлять command_interrupt_flag как global, если мы её только читаем
-    try:
-        # Импортируем все доступные команды
+def _get_base_namespace():
+    """
+    Возвращает неизменяемое базовое пространство имён для выполнения кода
+
+    Модули и функции команд собираются один раз; для каждого вызова
+    достаточно скопировать готовый словарь. После load_command_modules
+    словарь собирается заново, чтобы код видел новые функции команд.
+    """
+    global _base_namespace, _base_namespace_generation
+    from commands import get_commands_generation
+
+    generation = get_commands_generation()
+    if _base_namespace is None or _base_namespace_generation != generation:
         import os
-        import re
         import time
 
-        # Создаем локальный словарь с разрешенными функциями
         import pyautogui
         import pyperclip
         import pyttsx3
         import win32api
         import win32con
-        import win32gui
 
-        # Импортируем все модули команд динамически
         from commands import COMMANDS
 
-        # Создаем словарь для локальных переменных выполнения
-        local_dict = {
+        namespace = {
             "pyautogui": pyautogui,
             "os": os,
             "time": time,
@@ -182,27 +145,89 @@ def execute_python_code(code):
             "detailed_logger": detailed_logger,
             # Добавляем функцию для проверки прерывания
             "check_interrupt": lambda: command_interrupt_flag,
+            # Точки прерывания, вставляемые add_interrupt_checks
+            "interrupt_point": _interrupt_point,
+            "interruptible": interruptible,
         }
 
-        # Добавляем все функции команд в локальный словарь выполнения
-        for cmd_name, cmd_func in COMMANDS.items():
-            local_dict[cmd_func.__name__] = cmd_func
+        # Добавляем все функции команд в словарь выполнения
+        for cmd_func in COMMANDS.values():
+            namespace[cmd_func.__name__] = cmd_func
+
+        _base_namespace = types.MappingProxyType(namespace)
+        _base_namespace_generation = generation
+    return _base_namespace
+
 
-        # Модифицируем код, добавляя проверки прерывания
-        modified_code = add_interrupt_checks(code)
+def is_interrupted(token=None):
+    """Проверяет, прервано ли выполнение: общим флагом или токеном отмены задания"""
+    return command_interrupt_flag or (token is not None and token.cancelled)
+
+
+def _interrupt_point(token=None):
+    """Прерывает выполнение кода команды, если выполнение прервано"""
+    if is_interrupted(token):
+        raise CommandInterrupted()
+
+
+def _compile_code(code):
+    """
+    Возвращает скомпилированный код с проверками прерывания
+
+    Результат кэшируется по хэшу исходного кода, поэтому повторяющиеся команды
+    не проходят переписывание и компиляцию заново.
+    """
+    key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+    with _code_cache_lock:
+        compiled = _code_cache.get(key)
+        if compiled is not None:
+            _code_cache.move_to_end(key)
+            return compiled
+
+    # Модифицируем код, добавляя проверки прерывания
+    instrumented = add_interrupt_checks(code, every=Config.INTERRUPT_CHECK_EVERY)
+    compiled = compile(instrumented, "<command>", "exec")
+
+    with _code_cache_lock:
+        _code_cache[key] = compiled
+        if len(_code_cache) > CODE_CACHE_SIZE:
+            _code_cache.popitem(last=False)
+    return compiled
+
+
+def execute_python_code(code, token=None):
+    """
+    Выполнить Python код и вернуть результат
+
+    Args:
+        code: Код для выполнения
+        token: Токен отмены задания (CancellationToken); без него код
+            прерывается только общим флагом command_interrupt_flag
+    """
+    try:
+        # Копия базового словаря с разрешенными модулями и функциями команд
+        local_dict = dict(_get_base_namespace())
+        if token is not None:
+            local_dict["check_interrupt"] = lambda: is_interrupted(token)
+            local_dict["interrupt_point"] = lambda: _interrupt_point(token)
+
+        compiled = _compile_code(code)
 
         # Выполняем код в изолированном пространстве
-        exec(modified_code, {"__builtins__": {}}, local_dict)
+        exec(compiled, {"__builtins__": {}}, local_dict)
 
         # Проверяем, был ли возвращен результат из кода
         if "result" in local_dict:
             return local_dict["result"]
 
         # Проверяем, было ли прерывание
-        if command_interrupt_flag:
+        if is_interrupted(token):
             return "Выполнение прервано пользователем"
 
         return "Код успешно выполнен"
+    except CommandInterrupted:
+        detailed_logger.info("Выполнение кода прервано пользователем")
+        return "Выполнение прервано пользователем"
     except Exception as e:
         traceback_str = traceback.format_exc()
         detailed_logger.error(f"Ошибка при выполнении кода: {str(e)}\n{traceback_str}")
@@ -252,183 +277,228 @@ def execute_command_with_error_handling(command_text, code):
 def parse_compound_command(text):
     """
     Разбирает составную команду на отдельные шаги
-    Возвращает список шагов и общее описание команды
+    Возвращает список шагов (с зависимостями) и общее описание команды
     """
     text = text.lower()
-    steps = []
-
-    # Ищем разделители составных команд
-    separators = [" и ", " затем ", " после этого ", " потом ", ", "]
-
-    # Пытаемся разбить команду по разделителям
-    command_parts = [text]
-    for separator in separators:
-        new_parts = []
-        for part in command_parts:
-            if separator in part:
-                new_parts.extend(part.split(separator))
-            else:
-                new_parts.append(part)
-        command_parts = new_parts
-
-    # Удаляем дубликаты и пустые строки
-    command_parts = [part.strip() for part in command_parts if part.strip()]
-    command_parts = list(dict.fromkeys(command_parts))
-
-    # Создаем шаги для каждой части команды
-    for i, part in enumerate(command_parts):
-        steps.append(
-            CommandStep(
-                step_number=i + 1, description=part, status="pending", completion_percentage=0.0
-            )
-        )
-
-    return steps, text
+    return plan_steps(text), text
 
 
-def execute_command_with_steps(command_text, code=None):
+def _generate_step_codes(steps, executor):
     """
-    Выполняет команду по шагам, проверяя результат каждого шага
-    и информируя пользователя о ходе выполнения
+    Генерирует код для всех шагов одновременно
+
+    Шаги, не распознанные как команды, требуют запроса к нейросети; запросы
+    выполняются параллельно, а не по очереди перед каждым шагом.
+
+    Returns:
+        dict: Номер шага -> Future с результатом process_single_step
     """
-    global command_interrupt_flag
 
-    # Сбрасываем флаг прерывания
-    command_interrupt_flag = False
+    def generate(step):
+        started = time.perf_counter()
+        try:
+            return process_single_step(step.description)
+        finally:
+            step.generation_time = time.perf_counter() - started
 
-    # Разбираем команду на шаги
-    steps, full_command = parse_compound_command(command_text)
+    return {step.step_number: executor.submit(generate, step) for step in steps}
 
-    # Создаем запись о выполнении команды
-    execution = CommandExecution(
-        command_text=full_command, steps=steps, start_time=datetime.datetime.now().isoformat()
-    )
 
-    # Логируем начало выполнения команды
-    detailed_logger.info(f"Начало выполнения команды: {full_command}")
-    detailed_logger.info(f"Количество шагов: {len(steps)}")
+def _mark_interrupted(step, message="Шаг {} прерван пользователем"):
+    """Помечает шаг прерванным"""
+    step.status = "interrupted"
+    step.error = "Выполнение прервано пользователем"
+    detailed_logger.info(message.format(step.step_number))
+
+
+def _execute_step(step, step_code, progress, token=None):
+    """
+    Выполняет шаг с проверкой результата и попыткой исправить ошибку
+
+    Args:
+        step: Шаг команды
+        step_code: Сгенерированный код шага
+        progress: Функция обновления общего прогресса выполнения
+        token: Токен отмены задания
+    """
+    if step_code:
+        # Обновляем информацию о шаге
+        detailed_logger.info(f"Сгенерирован код для шага {step.step_number}: {step_code}")
+
+        # Выполняем код
+        try:
+            # Выполняем код с проверкой результата
+            execution_result = execute_python_code(step_code, token)
+
+            # Проверяем, не было ли прерывания
+            if is_interrupted(token):
+                _mark_interrupted(step)
+                return
+
+            # Проверяем результат выполнения
+            if "Ошибка" in execution_result:
+                step.status = "failed"
+                step.error = execution_result
+                step.completion_percentage = 50.0  # Частичное выполнение
+                detailed_logger.error(
+                    f"Шаг {step.step_number} завершился с ошибкой: {execution_result}"
+                )
+            else:
+                step.status = "completed"
+                step.result = execution_result
+                step.completion_percentage = 100.0
+                detailed_logger.info(f"Шаг {step.step_number} успешно выполнен: {execution_result}")
+
+            # Проверяем результат выполнения шага
+            verification_result = verify_step_execution(step.description, execution_result)
 
-    # Выполняем каждый шаг
-    for i, step in enumerate(execution.steps):
-        # Проверяем, не было ли прерывания
-        if command_interrupt_flag:
-            step.status = "interrupted"
-            step.error = "Выполнение прервано пользователем"
-            detailed_logger.info(f"Шаг {step.step_number} прерван пользователем")
-            break
+            # Обновляем точность выполнения на основе проверки
+            if verification_result:
+                step.accuracy_percentage = verification_result.get("accuracy", 100.0)
+                detailed_logger.info(
+                    f"Точность выполнения шага {step.step_number}: {step.accuracy_percentage}%"
+                )
+        except Exception as e:
+            step.status = "failed"
+            step.error = str(e)
+            step.completion_percentage = 0.0
+            detailed_logger.error(f"Исключение при выполнении шага {step.step_number}: {str(e)}")
+    else:
+        step.status = "failed"
+        step.error = "Не удалось сгенерировать код для выполнения шага"
+        step.completion_percentage = 0.0
+        detailed_logger.error(f"Не удалось сгенерировать код для шага {step.step_number}")
 
-        step.status = "in_progress"
-        execution.current_step = i
+    # Обновляем общий прогресс выполнения команды и логируем промежуточный результат
+    progress(log=True)
 
-        detailed_logger.info(f"Шаг {step.step_number}: {step.description} - начало выполнения")
+    # Если шаг не выполнен успешно, пытаемся исправить ошибку
+    if step.status == "failed" and not is_interrupted(token):
+        detailed_logger.info(f"Попытка исправить ошибку в шаге {step.step_number}")
 
-        # Генерируем код для выполнения шага
-        step_response, step_code = process_single_step(step.description)
+        # Анализируем ошибку и пытаемся её исправить
+        fixed_code = try_fix_error(step.description, step.error)
 
-        if step_code:
-            # Обновляем информацию о шаге
-            detailed_logger.info(f"Сгенерирован код для шага {step.step_number}: {step_code}")
+        if fixed_code:
+            detailed_logger.info(f"Найдено исправление для шага {step.step_number}: {fixed_code}")
 
-            # Выполняем код
+            # Выполняем исправленный код
             try:
-                # Выполняем код с проверкой результата
-                execution_result = execute_python_code(step_code)
+                execution_result = execute_python_code(fixed_code, token)
 
                 # Проверяем, не было ли прерывания
-                if command_interrupt_flag:
-                    step.status = "interrupted"
-                    step.error = "Выполнение прервано пользователем"
-                    detailed_logger.info(f"Шаг {step.step_number} прерван пользователем")
-                    break
+                if is_interrupted(token):
+                    _mark_interrupted(step, "Шаг {} прерван пользователем при исправлении")
+                    return
 
-                # Проверяем результат выполнения
                 if "Ошибка" in execution_result:
-                    step.status = "failed"
-                    step.error = execution_result
-                    step.completion_percentage = 50.0  # Частичное выполнение
-                    detailed_logger.error(
-                        f"Шаг {step.step_number} завершился с ошибкой: {execution_result}"
-                    )
+                    detailed_logger.error(f"Исправление не помогло: {execution_result}")
                 else:
                     step.status = "completed"
                     step.result = execution_result
                     step.completion_percentage = 100.0
-                    detailed_logger.info(
-                        f"Шаг {step.step_number} успешно выполнен: {execution_result}"
-                    )
-
-                # Проверяем результат выполнения шага
-                verification_result = verify_step_execution(step.description, execution_result)
-
-                # Обновляем точность выполнения на основе проверки
-                if verification_result:
-                    step.accuracy_percentage = verification_result.get("accuracy", 100.0)
-                    detailed_logger.info(
-                        f"Точность выполнения шага {step.step_number}: {step.accuracy_percentage}%"
-                    )
+                    step.error = None
+                    detailed_logger.info(f"Шаг {step.step_number} успешно исправлен и выполнен")
+
+                    # Обновляем общий прогресс
+                    progress()
             except Exception as e:
-                step.status = "failed"
-                step.error = str(e)
-                step.completion_percentage = 0.0
-                detailed_logger.error(
-                    f"Исключение при выполнении шага {step.step_number}: {str(e)}"
-                )
-        else:
-            step.status = "failed"
-            step.error = "Не удалось сгенерировать код для выполнения шага"
-            step.completion_percentage = 0.0
-            detailed_logger.error(f"Не удалось сгенерировать код для шага {step.step_number}")
+                detailed_logger.error(f"Исключение при выполнении исправленного кода: {str(e)}")
 
-        # Обновляем общий прогресс выполнения команды
-        update_execution_progress(execution)
 
-        # Логируем промежуточный результат
-        log_execution_summary(execution)
+def execute_command_with_steps(command_text, code=None, token=None, on_progress=None):
+    """
+    Выполняет команду по шагам, проверяя результат каждого шага
+    и информируя пользователя о ходе выполнения
+
+    Код для всех шагов генерируется одновременно. Шаги выполняются по уровням
+    графа зависимостей: независимые шаги ("X и Y") - параллельно в пуле
+    потоков, зависимые ("X, затем Y") - после завершения предыдущих.
+
+    Args:
+        command_text: Текст команды
+        code: Не используется, оставлен для совместимости
+        token: Токен отмены задания; без него используется общий флаг прерывания
+        on_progress: Функция, вызываемая с CommandExecution при каждом изменении
+    """
+    global command_interrupt_flag
+
+    # Сбрасываем общий флаг прерывания; задания с токеном его не трогают,
+    # чтобы не отменять прерывание чужой команды
+    if token is None:
+        command_interrupt_flag = False
+
+    # Разбираем команду на шаги
+    steps, full_command = parse_compound_command(command_text)
 
-        # Если шаг не выполнен успешно, пытаемся исправить ошибку
-        if step.status == "failed" and not command_interrupt_flag:
-            detailed_logger.info(f"Попытка исправить ошибку в шаге {step.step_number}")
+    # Создаем запись о выполнении команды
+    execution = CommandExecution(
+        command_text=full_command, steps=steps, start_time=datetime.datetime.now().isoformat()
+    )
 
-            # Анализируем ошибку и пытаемся её исправить
-            fixed_code = try_fix_error(step.description, step.error)
+    # Логируем начало выполнения команды
+    detailed_logger.info(f"Начало выполнения команды: {full_command}")
+    detailed_logger.info(f"Количество шагов: {len(steps)}")
 
-            if fixed_code:
+    started = time.perf_counter()
+    progress_lock = threading.Lock()
+
+    def progress(log=False):
+        with progress_lock:
+            update_execution_progress(execution)
+            if log:
+                log_execution_summary(execution)
+            if on_progress is not None:
+                on_progress(execution)
+
+    progress()
+    workers = max(1, min(Config.STEP_MAX_WORKERS, len(steps)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="command-step") as executor:
+        # Генерация ставится в очередь пула раньше выполнения, поэтому шаг,
+        # ждущий свой код, не может занять поток, нужный генерации
+        step_codes = _generate_step_codes(steps, executor)
+
+        def run(step):
+            if is_interrupted(token):
+                _mark_interrupted(step)
+                return
+
+            step.status = "in_progress"
+            execution.current_step = step.step_number - 1
+            detailed_logger.info(f"Шаг {step.step_number}: {step.description} - начало выполнения")
+            progress()
+
+            _, step_code = step_codes[step.step_number].result()
+            step_started = time.perf_counter()
+            try:
+                _execute_step(step, step_code, progress, token)
+            finally:
+                step.duration = time.perf_counter() - step_started
                 detailed_logger.info(
-                    f"Найдено исправление для шага {step.step_number}: {fixed_code}"
+                    f"Шаг {step.step_number}: генерация {step.generation_time or 0:.2f} с,"
+                    f" выполнение {step.duration:.2f} с"
                 )
 
-                # Выполняем исправленный код
-                try:
-                    execution_result = execute_python_code(fixed_code)
-
-                    # Проверяем, не было ли прерывания
-                    if command_interrupt_flag:
-                        step.status = "interrupted"
-                        step.error = "Выполнение прервано пользователем"
-                        detailed_logger.info(
-                            f"Шаг {step.step_number} прерван пользователем при исправлении"
-                        )
-                        break
-
-                    if "Ошибка" in execution_result:
-                        detailed_logger.error(f"Исправление не помогло: {execution_result}")
-                    else:
-                        step.status = "completed"
-                        step.result = execution_result
-                        step.completion_percentage = 100.0
-                        step.error = None
-                        detailed_logger.info(f"Шаг {step.step_number} успешно исправлен и выполнен")
-
-                        # Обновляем общий прогресс
-                        update_execution_progress(execution)
-                except Exception as e:
-                    detailed_logger.error(f"Исключение при выполнении исправленного кода: {str(e)}")
+        for level in step_levels(steps):
+            # Проверяем, не было ли прерывания
+            if is_interrupted(token):
+                for step in steps:
+                    if step.status == "pending":
+                        _mark_interrupted(step)
+                break
+
+            if len(level) == 1:
+                run(level[0])
+            else:
+                for future in [executor.submit(run, step) for step in level]:
+                    future.result()
 
     # Завершаем выполнение команды
     execution.end_time = datetime.datetime.now().isoformat()
 
     # Определяем общий статус выполнения
-    if command_interrupt_flag:
+    if is_interrupted(token):
         execution.overall_status = "interrupted"
     elif all(step.status == "completed" for step in execution.steps):
         execution.overall_status = "completed"
@@ -440,9 +510,12 @@ def execute_command_with_steps(command_text, code=None):
     detailed_logger.info(f"Общий статус: {execution.overall_status}")
     detailed_logger.info(f"Процент выполнения: {execution.completion_percentage}%")
     detailed_logger.info(f"Точность выполнения: {execution.accuracy_percentage}%")
+    detailed_logger.info(f"Время выполнения: {time.perf_counter() - started:.2f} с")
 
     # Записываем итоговый результат в краткий журнал
     log_execution_summary(execution, final=True)
+    if on_progress is not None:
+        on_progress(execution)
 
     return execution
 
@@ -456,20 +529,11 @@ def process_single_step(step_text):
     command_function = None
     command_name = None
 
-    # Проверяем основные команды
-    for cmd_text in COMMANDS:
-        if cmd_text == step_text or cmd_text in step_text:
-            command_function = get_command_function(cmd_text)
-            command_name = cmd_text
-            break
-
-    # Проверяем алиасы
-    if not command_function:
-        for alias in COMMAND_ALIASES:
-            if alias == step_text or alias in step_text:
-                command_function = get_command_function(alias)
-                command_name = COMMAND_ALIASES[alias]
-                break
+    # Проверяем основные команды и алиасы
+    match = find_command(step_text)
+    if match:
+        command_function = get_command_function(match.pattern)
+        command_name = match.command
 
     if command_function:
         # Особая обработка для команды "сказать"
@@ -490,7 +554,8 @@ def process_single_step(step_text):
         return f"Выполняю команду: {command_name}", code
 
     # Если шаг не соответствует стандартной команде, генерируем код с помощью нейросети
-    response = get_ai_response(step_text)
+    # (детерминированно - ответ кэшируется)
+    response = get_ai_response(step_text, temperature=0)
     code = extract_code_from_response(response)
 
     return response, code
@@ -0,0 +1,219 @@
+"""
+Инкрементальная статистика команд по журналу истории.
+"""
+
+import heapq
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger("neuro_assistant")
+
+CHECKPOINT_VERSION = 1
+CHUNK_SIZE = 1024 * 1024
+
+
+class CommandStatsAggregator:
+    """
+    Счётчики команд, обновляемые только по новым строкам журнала.
+
+    Запоминается inode журнала и смещение после последней полной строки;
+    при обновлении читается только дописанное. Если журнал был ротирован
+    (inode изменился), сначала дочитывается остаток прежнего файла - он
+    становится резервной копией path.1 - а затем новый файл с начала.
+    Популярные команды хранятся в куче из top_k элементов: счётчики только
+    растут, поэтому команда может попасть в топ лишь при своём увеличении.
+    Состояние сохраняется в checkpoint_path и переживает перезапуск.
+    """
+
+    def __init__(self, log_path: str, checkpoint_path: Optional[str] = None, top_k: int = 5):
+        """
+        Args:
+            log_path: Путь к журналу истории команд
+            checkpoint_path: Файл состояния (None - без сохранения)
+            top_k: Число популярных команд
+        """
+        self.log_path = log_path
+        self.checkpoint_path = checkpoint_path
+        self.top_k = max(1, top_k)
+        self._lock = threading.Lock()
+        self._reset()
+        self._load_checkpoint()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Обновляет счётчики по новым строкам и возвращает статистику"""
+        with self._lock:
+            if self._refresh():
+                self._save_checkpoint()
+
+            total = self.total
+            popular = sorted(self._heap, key=lambda item: (-item[0], item[1]))
+            return {
+                "total": total,
+                "successful": self.successful,
+                "failed": self.failed,
+                "success_rate": (self.successful / total * 100) if total > 0 else 0,
+                "popular": [{"command": command, "count": count} for count, command in popular],
+            }
+
+    def _refresh(self) -> bool:
+        """
+        Читает новые строки журнала (вызывается под блокировкой)
+
+        Returns:
+            bool: Изменилось ли состояние
+        """
+        try:
+            stat = os.stat(self.log_path)
+        except OSError:
+            return False
+
+        changed = False
+        if self.inode is not None and stat.st_ino != self.inode:
+            # Журнал ротирован: дочитываем прежний файл, если он стал копией .1
+            backup = f"{self.log_path}.1"
+            try:
+                if os.stat(backup).st_ino == self.inode:
+                    changed |= self._consume(backup)
+            except OSError:
+                pass
+            self.offset = 0
+            changed = True
+        elif stat.st_size < self.offset:
+            # Файл усечён на месте - читаем заново
+            self.offset = 0
+            changed = True
+
+        self.inode = stat.st_ino
+        if stat.st_size > self.offset:
+            changed |= self._consume(self.log_path)
+        return changed
+
+    def _consume(self, path: str) -> bool:
+        """Обрабатывает полные строки файла после текущего смещения"""
+        consumed = False
+        with open(path, "rb") as f:
+            f.seek(self.offset)
+            partial = b""
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                data = partial + chunk
+                end = data.rfind(b"\n") + 1
+                partial = data[end:]
+                if end == 0:
+                    continue
+                for line in data[:end].decode("utf-8", errors="ignore").splitlines():
+                    self._process_line(line)
+                # Незаконченная строка останется на следующее обновление
+                self.offset += end
+                consumed = True
+        return consumed
+
+    def _process_line(self, line: str):
+        """Учитывает одну строку журнала"""
+        if "Команда:" in line:
+            self.total += 1
+            self._increment(line.split("Команда:")[1].strip())
+        elif "Статус: completed" in line:
+            self.successful += 1
+        elif "Статус: failed" in line:
+            self.failed += 1
+
+    def _increment(self, command: str):
+        """Увеличивает счётчик команды и обновляет кучу популярных"""
+        count = self.counts.get(command, 0) + 1
+        self.counts[command] = count
+
+        if command in self._in_heap:
+            # Счётчик участника кучи вырос: пересобираем кучу из top_k элементов
+            self._heap = [(c if cmd != command else count, cmd) for c, cmd in self._heap]
+            heapq.heapify(self._heap)
+        elif len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, (count, command))
+            self._in_heap.add(command)
+        elif (count, command) > self._heap[0]:
+            _, evicted = heapq.heapreplace(self._heap, (count, command))
+            self._in_heap.discard(evicted)
+            self._in_heap.add(command)
+
+    def _reset(self):
+        """Сбрасывает состояние"""
+        self.inode: Optional[int] = None
+        self.offset = 0
+        self.total = 0
+        self.successful = 0
+        self.failed = 0
+        self.counts: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+        self._in_heap = set()
+
+    def _rebuild_heap(self):
+        """Строит кучу популярных команд по всем счётчикам"""
+        self._heap = [(count, command) for command, count in self.counts.items()]
+        self._heap = heapq.nlargest(self.top_k, self._heap)
+        heapq.heapify(self._heap)
+        self._in_heap = {command for _, command in self._heap}
+
+    def _load_checkpoint(self):
+        """Восстанавливает состояние из файла"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CHECKPOINT_VERSION or data.get("log_path") != self.log_path:
+                return
+            self.inode = data["inode"]
+            self.offset = data["offset"]
+            self.total = data["total"]
+            self.successful = data["successful"]
+            self.failed = data["failed"]
+            self.counts = data["counts"]
+            self._rebuild_heap()
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Контрольная точка статистики команд не загружена: {e}")
+            self._reset()
+
+    def _save_checkpoint(self):
+        """Атомарно сохраняет состояние в файл"""
+        if not self.checkpoint_path:
+            return
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "log_path": self.log_path,
+            "inode": self.inode,
+            "offset": self.offset,
+            "total": self.total,
+            "successful": self.successful,
+            "failed": self.failed,
+            "counts": self.counts,
+        }
+        temp_path = f"{self.checkpoint_path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.checkpoint_path)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить статистику команд: {e}")
+
+
+# Глобальный экземпляр агрегатора
+_aggregator: Optional[CommandStatsAggregator] = None
+_aggregator_lock = threading.Lock()
+
+
+def get_command_stats_aggregator() -> CommandStatsAggregator:
+    """Получить агрегатор статистики по журналу истории команд"""
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            _aggregator = CommandStatsAggregator(
+                Config.SUMMARY_LOG_FILE, Config.COMMAND_STATS_CHECKPOINT_FILE
+            )
+        return _aggregator
@@ -0,0 +1,182 @@
+"""
+Проверка целесообразности команд по набору правил, скомпилированному в одно выражение.
+"""
+
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger("neuro_assistant")
+
+# Чем больше значение, тем строже правило
+SEVERITIES = {"confirm": 1, "block": 2}
+
+
+@dataclass(frozen=True)
+class FeasibilityRule:
+    """Правило проверки: регулярное выражение, строгость и шаблон причины."""
+
+    name: str
+    pattern: str
+    severity: str
+    reason: str
+
+    @classmethod
+    def from_config(cls, data: Dict[str, Any]) -> "FeasibilityRule":
+        """Создаёт правило из словаря конфигурации (keywords или regex)"""
+        if data.get("severity") not in SEVERITIES:
+            raise ValueError(f"Неизвестная строгость правила {data.get('name')}: {data}")
+
+        if "regex" in data:
+            pattern = data["regex"]
+        else:
+            # Длинные ключевые слова раньше коротких, чтобы они не перекрывались
+            keywords = sorted(data["keywords"], key=len, reverse=True)
+            pattern = "|".join(re.escape(keyword.lower()) for keyword in keywords)
+
+        return cls(
+            name=data["name"],
+            pattern=pattern,
+            severity=data["severity"],
+            reason=data.get("reason", "Команда '{match}' требует проверки"),
+        )
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    """Сработавшее правило и найденный фрагмент."""
+
+    rule: FeasibilityRule
+    text: str
+    start: int
+
+
+class FeasibilityClassifier:
+    """
+    Классифицирует команды по правилам за один проход по тексту.
+
+    Все правила объединяются в одно регулярное выражение с именованной группой
+    на каждое правило. Каждая группа обёрнута в необязательную опережающую
+    проверку: выражение не поглощает текст, и в каждой позиции срабатывают все
+    подходящие правила, в том числе перекрывающиеся. Вердикт определяется самым строгим сработавшим правилом
+    (при равной строгости - первым в списке). Вердикты кэшируются по
+    нормализованному тексту (нижний регистр, схлопнутые пробелы).
+    """
+
+    def __init__(self, rules: Iterable[FeasibilityRule], cache_size: int = 4096):
+        """
+        Args:
+            rules: Правила в порядке приоритета
+            cache_size: Число кэшируемых вердиктов
+        """
+        self.rules: List[FeasibilityRule] = list(rules)
+        self.cache_size = max(0, cache_size)
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._order = {rule: i for i, rule in enumerate(self.rules)}
+
+        lookaheads = [f"(?:(?=(?P<r{i}>{rule.pattern})))?" for i, rule in enumerate(self.rules)]
+        self._regex = re.compile("".join(lookaheads)) if lookaheads else None
+
+    @classmethod
+    def from_config(cls) -> "FeasibilityClassifier":
+        """Создаёт классификатор из Config.FEASIBILITY_RULES или FEASIBILITY_RULES_FILE"""
+        rules_data = Config.FEASIBILITY_RULES
+        if Config.FEASIBILITY_RULES_FILE:
+            with open(Config.FEASIBILITY_RULES_FILE, encoding="utf-8") as f:
+                rules_data = json.load(f)
+            logger.info(f"Правила проверки команд загружены из {Config.FEASIBILITY_RULES_FILE}")
+
+        return cls(
+            [FeasibilityRule.from_config(data) for data in rules_data],
+            cache_size=Config.FEASIBILITY_CACHE_SIZE,
+        )
+
+    def match(self, text: str) -> List[RuleMatch]:
+        """Возвращает все сработавшие правила в порядке появления в тексте"""
+        if self._regex is None:
+            return []
+
+        matches = []
+        # Выражение совпадает (пустой строкой) в каждой позиции - сработавшие
+        # правила определяются по заполненным группам
+        for found in self._regex.finditer(self.normalize(text)):
+            for index, rule in enumerate(self.rules):
+                fragment = found.group(f"r{index}")
+                if fragment is not None:
+                    matches.append(RuleMatch(rule, fragment, found.start()))
+        return matches
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        """
+        Возвращает вердикт для команды
+
+        Returns:
+            dict: feasible, requires_confirmation, reason (если есть) и matched_rules
+        """
+        key = self.normalize(text)
+        with self._cache_lock:
+            verdict = self._cache.get(key)
+            if verdict is not None:
+                self._cache.move_to_end(key)
+
+        if verdict is None:
+            verdict = self._classify(key)
+            if self.cache_size:
+                with self._cache_lock:
+                    self._cache[key] = verdict
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+
+        result = dict(verdict)
+        result["matched_rules"] = list(verdict["matched_rules"])
+        return result
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Нормализует текст команды"""
+        return " ".join(text.lower().split())
+
+    def _classify(self, text: str) -> Dict[str, Any]:
+        """Вычисляет вердикт без кэша"""
+        matches = self.match(text)
+        matched_rules = list(dict.fromkeys(m.rule.name for m in matches))
+        if not matches:
+            return {"feasible": True, "requires_confirmation": False, "matched_rules": []}
+
+        decisive = self._decisive(matches)
+        reason = decisive.rule.reason.format(match=decisive.text)
+        if decisive.rule.severity == "block":
+            return {"feasible": False, "reason": reason, "matched_rules": matched_rules}
+        return {
+            "feasible": True,
+            "requires_confirmation": True,
+            "reason": reason,
+            "matched_rules": matched_rules,
+        }
+
+    def _decisive(self, matches: List[RuleMatch]) -> RuleMatch:
+        """Самое строгое совпадение; при равенстве - по порядку правил, затем в тексте"""
+
+        def rank(match: RuleMatch) -> Tuple[int, int, int]:
+            return (-SEVERITIES[match.rule.severity], self._order[match.rule], match.start)
+
+        return min(matches, key=rank)
+
+
+# Глобальный экземпляр классификатора
+_classifier: Optional[FeasibilityClassifier] = None
+
+
+def get_feasibility_classifier() -> FeasibilityClassifier:
+    """Получить классификатор, построенный по правилам из конфигурации"""
+    global _classifier
+    if _classifier is None:
+        _classifier = FeasibilityClassifier.from_config()
+    return _classifier
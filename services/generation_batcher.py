@@ -0,0 +1,211 @@
+"""
+Динамическое объединение запросов генерации в пакеты (micro-batching).
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger("neuro_assistant")
+
+# Функция пакетной генерации: (model_id, prompts, max_new_tokens, params) -> тексты
+BatchRunner = Callable[[str, List[str], List[int], Dict[str, Any]], List[str]]
+
+
+@dataclass
+class GenerationRequest:
+    """Запрос генерации, ожидающий включения в пакет."""
+
+    prompt: str
+    max_new_tokens: int
+    enqueued_at: float
+    future: Future = field(default_factory=Future)
+
+
+class GenerationBatcher:
+    """
+    Собирает одновременные запросы к одной модели в один вызов генерации.
+
+    Для каждой пары (модель, параметры сэмплирования) заводится очередь и поток-
+    диспетчер. Диспетчер берёт первый запрос, ждёт остальные не дольше max_wait
+    секунд (или до max_batch_size запросов) и передаёт пакет в run_batch.
+    Результаты и ошибки возвращаются вызывающим через Future.
+    """
+
+    def __init__(
+        self,
+        run_batch: BatchRunner,
+        max_batch_size: int = 8,
+        max_wait: float = 0.01,
+    ):
+        """
+        Args:
+            run_batch: Функция пакетной генерации
+            max_batch_size: Максимальное число запросов в пакете
+            max_wait: Максимальное ожидание дополнительных запросов (секунды)
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait)
+
+        self._queues: Dict[Tuple, "queue.Queue[GenerationRequest | None]"] = {}
+        self._workers: Dict[Tuple, threading.Thread] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "batched_requests": 0,
+            "failed_batches": 0,
+            "max_batch_size_seen": 0,
+            "max_queue_depth": 0,
+            "total_queue_wait": 0.0,
+        }
+
+    def submit(self, model_id: str, prompt: str, max_new_tokens: int, **params) -> Future:
+        """
+        Ставит запрос в очередь модели
+
+        Args:
+            model_id: Идентификатор загруженной модели
+            prompt: Промпт
+            max_new_tokens: Максимальное число новых токенов
+            **params: Параметры сэмплирования; в пакет попадают только запросы
+                с одинаковыми параметрами
+
+        Returns:
+            Future: Результат генерации (str)
+        """
+        key = (model_id, tuple(sorted(params.items())))
+        request = GenerationRequest(prompt, max_new_tokens, time.monotonic())
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Пакетный генератор остановлен")
+            requests = self._get_queue(key)
+            requests.put(request)
+            self._stats["requests"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], requests.qsize())
+
+        return request.future
+
+    def generate(self, model_id: str, prompt: str, max_new_tokens: int, **params) -> str:
+        """Ставит запрос в очередь и ждёт результата"""
+        return self.submit(model_id, prompt, max_new_tokens, **params).result()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Возвращает метрики очередей и пакетов"""
+        with self._lock:
+            stats = dict(self._stats)
+            # Очереди разных параметров одной модели суммируются
+            queue_depth: Dict[str, int] = {}
+            for (model_id, _), requests in self._queues.items():
+                queue_depth[model_id] = queue_depth.get(model_id, 0) + requests.qsize()
+
+        batched = stats["batched_requests"]
+        stats["queue_depth"] = queue_depth
+        stats["avg_batch_size"] = batched / stats["batches"] if stats["batches"] else 0.0
+        stats["avg_queue_wait"] = stats.pop("total_queue_wait") / batched if batched else 0.0
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Останавливает диспетчеры; уже поставленные запросы будут выполнены"""
+        with self._lock:
+            self._closed = True
+            for requests in self._queues.values():
+                requests.put(None)
+            workers = list(self._workers.values())
+
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def _get_queue(self, key: Tuple) -> "queue.Queue[GenerationRequest | None]":
+        """Возвращает очередь ключа, запуская диспетчер при первом обращении"""
+        requests = self._queues.get(key)
+        if requests is None:
+            requests = queue.Queue()
+            worker = threading.Thread(
+                target=self._dispatch,
+                args=(key, requests),
+                name=f"generation-batcher-{key[0]}",
+                daemon=True,
+            )
+            self._queues[key] = requests
+            self._workers[key] = worker
+            worker.start()
+        return requests
+
+    def _dispatch(self, key: Tuple, requests: "queue.Queue[GenerationRequest | None]"):
+        """Цикл диспетчера: собирает пакеты и выполняет их"""
+        while True:
+            first = requests.get()
+            if first is None:
+                return
+
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Уже ожидающие запросы забираем без задержки даже после дедлайна
+                    if remaining > 0:
+                        request = requests.get(timeout=remaining)
+                    else:
+                        request = requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+
+            self._run(key, batch)
+            if stop:
+                return
+
+    def _run(self, key: Tuple, batch: List[GenerationRequest]):
+        """Выполняет пакет и раздаёт результаты"""
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        model_id, params = key
+        started = time.monotonic()
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["batched_requests"] += len(batch)
+            self._stats["max_batch_size_seen"] = max(self._stats["max_batch_size_seen"], len(batch))
+            self._stats["total_queue_wait"] += sum(started - r.enqueued_at for r in batch)
+
+        try:
+            results = self.run_batch(
+                model_id,
+                [request.prompt for request in batch],
+                [request.max_new_tokens for request in batch],
+                dict(params),
+            )
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"Пакетная генерация вернула {len(results)} результатов вместо {len(batch)}"
+                )
+        except Exception as e:
+            logger.error(f"Ошибка пакетной генерации для {model_id}: {e}")
+            with self._lock:
+                self._stats["failed_batches"] += 1
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        logger.debug(
+            f"Пакет из {len(batch)} запросов для {model_id} выполнен за "
+            f"{time.monotonic() - started:.2f} с"
+        )
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
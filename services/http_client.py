@@ -0,0 +1,205 @@
+"""
+Общий HTTP-клиент с пулом соединений и повторными попытками.
+"""
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+
+logger = logging.getLogger("neuro_assistant")
+
+# Статусы, при которых запрос имеет смысл повторить
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HttpClient:
+    """
+    HTTP-клиент поверх одной requests.Session.
+
+    Соединения переиспользуются (keep-alive) из пула HTTPAdapter. Временные ошибки
+    (RETRY_STATUSES, обрывы соединения, таймауты) повторяются с экспоненциальной
+    задержкой и случайным разбросом (full jitter); заголовок Retry-After имеет
+    приоритет над расчётной задержкой. Число одновременных запросов к одному
+    хосту ограничено семафором.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        per_host_limit: int = 4,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 30.0,
+        headers: Optional[Dict[str, str]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            pool_size: Максимальное число соединений в пуле на один хост
+            per_host_limit: Максимальное число одновременных запросов к одному хосту
+            max_retries: Количество повторных попыток по умолчанию
+            backoff_base: Базовая задержка перед повтором (секунды)
+            backoff_max: Максимальная задержка перед повтором (секунды)
+            timeout: Таймаут запроса по умолчанию (секунды)
+            headers: Заголовки, добавляемые ко всем запросам
+            sleep: Функция ожидания (подменяется в тестах)
+        """
+        self.per_host_limit = max(1, per_host_limit)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self._sleep = sleep
+
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+
+        # Повторы выполняем сами, поэтому встроенные в urllib3 отключены
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_limits_lock = threading.Lock()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Выполняет GET-запрос"""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Выполняет POST-запрос"""
+        return self.request("POST", url, **kwargs)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        max_retries: Optional[int] = None,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Выполняет запрос с повторными попытками
+
+        Args:
+            method: HTTP-метод
+            url: Адрес запроса
+            max_retries: Количество повторных попыток (по умолчанию из настроек клиента)
+            retry_statuses: Коды ответа, при которых запрос повторяется
+            **kwargs: Параметры requests (params, json, headers, timeout, ...)
+
+        Returns:
+            requests.Response: Последний полученный ответ. Если повторы исчерпаны,
+            возвращается ответ с ошибочным статусом - его обработка остаётся
+            за вызывающим кодом, как и при прямом вызове requests.
+
+        Raises:
+            requests.RequestException: Если соединение не удалось после всех попыток
+        """
+        retries = self.max_retries if max_retries is None else max(0, max_retries)
+        retry_statuses = frozenset(retry_statuses)
+        kwargs.setdefault("timeout", self.timeout)
+        limit = self._get_host_limit(url)
+
+        attempt = 0
+        while True:
+            try:
+                with limit:
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(
+                    f"Ошибка соединения с {url}: {e}. Повтор {attempt + 1}/{retries} "
+                    f"через {delay:.1f} с"
+                )
+            else:
+                if response.status_code not in retry_statuses or attempt >= retries:
+                    return response
+                retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+                delay = self._backoff(attempt) if retry_after is None else retry_after
+                logger.warning(
+                    f"Ответ {response.status_code} от {url}. Повтор {attempt + 1}/{retries} "
+                    f"через {delay:.1f} с"
+                )
+                # Освобождаем соединение в пул до ожидания
+                response.close()
+
+            self._sleep(delay)
+            attempt += 1
+
+    def close(self):
+        """Закрывает все соединения пула"""
+        self.session.close()
+
+    def _get_host_limit(self, url: str) -> threading.BoundedSemaphore:
+        """Возвращает семафор, ограничивающий параллельные запросы к хосту"""
+        host = urlsplit(url).netloc.lower()
+        with self._host_limits_lock:
+            limit = self._host_limits.get(host)
+            if limit is None:
+                limit = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_limits[host] = limit
+            return limit
+
+    def _backoff(self, attempt: int) -> float:
+        """Экспоненциальная задержка с полным случайным разбросом"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2**attempt)))
+
+    def _parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        """
+        Разбирает заголовок Retry-After (секунды или HTTP-дата)
+
+        Returns:
+            float: Задержка в секундах, ограниченная backoff_max, или None
+        """
+        if not value:
+            return None
+
+        value = value.strip()
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                retry_at = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if retry_at is None:
+                return None
+            delay = retry_at.timestamp() - time.time()
+
+        return min(max(delay, 0.0), self.backoff_max)
+
+
+# Глобальный экземпляр клиента
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Получить общий HTTP-клиент для запросов к HuggingFace"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HttpClient(
+                pool_size=Config.HTTP_POOL_SIZE,
+                per_host_limit=Config.HTTP_PER_HOST_LIMIT,
+                max_retries=Config.AI_MAX_RETRIES,
+                backoff_base=Config.HTTP_BACKOFF_BASE,
+                backoff_max=Config.HTTP_BACKOFF_MAX,
+                timeout=Config.AI_REQUEST_TIMEOUT,
+                headers={"User-Agent": "Neuro-Link-Assistant/1.0"},
+            )
+        return _http_client
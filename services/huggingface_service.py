@@ -3,12 +3,16 @@
 """
 
 import asyncio
+import json
 import logging
+import os
+import tempfile
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import requests
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
 from config import Config
@@ -16,10 +20,20 @@ from config import Config
 # ✅ ИСПРАВЛЕНИЕ: Добавляем необходимые импорты
 from core.db.connection import get_db
 from core.db.models import AIModel
+from services.http_client import HttpClient, get_http_client
 
 logger = logging.getLogger(__name__)
 
 
+class HubPageLimitReached(Exception):
+    """Обход выдачи Hub остановлен по лимиту страниц, а не в конце выдачи."""
+
+    def __init__(self, message: str, next_url: Optional[str] = None):
+        super().__init__(message)
+        # Курсор первой непрочитанной страницы: с него обход можно продолжить
+        self.next_url = next_url
+
+
 @dataclass
 class HFModelInfo:
     """Информация о модели с HuggingFace."""
@@ -52,9 +66,10 @@ except ImportError:
 class HuggingFaceService:
     """Сервис для работы с HuggingFace Hub API."""
 
-    def __init__(self, api_token: Optional[str] = None):
+    def __init__(self, api_token: Optional[str] = None, http_client: Optional[HttpClient] = None):
         self.api_token = api_token or getattr(Config, "HUGGINGFACE_API_TOKEN", None)
         self.base_url = "https://huggingface.co/api"
+        self.http = http_client or get_http_client()
         self.headers = {"User-Agent": "Neuro-Link-Assistant/1.0"}
         if self.api_token:
             self.headers["Authorization"] = f"Bearer {self.api_token}"
@@ -119,7 +134,7 @@ class HuggingFaceService:
 
             logger.info(f"Запрос к HF API: {self.base_url}/models с параметрами: {params}")
 
-            response = requests.get(f"{self.base_url}/models", params=params, headers=self.headers)
+            response = self.http.get(f"{self.base_url}/models", params=params, headers=self.headers)
 
             if response.status_code == 200:
                 models_data = response.json()
@@ -153,7 +168,7 @@ class HuggingFaceService:
         """Получает детальную информацию о конкретной модели."""
         try:
             url = f"{self.base_url}/models/{model_id}"
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.http.get(url, headers=self.headers, timeout=30)
             response.raise_for_status()
 
             model_data = response.json()
@@ -188,7 +203,7 @@ class HuggingFaceService:
             url = f"{self.base_url}/models"
             params = {"search": query, "limit": limit, "full": True}
 
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
+            response = self.http.get(url, headers=self.headers, params=params, timeout=30)
             response.raise_for_status()
 
             models_data = response.json()
@@ -227,6 +242,54 @@ class HuggingFaceService:
             logger.error(f"Ошибка поиска моделей: {e}")
             return []
 
+    def iter_models(
+        self,
+        task: Optional[str] = None,
+        sort: str = "lastModified",
+        page_size: int = 100,
+        max_pages: int = 10,
+        start_url: Optional[str] = None,
+    ) -> Iterator[HFModelInfo]:
+        """
+        Постранично перебирает модели Hub в порядке убывания sort.
+
+        Следующая страница запрашивается только когда потребитель дочитал текущую,
+        поэтому остановка итерации прекращает и запросы к API. start_url - курсор
+        из HubPageLimitReached.next_url, чтобы продолжить прерванный обход.
+
+        Raises:
+            HubPageLimitReached: Если после max_pages страниц в выдаче остались модели
+        """
+        url = f"{self.base_url}/models"
+        params: Optional[Dict[str, Any]] = {
+            "limit": page_size,
+            "sort": sort,
+            "direction": -1,
+            "full": True,
+        }
+        if task:
+            params["filter"] = task
+        if start_url:
+            url, params = start_url, None
+
+        for _ in range(max_pages):
+            response = self.http.get(url, params=params, headers=self.headers)
+            response.raise_for_status()
+
+            for model_dict in response.json():
+                yield self._parse_model_info(model_dict)
+
+            # Hub отдаёт курсор следующей страницы в заголовке Link
+            next_url = response.links.get("next", {}).get("url")
+            if not next_url:
+                return
+            url, params = next_url, None
+
+        raise HubPageLimitReached(
+            f"Достигнут лимит в {max_pages} страниц при обходе моделей Hub ({task})",
+            next_url=url,
+        )
+
     def _parse_model_info(self, model_data: Dict[str, Any]) -> HFModelInfo:
         """Парсит информацию о модели из ответа API."""
         try:
@@ -343,14 +406,123 @@ class HuggingFaceService:
         return language_tags
 
 
+# Файл с отметками (watermark) инкрементальной синхронизации по задачам
+HF_SYNC_STATE_FILE = os.path.join(Config.DATA_DIR, "hf_sync_state.json")
+
+# Перекрытие окна инкрементальной синхронизации на случай расхождения часов
+SYNC_WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+class SyncStateStore:
+    """
+    Хранит время последней синхронизации каждой задачи в JSON-файле.
+
+    Для задач, обход которых оборвался на лимите страниц, хранится и курсор
+    продолжения: адрес первой непрочитанной страницы и самая поздняя дата
+    изменения (head), полученная до обрыва.
+    """
+
+    def __init__(self, path: str = HF_SYNC_STATE_FILE):
+        self.path = path
+
+    def get_watermarks(self) -> Dict[str, datetime]:
+        """Возвращает отметки по задачам."""
+        watermarks = {}
+        for task, value in self._read().get("watermarks", {}).items():
+            try:
+                watermarks[task] = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                logger.warning(f"Некорректная отметка синхронизации для {task}: {value}")
+        return watermarks
+
+    def get_cursors(self) -> Dict[str, Dict[str, Any]]:
+        """Возвращает курсоры продолжения по задачам: {"url": str, "head": datetime}."""
+        cursors = {}
+        for task, value in self._read().get("cursors", {}).items():
+            try:
+                cursors[task] = {
+                    "url": value["url"],
+                    "head": datetime.fromisoformat(value["head"]),
+                }
+            except (KeyError, TypeError, ValueError):
+                logger.warning(f"Некорректный курсор синхронизации для {task}: {value}")
+        return cursors
+
+    def save_watermarks(
+        self,
+        watermarks: Dict[str, datetime],
+        cursors: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
+    ):
+        """
+        Атомарно сохраняет отметки и курсоры, дополняя уже сохранённые.
+
+        Курсор со значением None удаляется.
+        """
+        merged = self.get_watermarks()
+        merged.update(watermarks)
+        merged_cursors = self.get_cursors()
+        for task, cursor in (cursors or {}).items():
+            if cursor is None:
+                merged_cursors.pop(task, None)
+            else:
+                merged_cursors[task] = cursor
+        payload = {
+            "watermarks": {task: value.isoformat() for task, value in merged.items()},
+            "cursors": {
+                task: {"url": cursor["url"], "head": cursor["head"].isoformat()}
+                for task, cursor in merged_cursors.items()
+            },
+        }
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".hf_sync_state.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _read(self) -> Dict[str, Any]:
+        """Читает файл состояния; при отсутствии или ошибке - пустое состояние."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать состояние синхронизации {self.path}: {e}")
+            return {}
+
+
 class ModelSyncService:
     """Сервис для синхронизации моделей с базой данных."""
 
-    def __init__(self, hf_service: HuggingFaceService):
-        self.hf_service = hf_service
+    # Поля, которые обновляются у существующих моделей при синхронизации
+    SYNC_FIELDS = ("downloads", "likes", "description", "tags", "is_featured", "last_modified_hf")
 
-    def sync_popular_models(self, limit: int = 200) -> Dict[str, Any]:
-        """Синхронизирует популярные модели с базой данных."""
+    def __init__(self, hf_service: HuggingFaceService, state: Optional[SyncStateStore] = None):
+        self.hf_service = hf_service
+        self.state = state or SyncStateStore()
+
+    def sync_popular_models(self, limit: int = 200, incremental: bool = False) -> Dict[str, Any]:
+        """
+        Синхронизирует популярные модели с базой данных.
+
+        Модели всех задач собираются в память, после чего записываются пакетами:
+        на пакет приходится один SELECT существующих записей, один bulk INSERT новых
+        и один bulk UPDATE изменившихся моделей. Каждый пакет - отдельная транзакция.
+
+        В инкрементальном режиме для задач с сохранённой отметкой запрашиваются только
+        модели, изменённые после неё, а модели с прежней датой изменения не
+        перезаписываются. Задачи без отметки синхронизируются полностью. Если обход
+        оборвался на лимите страниц, сохраняется курсор, и следующий запуск
+        продолжает с первой непрочитанной страницы; отметка сдвигается, когда
+        отставание дочитано до неё.
+        """
         try:
             # ✅ ИСПРАВЛЕНИЕ: Используем правильный контекстный менеджер
             db = next(get_db())
@@ -365,39 +537,76 @@ class ModelSyncService:
                     "text2text-generation",
                 ]
 
-                total_synced = 0
-                total_updated = 0
                 total_errors = 0
+                # Одна модель может относиться к нескольким задачам - оставляем одну запись
+                collected: Dict[str, HFModelInfo] = {}
+                watermarks = self.state.get_watermarks() if incremental else {}
+                cursors = self.state.get_cursors() if incremental else {}
+                new_watermarks: Dict[str, datetime] = {}
+                new_cursors: Dict[str, Optional[Dict[str, Any]]] = {}
+                truncated_tasks: List[str] = []
 
                 for task in tasks:
+                    cursor = cursors.get(task) if task in watermarks else None
                     try:
-                        models = self.hf_service.get_models(
-                            limit=limit // len(tasks), task=task, sort="downloads"
-                        )
+                        started_at = datetime.now(timezone.utc)
+                        complete, next_url = True, None
+                        if task in watermarks:
+                            models, complete, next_url = self._fetch_models_since(
+                                task, watermarks[task], cursor["url"] if cursor else None
+                            )
+                        else:
+                            models = self.hf_service.get_models(
+                                limit=limit // len(tasks), task=task, sort="downloads"
+                            )
+                        # Продолжение прерванного обхода читает модели старше head -
+                        # выдача выше head уже получена
+                        previous = cursor["head"] if cursor else watermarks.get(task)
+                        head = self._next_watermark(previous, models, started_at)
+                        if complete:
+                            new_watermarks[task] = head
+                            new_cursors[task] = None
+                        else:
+                            # Модели между отметкой и последней полученной страницей
+                            # не прочитаны - отметку не сдвигаем, а следующий запуск
+                            # продолжит обход с первой непрочитанной страницы
+                            truncated_tasks.append(task)
+                            if next_url:
+                                new_cursors[task] = {"url": next_url, "head": head}
 
                         for model_info in models:
-                            try:
-                                synced, updated = self._sync_model_to_db(db, model_info)
-                                if synced:
-                                    total_synced += 1
-                                if updated:
-                                    total_updated += 1
-
-                            except Exception as e:
-                                logger.error(f"Ошибка синхронизации модели {model_info.id}: {e}")
-                                total_errors += 1
+                            if not model_info or not model_info.id:
+                                logger.warning("model_info или model_info.id отсутствует")
+                                continue
+                            collected[model_info.id] = model_info
 
                     except Exception as e:
                         logger.error(f"Ошибка получения моделей для задачи {task}: {e}")
                         total_errors += 1
+                        if cursor:
+                            # Курсор мог устареть - следующий запуск начнёт с начала выдачи
+                            new_cursors[task] = None
 
-                db.commit()
+                stats = self._sync_models_batched(
+                    db, list(collected.values()), incremental=incremental
+                )
+
+                # Отметки сдвигаем, только если все пакеты записаны, иначе
+                # следующий запуск повторит пропущенный интервал
+                if stats["errors"] == 0 and (new_watermarks or new_cursors):
+                    self.state.save_watermarks(new_watermarks, new_cursors)
 
                 result = {
                     "success": True,
-                    "total_synced": total_synced,
-                    "total_updated": total_updated,
-                    "total_errors": total_errors,
+                    "incremental": incremental,
+                    "total_fetched": len(collected),
+                    "total_synced": stats["created"],
+                    "total_updated": stats["updated"],
+                    "total_unchanged": stats["unchanged"],
+                    # Новые модели, отброшенные из-за HF_SYNC_MIN_DOWNLOADS
+                    "total_filtered": stats["filtered"],
+                    "total_errors": total_errors + stats["errors"],
+                    "truncated_tasks": truncated_tasks,
                     "timestamp": datetime.now().isoformat(),
                 }
 
@@ -410,82 +619,219 @@ class ModelSyncService:
             logger.error(f"Критическая ошибка синхронизации: {e}")
             return {"success": False, "error": str(e), "timestamp": datetime.now().isoformat()}
 
-    def _sync_model_to_db(self, db: Session, model_info: HFModelInfo) -> tuple[bool, bool]:
-        """Синхронизирует конкретную модель с базой данных."""
-        try:
-            if not model_info or not model_info.id:
-                logger.warning("model_info или model_info.id отсутствует")
-                return False, False
+    def _fetch_models_since(
+        self, task: str, watermark: datetime, start_url: Optional[str] = None
+    ) -> Tuple[List[HFModelInfo], bool, Optional[str]]:
+        """
+        Модели задачи, изменённые после отметки (с небольшим перекрытием).
 
-            # Ищем существующую модель
-            existing_model = db.query(AIModel).filter(AIModel.hf_model_id == model_info.id).first()
+        Args:
+            start_url: Курсор, с которого продолжается прерванный обход
+
+        Returns:
+            tuple: (модели, дошёл ли обход до отметки, курсор продолжения); False -
+                обход остановлен лимитом HF_SYNC_MAX_PAGES и часть изменённых
+                моделей не получена
+        """
+        since = watermark - SYNC_WATERMARK_OVERLAP
+        models = []
+
+        try:
+            for model_info in self.hf_service.iter_models(
+                task=task,
+                sort="lastModified",
+                page_size=Config.HF_SYNC_PAGE_SIZE,
+                max_pages=Config.HF_SYNC_MAX_PAGES,
+                start_url=start_url,
+            ):
+                last_modified = self._parse_hf_datetime(model_info.last_modified)
+                if last_modified and last_modified <= since:
+                    # Выдача отсортирована по дате изменения - дальше только старые модели
+                    break
+                models.append(model_info)
+        except HubPageLimitReached as e:
+            logger.warning(f"{e}: задача {task} продолжится со следующей страницы")
+            return models, False, e.next_url
+
+        logger.info(f"Задача {task}: изменено моделей с {watermark.isoformat()}: {len(models)}")
+        return models, True, None
+
+    def _next_watermark(
+        self, previous: Optional[datetime], models: List[HFModelInfo], started_at: datetime
+    ) -> datetime:
+        """Новая отметка задачи: самая поздняя дата изменения из выдачи или время запроса."""
+        if previous is None:
+            # Первая (полная) синхронизация - всё, что изменится позже, войдёт в дельту
+            return started_at
+
+        latest = previous
+        for model_info in models:
+            last_modified = self._parse_hf_datetime(model_info.last_modified)
+            if last_modified and last_modified > latest:
+                latest = last_modified
+        return latest
+
+    def _sync_models_batched(
+        self,
+        db: Session,
+        models: List[HFModelInfo],
+        batch_size: Optional[int] = None,
+        incremental: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Записывает модели в базу пакетами, каждый пакет в своей транзакции.
+
+        Returns:
+            dict: Количество созданных, обновлённых, неизменённых, отброшенных по
+                числу загрузок моделей и ошибок
+        """
+        batch_size = max(1, batch_size or Config.HF_SYNC_BATCH_SIZE)
+        stats = {"created": 0, "updated": 0, "unchanged": 0, "filtered": 0, "errors": 0}
+
+        for start in range(0, len(models), batch_size):
+            batch = models[start : start + batch_size]
+            try:
+                created, updated, unchanged, filtered = self._sync_batch(db, batch, incremental)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Ошибка синхронизации пакета из {len(batch)} моделей: {e}")
+                stats["errors"] += len(batch)
+                continue
+
+            stats["created"] += created
+            stats["updated"] += updated
+            stats["unchanged"] += unchanged
+            stats["filtered"] += filtered
+
+        return stats
+
+    def _sync_batch(
+        self, db: Session, batch: List[HFModelInfo], incremental: bool = False
+    ) -> Tuple[int, int, int, int]:
+        """
+        Синхронизирует пакет моделей: предвыборка по hf_model_id, сравнение в памяти
+        и массовая запись изменений.
+
+        В инкрементальном режиме модели с прежней датой изменения на Hub не
+        перезаписываются вовсе, а новые модели добавляются, только если у них не
+        меньше HF_SYNC_MIN_DOWNLOADS загрузок.
+
+        Returns:
+            tuple: (создано, обновлено, без изменений, отброшено по числу загрузок)
+        """
+        now = datetime.now()
+        hf_ids = [model_info.id[:255] for model_info in batch]
+
+        columns = [AIModel.id, AIModel.hf_model_id] + [
+            getattr(AIModel, field) for field in self.SYNC_FIELDS
+        ]
+        existing = {}
+        for row in db.execute(select(*columns).where(AIModel.hf_model_id.in_(hf_ids))):
+            # hf_model_id не уникален - как и раньше, работаем с первой найденной записью
+            existing.setdefault(row.hf_model_id, row)
+
+        inserts = []
+        updates = []
+        unchanged_ids = []
+        skipped = 0
+        filtered = 0
+
+        for model_info in batch:
+            row = existing.get(model_info.id[:255])
+            if row is None:
+                if incremental and model_info.downloads < Config.HF_SYNC_MIN_DOWNLOADS:
+                    filtered += 1
+                    continue
+                inserts.append(self._model_values_from_hf(model_info, now))
+                continue
 
-            if existing_model:
-                # ✅ ПРОСТОЙ ПОДХОД: Создаем словарь изменений напрямую
-                update_data = {}
+            if incremental and row.last_modified_hf is not None:
+                last_modified = self._parse_hf_datetime(model_info.last_modified)
+                if last_modified == row.last_modified_hf:
+                    skipped += 1
+                    continue
 
-                # Обновляем без сравнения - просто обновляем все поля
-                update_data.update(
+            values = self._sync_values(model_info)
+            if any(getattr(row, field) != value for field, value in values.items()):
+                updates.append(
                     {
-                        "downloads": model_info.downloads,
-                        "likes": model_info.likes,
-                        "description": model_info.description or "",
-                        "tags": model_info.tags or [],
-                        "is_featured": model_info.downloads > 10000,
-                        "last_sync_at": datetime.now(),
+                        "id": row.id,
+                        **values,
+                        "last_sync_at": now,
                         "sync_status": "synced",
                         "sync_error": None,
                     }
                 )
+            else:
+                unchanged_ids.append(row.id)
+
+        if inserts:
+            db.execute(insert(AIModel), inserts)
+        if updates:
+            # Bulk UPDATE по первичному ключу (executemany)
+            db.execute(update(AIModel), updates)
+        if unchanged_ids:
+            db.execute(
+                update(AIModel)
+                .where(AIModel.id.in_(unchanged_ids))
+                .values(last_sync_at=now, sync_status="synced", sync_error=None)
+            )
 
-                # Обновляем дату изменения HF
-                hf_last_modified = self._parse_hf_datetime(model_info.last_modified)
-                if hf_last_modified:
-                    update_data["last_modified_hf"] = hf_last_modified
+        return len(inserts), len(updates), len(unchanged_ids) + skipped, filtered
+
+    def _sync_values(self, model_info: HFModelInfo) -> Dict[str, Any]:
+        """Значения обновляемых полей существующей модели."""
+        values = {
+            "downloads": model_info.downloads,
+            "likes": model_info.likes,
+            # Обрезаем так же, как при создании, иначе длинное описание всегда "изменено"
+            "description": (model_info.description or "")[:1000],
+            "tags": model_info.tags or [],
+            "is_featured": model_info.downloads > 10000,
+        }
 
-                # Обновляем через query.update()
-                db.query(AIModel).filter(AIModel.id == existing_model.id).update(update_data)
-                return False, True
-            else:
-                # Создаем новую модель
-                new_model = self._create_model_from_hf(model_info)
-                db.add(new_model)
-                return True, False
+        # Дату изменения HF обновляем, только если она известна
+        hf_last_modified = self._parse_hf_datetime(model_info.last_modified)
+        if hf_last_modified:
+            values["last_modified_hf"] = hf_last_modified
 
-        except Exception as e:
-            logger.error(f"Ошибка синхронизации модели: {e}")
-            return False, False
+        return values
 
     def _create_model_from_hf(self, model_info: HFModelInfo) -> AIModel:
         """Создает новую модель в БД из HF данных."""
         if not model_info:
             raise ValueError("model_info не может быть None")
 
+        return AIModel(**self._model_values_from_hf(model_info, datetime.now()))
+
+    def _model_values_from_hf(self, model_info: HFModelInfo, synced_at: datetime) -> Dict[str, Any]:
+        """Значения полей новой модели из HF данных."""
         # ✅ ДОБАВЛЕНО: Безопасная обрезка данных
-        return AIModel(
-            name=(model_info.id.split("/")[-1] if "/" in model_info.id else model_info.id)[:255],
-            full_name=model_info.id[:255],
-            hf_model_id=model_info.id[:255],
-            hf_url=f"https://huggingface.co/{model_info.id}"[:500],
-            author=(model_info.author or "")[:255],
-            description=(model_info.description or "")[:1000],
-            tags=model_info.tags,
-            pipeline_tag=(model_info.pipeline_tag or "")[:200],  # ✅ Увеличенный лимит
-            language=model_info.language,
-            downloads=model_info.downloads,
-            likes=model_info.likes,
-            model_size=(model_info.model_size or "")[:200],  # ✅ ИСПРАВЛЕНО: увеличен лимит
-            license=(model_info.license or "")[:100],
-            library_name=(model_info.library_name or "")[:100],
-            created_at_hf=self._parse_hf_datetime(model_info.created_at),
-            last_modified_hf=self._parse_hf_datetime(model_info.last_modified),
-            sync_status="synced",
-            last_sync_at=datetime.now(),
-            is_active=True,
-            is_featured=model_info.downloads > 10000,
-            provider="huggingface",
-            model_type=(model_info.pipeline_tag or "unknown")[:100],
-        )
+        return {
+            "name": (model_info.id.split("/")[-1] if "/" in model_info.id else model_info.id)[:255],
+            "full_name": model_info.id[:255],
+            "hf_model_id": model_info.id[:255],
+            "hf_url": f"https://huggingface.co/{model_info.id}"[:500],
+            "author": (model_info.author or "")[:255],
+            "description": (model_info.description or "")[:1000],
+            "tags": model_info.tags,
+            "pipeline_tag": (model_info.pipeline_tag or "")[:200],  # ✅ Увеличенный лимит
+            "language": model_info.language,
+            "downloads": model_info.downloads,
+            "likes": model_info.likes,
+            "model_size": (model_info.model_size or "")[:200],  # ✅ ИСПРАВЛЕНО: увеличен лимит
+            "license": (model_info.license or "")[:100],
+            "library_name": (model_info.library_name or "")[:100],
+            "created_at_hf": self._parse_hf_datetime(model_info.created_at),
+            "last_modified_hf": self._parse_hf_datetime(model_info.last_modified),
+            "sync_status": "synced",
+            "last_sync_at": synced_at,
+            "is_active": True,
+            "is_featured": model_info.downloads > 10000,
+            "provider": "huggingface",
+            "model_type": (model_info.pipeline_tag or "unknown")[:100],
+        }
 
     def _parse_hf_datetime(self, date_str: Optional[str]) -> Optional[datetime]:
         """Парсит дату из HF формата."""
@@ -506,11 +852,11 @@ def get_hf_service() -> HuggingFaceService:
     return HuggingFaceService()
 
 
-def sync_models_from_hf(limit: int = 200) -> Dict[str, Any]:
+def sync_models_from_hf(limit: int = 200, incremental: bool = False) -> Dict[str, Any]:
     """Синхронизирует модели с HuggingFace Hub."""
     hf_service = get_hf_service()
     sync_service = ModelSyncService(hf_service)
-    return sync_service.sync_popular_models(limit)
+    return sync_service.sync_popular_models(limit, incremental=incremental)
 
 
 def get_model_details_from_hf(model_id: str) -> Optional[HFModelInfo]:
@@ -0,0 +1,184 @@
+"""
+Параллельная проверка доступности AI-моделей с кэшированием результатов.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("neuro_assistant")
+
+
+@dataclass
+class AvailabilityResult:
+    """Результат проверки доступности модели."""
+
+    model_id: str
+    available: bool
+    error: Optional[str] = None
+    checked_at: float = 0.0
+    cached: bool = False
+
+    @property
+    def status(self) -> str:
+        return "ready" if self.available else "unavailable"
+
+
+def is_openai_model(model: Dict[str, Any]) -> bool:
+    """Проверяет, относится ли запись каталога к OpenAI API"""
+    return model.get("api_type") == "openai" or "openai" in model.get("huggingface_id", "").lower()
+
+
+class ModelAvailabilityChecker:
+    """
+    Проверяет доступность моделей в ограниченном пуле потоков.
+
+    Результаты кэшируются на ttl секунд (успешные) и negative_ttl секунд (ошибки),
+    поэтому повторные проверки в пределах TTL не обращаются к Hugging Face Hub.
+    Одновременные запросы на проверку одной и той же модели объединяются.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        ttl: float = 300.0,
+        negative_ttl: float = 60.0,
+        probe: Optional[Callable[[Dict[str, Any]], Tuple[bool, Optional[str]]]] = None,
+    ):
+        """
+        Args:
+            max_workers: Максимальное число одновременных проверок
+            ttl: Время жизни успешного результата в кэше (секунды)
+            negative_ttl: Время жизни неуспешного результата в кэше (секунды)
+            probe: Функция проверки модели, возвращающая (доступна, ошибка)
+        """
+        self.max_workers = max(1, max_workers)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.probe = probe or self._probe_model
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="model-check"
+        )
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Tuple[float, AvailabilityResult]] = {}
+        self._in_flight: Dict[str, Future] = {}
+
+    def check(self, model: Dict[str, Any], force: bool = False) -> AvailabilityResult:
+        """
+        Проверяет одну модель
+
+        Args:
+            model: Запись модели из каталога
+            force: Игнорировать кэш
+
+        Returns:
+            AvailabilityResult: Результат проверки
+        """
+        return self._submit(model, force).result()
+
+    def check_many(
+        self, models: List[Dict[str, Any]], force: bool = False
+    ) -> Iterator[AvailabilityResult]:
+        """
+        Проверяет несколько моделей параллельно
+
+        Результаты возвращаются по мере готовности, что позволяет отдавать
+        прогресс клиенту, не дожидаясь окончания всей проверки.
+
+        Args:
+            models: Записи моделей из каталога
+            force: Игнорировать кэш
+
+        Yields:
+            AvailabilityResult: Результаты проверки в порядке завершения
+        """
+        futures = [self._submit(model, force) for model in models]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def invalidate(self, model_id: Optional[str] = None):
+        """Сбрасывает кэш для модели или целиком"""
+        with self._lock:
+            if model_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(model_id, None)
+
+    def shutdown(self):
+        """Останавливает пул потоков"""
+        self._executor.shutdown(wait=False)
+
+    def _submit(self, model: Dict[str, Any], force: bool) -> Future:
+        """Возвращает future с результатом: из кэша, уже идущей проверки или новой"""
+        model_id = model["id"]
+        now = time.monotonic()
+
+        with self._lock:
+            if not force:
+                cached = self._cache.get(model_id)
+                if cached and cached[0] > now:
+                    future: Future = Future()
+                    result = cached[1]
+                    future.set_result(
+                        AvailabilityResult(
+                            model_id=result.model_id,
+                            available=result.available,
+                            error=result.error,
+                            checked_at=result.checked_at,
+                            cached=True,
+                        )
+                    )
+                    return future
+
+            in_flight = self._in_flight.get(model_id)
+            if in_flight is not None:
+                return in_flight
+
+            future = self._executor.submit(self._run_check, dict(model))
+            self._in_flight[model_id] = future
+            return future
+
+    def _run_check(self, model: Dict[str, Any]) -> AvailabilityResult:
+        """Выполняет проверку в рабочем потоке и сохраняет результат в кэш"""
+        model_id = model["id"]
+        try:
+            available, error = self.probe(model)
+        except Exception as e:
+            logger.error(f"Ошибка при проверке модели {model.get('name', model_id)}: {str(e)}")
+            available, error = False, str(e)
+
+        result = AvailabilityResult(
+            model_id=model_id, available=available, error=error, checked_at=time.time()
+        )
+
+        with self._lock:
+            # Проверка OpenAI зависит только от окружения и дешевая - её не кэшируем
+            if not is_openai_model(model):
+                ttl = self.ttl if available else self.negative_ttl
+                self._cache[model_id] = (time.monotonic() + ttl, result)
+            self._in_flight.pop(model_id, None)
+
+        return result
+
+    @staticmethod
+    def _probe_model(model: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """Проверяет модель OpenAI по наличию ключа, а модель HF - запросом к Hub"""
+        if is_openai_model(model):
+            if not os.environ.get("OPENAI_API_KEY"):
+                return (
+                    False,
+                    "API ключ OpenAI не найден. Установите переменную окружения OPENAI_API_KEY.",
+                )
+            return True, None
+
+        from huggingface_hub import model_info
+
+        info = model_info(model["huggingface_id"])
+        if info:
+            return True, None
+        return False, "Модель не найдена на Hugging Face Hub"
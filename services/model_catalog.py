@@ -0,0 +1,371 @@
+"""
+Каталог AI-моделей в памяти с отложенной записью на диск.
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("neuro_assistant")
+
+
+class ModelCatalog:
+    """
+    Хранит содержимое ai_models.json в памяти и индексирует модели по id.
+
+    Чтение выполняется из памяти; файл перечитывается только при изменении его mtime
+    (например, при ручном редактировании). Изменения помечают каталог как "грязный" и
+    сохраняются фоновым таймером: несколько обновлений, пришедших в течение
+    flush_delay, объединяются в одну атомарную запись (временный файл + os.replace).
+    """
+
+    def __init__(self, path: str, flush_delay: float = 0.5, check_interval: float = 1.0):
+        """
+        Args:
+            path: Путь к JSON-файлу с моделями
+            flush_delay: Задержка перед записью на диск (секунды)
+            check_interval: Минимальный интервал между проверками mtime файла (секунды)
+        """
+        self.path = path
+        self.flush_delay = flush_delay
+        self.check_interval = check_interval
+
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._data: Dict[str, Any] = {"models": []}
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._current_id: Optional[str] = None
+        self._loaded = False
+        self._mtime_ns: Optional[int] = None
+        self._last_check = 0.0
+        self._dirty = False
+        self._generation = 0
+        self._written_generation = 0
+        self._flush_timer: Optional[threading.Timer] = None
+
+    # Чтение
+
+    def exists(self) -> bool:
+        """Проверяет, есть ли данные в каталоге или файл на диске"""
+        with self._lock:
+            return self._loaded or os.path.exists(self.path)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Возвращает копию данных каталога в формате ai_models.json
+
+        Returns:
+            dict: {"models": [...], ...} с актуальным флагом is_current
+        """
+        with self._lock:
+            self._ensure_fresh()
+            data = {key: value for key, value in self._data.items() if key != "models"}
+            data["models"] = [
+                dict(model, is_current=model.get("id") == self._current_id)
+                for model in self._data["models"]
+            ]
+            return data
+
+    def get(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """Возвращает копию модели по id или None"""
+        with self._lock:
+            self._ensure_fresh()
+            model = self._index.get(model_id)
+            return dict(model) if model is not None else None
+
+    def get_current(self) -> Optional[Dict[str, Any]]:
+        """Возвращает копию текущей выбранной модели или None"""
+        with self._lock:
+            self._ensure_fresh()
+            if self._current_id is None:
+                return None
+            model = self._index.get(self._current_id)
+            return dict(model) if model is not None else None
+
+    # Изменение
+
+    def update_model(
+        self,
+        model_id: str,
+        fields: Dict[str, Any],
+        remove_keys: Iterable[str] = (),
+    ) -> bool:
+        """
+        Обновляет поля модели
+
+        Args:
+            model_id: Идентификатор модели
+            fields: Новые значения полей
+            remove_keys: Ключи, которые нужно удалить из записи модели
+
+        Returns:
+            bool: True, если модель найдена и изменена
+        """
+        with self._lock:
+            self._ensure_fresh()
+            model = self._index.get(model_id)
+            if model is None:
+                return False
+
+            changed = False
+            for key, value in fields.items():
+                if key not in model or model[key] != value:
+                    model[key] = value
+                    changed = True
+            for key in remove_keys:
+                if key in model:
+                    del model[key]
+                    changed = True
+
+            if changed:
+                self._mark_dirty()
+            return True
+
+    def update_many(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Обновляет несколько моделей одной операцией
+
+        Args:
+            updates: Словарь {model_id: {поле: значение}}
+
+        Returns:
+            int: Количество найденных моделей
+        """
+        with self._lock:
+            found = 0
+            for model_id, fields in updates.items():
+                if self.update_model(model_id, fields):
+                    found += 1
+            return found
+
+    def set_current(self, model_id: str) -> bool:
+        """Делает модель текущей"""
+        with self._lock:
+            self._ensure_fresh()
+            if model_id not in self._index:
+                return False
+
+            if self._current_id != model_id:
+                for model in self._data["models"]:
+                    model["is_current"] = model.get("id") == model_id
+                self._current_id = model_id
+                self._mark_dirty()
+            return True
+
+    def add_model(self, model: Dict[str, Any]) -> bool:
+        """Добавляет модель, если модели с таким id ещё нет"""
+        with self._lock:
+            self._ensure_fresh()
+            if model["id"] in self._index:
+                return False
+
+            model = dict(model)
+            self._data["models"].append(model)
+            self._index[model["id"]] = model
+            if model.get("is_current"):
+                self._current_id = model["id"]
+            self._mark_dirty()
+            return True
+
+    def remove_model(self, model_id: str) -> bool:
+        """Удаляет модель из каталога"""
+        with self._lock:
+            self._ensure_fresh()
+            model = self._index.pop(model_id, None)
+            if model is None:
+                return False
+
+            self._data["models"] = [m for m in self._data["models"] if m is not model]
+            if self._current_id == model_id:
+                self._current_id = None
+            self._mark_dirty()
+            return True
+
+    def replace(self, data: Dict[str, Any], flush: bool = False):
+        """
+        Полностью заменяет содержимое каталога
+
+        Args:
+            data: Данные в формате ai_models.json
+            flush: Записать на диск немедленно, а не отложенно
+        """
+        with self._lock:
+            self._set_data(data)
+            self._loaded = True
+            self._mark_dirty()
+            if flush:
+                self.flush()
+
+    # Персистентность
+
+    def flush(self) -> bool:
+        """
+        Синхронно записывает накопленные изменения на диск
+
+        Returns:
+            bool: True, если запись выполнена или изменений не было
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            if not self._dirty:
+                return True
+
+            # Сериализуем под блокировкой, а пишем на диск без неё,
+            # чтобы чтение каталога не ждало fsync
+            payload = json.dumps(self._data, ensure_ascii=False, indent=2)
+            generation = self._generation
+            self._dirty = False
+
+        with self._write_lock:
+            # Более новый снимок мог быть записан параллельным flush
+            if generation < self._written_generation:
+                return True
+            try:
+                mtime_ns = self._write_atomic(payload)
+            except Exception as e:
+                logger.error(f"Ошибка при сохранении каталога моделей {self.path}: {str(e)}")
+                with self._lock:
+                    self._dirty = True
+                return False
+            self._written_generation = generation
+
+        with self._lock:
+            self._mtime_ns = mtime_ns
+        return True
+
+    def reload(self):
+        """Принудительно перечитывает файл, отбрасывая несохранённые изменения"""
+        with self._lock:
+            self._dirty = False
+            self._load()
+
+    def _ensure_fresh(self):
+        """Загружает файл при первом обращении и перечитывает его при изменении mtime"""
+        if not self._loaded:
+            self._load()
+            return
+
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        mtime_ns = self._stat_mtime()
+        if mtime_ns is None or mtime_ns == self._mtime_ns:
+            return
+
+        if self._dirty:
+            # Файл изменили извне, но у нас есть несохранённые изменения - они приоритетнее
+            logger.warning(
+                f"Файл {self.path} изменён извне при наличии несохранённых изменений каталога"
+            )
+            return
+
+        logger.info(f"Файл {self.path} изменён, перечитываем каталог моделей")
+        self._load()
+
+    def _load(self):
+        """Читает файл с моделями в память"""
+        self._last_check = time.monotonic()
+        mtime_ns = self._stat_mtime()
+        if mtime_ns is None:
+            self._set_data({"models": []})
+            self._loaded = False
+            self._mtime_ns = None
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        self._set_data(data)
+        self._loaded = True
+        self._mtime_ns = mtime_ns
+
+    def _set_data(self, data: Dict[str, Any]):
+        """Устанавливает данные и перестраивает индекс"""
+        models: List[Dict[str, Any]] = [dict(m) for m in data.get("models", [])]
+        self._data = {key: value for key, value in data.items() if key != "models"}
+        self._data["models"] = models
+        self._index = {m["id"]: m for m in models if "id" in m}
+        self._current_id = next((m["id"] for m in models if m.get("is_current")), None)
+
+    def _mark_dirty(self):
+        """Помечает каталог изменённым и планирует отложенную запись"""
+        self._dirty = True
+        self._generation += 1
+        if self.flush_delay <= 0:
+            self.flush()
+            return
+
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_delay, self._flush_from_timer)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush_from_timer(self):
+        """Обработчик таймера отложенной записи"""
+        with self._lock:
+            self._flush_timer = None
+        self.flush()
+
+    def _write_atomic(self, payload: str) -> Optional[int]:
+        """
+        Записывает данные во временный файл и атомарно заменяет им основной
+
+        Returns:
+            int: mtime записанного файла в наносекундах
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(prefix=".ai_models.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return self._stat_mtime()
+
+    def _stat_mtime(self) -> Optional[int]:
+        """Возвращает mtime файла в наносекундах или None, если файла нет"""
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+
+# Глобальные экземпляры каталогов (по пути к файлу)
+_catalogs: Dict[str, ModelCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_model_catalog(path: str, flush_delay: float = 0.5) -> ModelCatalog:
+    """Получить общий для процесса каталог моделей для указанного файла"""
+    key = os.path.abspath(path)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = ModelCatalog(path, flush_delay=flush_delay)
+            _catalogs[key] = catalog
+        return catalog
+
+
+@atexit.register
+def _flush_all_catalogs():
+    """Сохраняет несохранённые изменения всех каталогов при завершении процесса"""
+    for catalog in list(_catalogs.values()):
+        catalog.flush()
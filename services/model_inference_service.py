@@ -1,12 +1,20 @@
+import asyncio
 import logging
 import os
-from typing import Any, Dict, Optional, Tuple
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .generation_batcher import GenerationBatcher
+from .model_residency import ModelResidencyManager
+from .openai_client import get_async_openai_client, get_openai_client
 
 logger = logging.getLogger("neuro_assistant")
 
 # Опциональные импорты для ML библиотек
 try:
     import torch
+    from transformers.generation.streamers import TextIteratorStreamer
     from transformers.models.auto.modeling_auto import AutoModelForCausalLM
     from transformers.models.auto.tokenization_auto import AutoTokenizer
     from transformers.pipelines import pipeline
@@ -35,10 +43,40 @@ except ImportError:
 class ModelInferenceService:
     """Сервис для загрузки и выполнения инференса моделей"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        batch_max_size: int = 8,
+        batch_max_wait: float = 0.01,
+        memory_budget_mb: int = 0,
+        eviction_policy: str = "lru",
+    ):
+        """
+        Args:
+            batch_max_size: Максимальное число запросов в одном вызове generate
+            batch_max_wait: Сколько ждать одновременных запросов для пакета (секунды)
+            memory_budget_mb: Бюджет памяти на загруженные модели (0 - без ограничения)
+            eviction_policy: Политика вытеснения моделей: "lru" или "lfu"
+        """
         self.loaded_models = {}
         self.loaded_tokenizers = {}
         self.model_cache = {}
+        # Одновременные запросы к локальной HF модели объединяются в один generate
+        self.batcher = GenerationBatcher(
+            self._generate_hf_batch, max_batch_size=batch_max_size, max_wait=batch_max_wait
+        )
+        # При превышении бюджета памяти давно не используемые модели выгружаются
+        self.residency = ModelResidencyManager(
+            budget_bytes=memory_budget_mb * 2**20,
+            policy=eviction_policy,
+            on_evict=self.unload_model,
+        )
+        self._pinned_model: Optional[str] = None
+        self._load_lock = threading.Lock()
+        self._prefetch_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="model-prefetch"
+        )
+        self._prefetching: Dict[str, Future] = {}
+        self._prefetch_lock = threading.Lock()
 
     def check_model_availability(self, model_id: str) -> Dict[str, Any]:
         """Проверяет доступность модели для инференса"""
@@ -61,10 +99,18 @@ class ModelInferenceService:
             logger.error(f"Ошибка проверки доступности модели {model_id}: {e}")
             return {"available": False, "error": str(e), "model_id": model_id}
 
-    def load_model(self, model_id: str):
-        """Загружает модель для инференса"""
+    def load_model(self, model_id: str, speculative: bool = False):
+        """
+        Загружает модель для инференса
+
+        Args:
+            model_id: Идентификатор модели
+            speculative: Предзагрузка: модель загружается, только если помещается
+                в свободный бюджет памяти, ничего не вытесняя
+        """
         try:
             if model_id in self.loaded_models:
+                self.residency.touch(model_id)
                 return self.loaded_models[model_id]
 
             # OpenAI модели не требуют локальной загрузки
@@ -74,10 +120,26 @@ class ModelInferenceService:
 
             # Загрузка HuggingFace модели
             if HF_TRANSFORMERS_AVAILABLE:
-                model = self._load_hf_model(model_id)
-                if model:
-                    self.loaded_models[model_id] = model
-                    return model
+                # Одна загрузка за раз: параллельная предзагрузка не загрузит модель
+                # повторно, а учёт памяти видит модели по очереди
+                with self._load_lock:
+                    if model_id in self.loaded_models:
+                        return self.loaded_models[model_id]
+                    # Место освобождается до загрузки, чтобы старая и новая модели
+                    # не оказались в памяти одновременно
+                    size = self._estimate_hf_model_size(model_id)
+                    if not self.residency.reserve(model_id, size, speculative=speculative):
+                        logger.info(
+                            f"Предзагрузка {model_id} пропущена: модель не помещается "
+                            "в бюджет памяти"
+                        )
+                        return None
+                    model = self._load_hf_model(model_id)
+                    if model:
+                        self.loaded_models[model_id] = model
+                        self.residency.admit(model_id, model, speculative=speculative)
+                        # Отменённая предзагрузка уже выгружена
+                        return self.loaded_models.get(model_id)
 
             return None
 
@@ -123,9 +185,70 @@ class ModelInferenceService:
             logger.error(f"Ошибка генерации текста: {e}")
             return f"Ошибка генерации: {str(e)}"
 
+    async def agenerate_text(
+        self, model_id: str, prompt: str, max_length: int = 100, **kwargs
+    ) -> str:
+        """
+        Асинхронный вариант generate_text
+
+        Запросы к OpenAI выполняются асинхронным клиентом, поэтому несколько
+        запросов (asyncio.gather) одновременно находятся в обработке. Локальная
+        генерация выполняется в отдельном потоке.
+        """
+        if self._is_openai_model(model_id):
+            return await self._agenerate_openai(model_id, prompt, max_length, **kwargs)
+        return await asyncio.to_thread(self.generate_text, model_id, prompt, max_length, **kwargs)
+
+    def stream_text(
+        self, model_id: str, prompt: str, max_length: int = 100, **kwargs
+    ) -> Iterator[str]:
+        """
+        Генерирует текст по частям (токенам) по мере готовности
+
+        В отличие от generate_text ошибки не превращаются в текст ответа,
+        а пробрасываются вызывающему коду.
+
+        Yields:
+            str: Очередной фрагмент сгенерированного текста
+        """
+        if self._is_openai_model(model_id):
+            return self._stream_openai(model_id, prompt, max_length, **kwargs)
+        return self._stream_hf(model_id, prompt, max_length, **kwargs)
+
+    def pin_model(self, model_id: str):
+        """Закрепляет модель (текущую) в памяти, снимая закрепление с предыдущей"""
+        if self._pinned_model and self._pinned_model != model_id:
+            self.residency.unpin(self._pinned_model)
+        self._pinned_model = model_id
+        self.residency.pin(model_id)
+        self.residency.record_selection(model_id)
+
+    def prefetch_model(self, model_id: str, speculative: bool = False) -> Future:
+        """
+        Загружает модель и токенизатор в фоне
+
+        Повторный вызов для модели, которая ещё загружается, возвращает тот же Future.
+        Спекулятивная предзагрузка пропускается, если модель не помещается в бюджет.
+        """
+        with self._prefetch_lock:
+            future = self._prefetching.get(model_id)
+            if future is None or future.done():
+                future = self._prefetch_executor.submit(self._prefetch, model_id, speculative)
+                self._prefetching[model_id] = future
+            return future
+
+    def prefetch_likely_next(self, model_id: str) -> Optional[Future]:
+        """Предзагружает модель, которую чаще всего выбирают после model_id"""
+        next_model = self.residency.predict_next(model_id)
+        if not next_model or next_model in self.loaded_models:
+            return None
+        logger.info(f"Предзагрузка вероятной следующей модели: {next_model}")
+        return self.prefetch_model(next_model, speculative=True)
+
     def unload_model(self, model_id: str):
         """Выгружает модель из памяти"""
         try:
+            self.residency.discard(model_id)
             if model_id in self.loaded_models:
                 del self.loaded_models[model_id]
             if model_id in self.loaded_tokenizers:
@@ -149,6 +272,8 @@ class ModelInferenceService:
             "loaded_models": list(self.loaded_models.keys()),
             "loaded_tokenizers": list(self.loaded_tokenizers.keys()),
             "memory_usage": self._get_memory_usage(),
+            "batching": self.batcher.get_metrics(),
+            "residency": self.residency.get_stats(),
         }
 
     # Приватные методы
@@ -209,6 +334,29 @@ class ModelInferenceService:
             logger.error(f"Не удалось загрузить модель {model_id}: {e}")
             return None
 
+    def _estimate_hf_model_size(self, model_id: str) -> int:
+        """
+        Оценивает размер модели до загрузки
+
+        Берётся размер при прошлой загрузке, иначе - число параметров из метаданных
+        safetensors на Hub. Без бюджета памяти оценка не нужна (0).
+        """
+        if not self.residency.budget_bytes:
+            return 0
+        known = self.residency.known_size(model_id)
+        if known:
+            return known
+        try:
+            from huggingface_hub import HfApi
+
+            safetensors = HfApi().model_info(model_id).safetensors
+            parameters = safetensors.total if safetensors else 0
+        except Exception as e:
+            logger.debug(f"Не удалось оценить размер модели {model_id}: {e}")
+            return 0
+        # Модель загружается в float16 на GPU и в float32 на CPU
+        return parameters * (2 if torch.cuda.is_available() else 4)
+
     def _load_hf_tokenizer(self, model_id: str):
         """Загружает HuggingFace токенизатор"""
         try:
@@ -232,51 +380,80 @@ class ModelInferenceService:
             if not api_key:
                 return "OPENAI_API_KEY не установлен"
 
-            # Настройка OpenAI API (новый способ)
-            import openai
-
-            client = openai.OpenAI(api_key=api_key)
+            # Общий клиент: соединения из его пула переиспользуются между запросами
+            client = get_openai_client(api_key, os.environ.get("OPENAI_BASE_URL"))
 
             logger.info(f"Отправляем запрос к OpenAI модели: {model_id}")
 
             # ✅ НОВЫЙ API OpenAI
             response = client.chat.completions.create(
-                model=model_id,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_length,
-                temperature=kwargs.get("temperature", 0.7),
-                top_p=kwargs.get("top_p", 1.0),
-                frequency_penalty=kwargs.get("frequency_penalty", 0),
-                presence_penalty=kwargs.get("presence_penalty", 0),
+                **self._openai_request(model_id, prompt, max_length, **kwargs)
             )
+            return self._extract_openai_content(response)
 
-            # ✅ Детальная проверка ответа
-            if not response:
-                return "Пустой ответ от OpenAI API"
-
-            if not response.choices:
-                return "Нет вариантов ответа от модели"
-
-            choice = response.choices[0]
-            if not choice:
-                return "Пустой выбор от модели"
+        except Exception as e:
+            logger.error(f"Ошибка OpenAI API: {e}")
+            return f"Ошибка OpenAI API: {str(e)}"
 
-            if not choice.message:
-                return "Нет сообщения от модели"
+    async def _agenerate_openai(self, model_id: str, prompt: str, max_length: int, **kwargs) -> str:
+        """Асинхронная генерация через OpenAI API"""
+        try:
+            if not OPENAI_AVAILABLE:
+                return "OpenAI библиотека недоступна"
+            api_key = os.environ.get("OPENAI_API_KEY")
+            if not api_key:
+                return "OPENAI_API_KEY не установлен"
 
-            content = choice.message.content
-            if not content:
-                return "Пустой контент от модели"
+            client = get_async_openai_client(api_key, os.environ.get("OPENAI_BASE_URL"))
 
-            result = content.strip()
-            logger.info(f"Получен ответ от OpenAI (длина: {len(result)})")
+            logger.info(f"Отправляем асинхронный запрос к OpenAI модели: {model_id}")
 
-            return result if result else "Пустой ответ после обработки"
+            response = await client.chat.completions.create(
+                **self._openai_request(model_id, prompt, max_length, **kwargs)
+            )
+            return self._extract_openai_content(response)
 
         except Exception as e:
             logger.error(f"Ошибка OpenAI API: {e}")
             return f"Ошибка OpenAI API: {str(e)}"
 
+    def _openai_request(self, model_id: str, prompt: str, max_length: int, **kwargs) -> dict:
+        """Параметры запроса chat.completions"""
+        return {
+            "model": model_id,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_length,
+            "temperature": kwargs.get("temperature", 0.7),
+            "top_p": kwargs.get("top_p", 1.0),
+            "frequency_penalty": kwargs.get("frequency_penalty", 0),
+            "presence_penalty": kwargs.get("presence_penalty", 0),
+        }
+
+    def _extract_openai_content(self, response) -> str:
+        """Извлекает текст ответа chat.completions"""
+        # ✅ Детальная проверка ответа
+        if not response:
+            return "Пустой ответ от OpenAI API"
+
+        if not response.choices:
+            return "Нет вариантов ответа от модели"
+
+        choice = response.choices[0]
+        if not choice:
+            return "Пустой выбор от модели"
+
+        if not choice.message:
+            return "Нет сообщения от модели"
+
+        content = choice.message.content
+        if not content:
+            return "Пустой контент от модели"
+
+        result = content.strip()
+        logger.info(f"Получен ответ от OpenAI (длина: {len(result)})")
+
+        return result if result else "Пустой ответ после обработки"
+
     def _generate_hf(self, model_id: str, prompt: str, max_length: int, **kwargs) -> str:
         """Генерация через HuggingFace модель"""
         try:
@@ -285,33 +462,139 @@ class ModelInferenceService:
 
             if not model or not tokenizer:
                 return "Модель или токенизатор не загружены"
+            self.residency.touch(model_id)
 
-            # Токенизация
-            inputs = tokenizer(prompt, return_tensors="pt", truncation=True)
-
-            # Генерация
-            with torch.no_grad():
-                outputs = model.generate(
-                    inputs.input_ids,
-                    max_new_tokens=max_length,
-                    temperature=kwargs.get("temperature", 0.7),
-                    do_sample=True,
-                    pad_token_id=tokenizer.eos_token_id,
-                )
-
-            # Декодирование
-            generated_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
-
-            # Убираем исходный промпт из ответа
-            if generated_text.startswith(prompt):
-                generated_text = generated_text[len(prompt) :].strip()
-
-            return generated_text
+            # Генерация выполняется пакетом вместе с одновременными запросами к модели
+            return self.batcher.generate(
+                model_id, prompt, max_length, temperature=kwargs.get("temperature", 0.7)
+            )
 
         except Exception as e:
             logger.error(f"Ошибка HF генерации: {e}")
             return f"Ошибка генерации: {str(e)}"
 
+    def _generate_hf_batch(
+        self,
+        model_id: str,
+        prompts: List[str],
+        max_new_tokens: List[int],
+        params: Dict[str, Any],
+    ) -> List[str]:
+        """
+        Генерирует ответы на несколько промптов одним вызовом generate
+
+        Промпты дополняются слева до общей длины, поэтому новые токены всех строк
+        начинаются с одной позиции. Генерация идёт до наибольшего max_new_tokens,
+        каждая строка обрезается до своего лимита.
+        """
+        model = self.loaded_models.get(model_id)
+        tokenizer = self.loaded_tokenizers.get(model_id)
+
+        if not model or not tokenizer:
+            raise RuntimeError("Модель или токенизатор не загружены")
+
+        # Для decoder-only моделей дополнение должно быть слева
+        tokenizer.padding_side = "left"
+        inputs = tokenizer(prompts, return_tensors="pt", padding=True, truncation=True)
+
+        with torch.no_grad():
+            outputs = model.generate(
+                inputs.input_ids,
+                attention_mask=inputs.attention_mask,
+                max_new_tokens=max(max_new_tokens),
+                temperature=params.get("temperature", 0.7),
+                do_sample=True,
+                pad_token_id=tokenizer.eos_token_id,
+            )
+
+        prompt_length = inputs.input_ids.shape[1]
+        return [
+            tokenizer.decode(
+                output[prompt_length : prompt_length + limit], skip_special_tokens=True
+            ).strip()
+            for output, limit in zip(outputs, max_new_tokens)
+        ]
+
+    def _stream_openai(
+        self, model_id: str, prompt: str, max_length: int, **kwargs
+    ) -> Iterator[str]:
+        """Потоковая генерация через OpenAI API"""
+        if not OPENAI_AVAILABLE:
+            raise RuntimeError("OpenAI библиотека недоступна")
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY не установлен")
+
+        client = get_openai_client(api_key, os.environ.get("OPENAI_BASE_URL"))
+
+        logger.info(f"Отправляем потоковый запрос к OpenAI модели: {model_id}")
+
+        stream = client.chat.completions.create(
+            **self._openai_request(model_id, prompt, max_length, **kwargs), stream=True
+        )
+
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                yield content
+
+    def _stream_hf(self, model_id: str, prompt: str, max_length: int, **kwargs) -> Iterator[str]:
+        """Потоковая генерация через HuggingFace модель (TextIteratorStreamer)"""
+        if not HF_TRANSFORMERS_AVAILABLE:
+            raise RuntimeError("Transformers библиотека не установлена")
+
+        model = self.loaded_models.get(model_id)
+        tokenizer = self.loaded_tokenizers.get(model_id)
+
+        if not model or not tokenizer:
+            raise RuntimeError("Модель или токенизатор не загружены")
+        self.residency.touch(model_id)
+
+        inputs = tokenizer(prompt, return_tensors="pt", truncation=True)
+        # skip_prompt - в поток попадает только сгенерированный текст
+        streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+        errors = []
+
+        def generate():
+            try:
+                with torch.no_grad():
+                    model.generate(
+                        inputs.input_ids,
+                        max_new_tokens=max_length,
+                        temperature=kwargs.get("temperature", 0.7),
+                        do_sample=True,
+                        pad_token_id=tokenizer.eos_token_id,
+                        streamer=streamer,
+                    )
+            except Exception as e:
+                logger.error(f"Ошибка HF генерации: {e}")
+                errors.append(e)
+                # Разблокируем читателя потока
+                streamer.end()
+
+        # generate() блокирует поток до конца генерации, поэтому запускаем его отдельно,
+        # а фрагменты забираем из streamer по мере декодирования
+        thread = threading.Thread(target=generate, name=f"hf-stream-{model_id}", daemon=True)
+        thread.start()
+
+        for text in streamer:
+            if text:
+                yield text
+
+        thread.join()
+        if errors:
+            raise errors[0]
+
+    def _prefetch(self, model_id: str, speculative: bool = False) -> bool:
+        """Загружает модель и токенизатор (выполняется в потоке предзагрузки)"""
+        model = self.load_model(model_id, speculative=speculative)
+        if not model:
+            return False
+        tokenizer = self.load_tokenizer(model_id)
+        return bool(tokenizer)
+
     def _get_memory_usage(self) -> Dict[str, Any]:
         """Получает информацию об использовании памяти"""
         try:
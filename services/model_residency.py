@@ -0,0 +1,256 @@
+"""
+Учёт загруженных в память моделей и их вытеснение по бюджету памяти.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("neuro_assistant")
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+
+def estimate_model_size(model: Any) -> int:
+    """
+    Оценивает объём памяти модели в байтах по её параметрам и буферам
+
+    Для объектов без parameters()/buffers() (например, API-моделей) возвращает 0.
+    """
+    size = 0
+    for attr in ("parameters", "buffers"):
+        tensors = getattr(model, attr, None)
+        if not callable(tensors):
+            continue
+        try:
+            size += sum(t.numel() * t.element_size() for t in tensors())
+        except Exception as e:
+            logger.debug(f"Не удалось оценить размер модели: {e}")
+    return size
+
+
+@dataclass
+class ResidentModel:
+    """Модель, находящаяся в памяти."""
+
+    model_id: str
+    size_bytes: int
+    loaded_at: float
+    last_used: float
+    hits: int = 0
+
+
+class ModelResidencyManager:
+    """
+    Следит за объёмом памяти, занятым моделями, и выбирает модели для выгрузки.
+
+    Место под модель освобождается до загрузки (reserve) по оценке её размера
+    и ещё раз после загрузки (admit) по фактическому размеру: давно не
+    использовавшиеся (lru) или редко используемые (lfu) модели вытесняются, пока
+    суммарный размер не уложится в budget_bytes. Закреплённые модели не
+    вытесняются. Спекулятивная предзагрузка ничего не вытесняет: если модель не
+    помещается в свободный бюджет, загрузка пропускается или отменяется. Сама
+    выгрузка выполняется колбэком on_evict. Переходы между выбранными моделями
+    запоминаются, чтобы предсказать следующую модель для предзагрузки.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int = 0,
+        policy: str = "lru",
+        on_evict: Optional[Callable[[str], Any]] = None,
+        size_of: Callable[[Any], int] = estimate_model_size,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            budget_bytes: Бюджет памяти на модели в байтах (0 - без ограничения)
+            policy: Политика вытеснения: "lru" или "lfu"
+            on_evict: Функция выгрузки модели по её идентификатору
+            size_of: Функция оценки размера модели
+            clock: Источник времени (подменяется в тестах)
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Неизвестная политика вытеснения: {policy}")
+
+        self.budget_bytes = max(0, budget_bytes)
+        self.policy = policy
+        self.on_evict = on_evict
+        self._size_of = size_of
+        self._clock = clock
+
+        self._models: Dict[str, ResidentModel] = {}
+        self._pinned: set = set()
+        self._known_sizes: Dict[str, int] = {}
+        self._transitions: Dict[str, Counter] = defaultdict(Counter)
+        self._last_selected: Optional[str] = None
+        self._evictions = 0
+        self._lock = threading.RLock()
+
+    @property
+    def used_bytes(self) -> int:
+        """Суммарный размер моделей в памяти"""
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._models.values())
+
+    def known_size(self, model_id: str) -> int:
+        """Размер модели при прошлой загрузке (0, если модель ещё не загружалась)"""
+        with self._lock:
+            return self._known_sizes.get(model_id, 0)
+
+    def reserve(self, model_id: str, size_bytes: int = 0, speculative: bool = False) -> bool:
+        """
+        Освобождает место под модель до её загрузки
+
+        Args:
+            model_id: Идентификатор модели
+            size_bytes: Оценка размера модели (0 - размер при прошлой загрузке)
+            speculative: Предзагрузка: вытеснять ничего нельзя
+
+        Returns:
+            bool: False, если спекулятивная загрузка не помещается в свободный бюджет
+        """
+        with self._lock:
+            size = size_bytes or self._known_sizes.get(model_id, 0)
+            if not self.budget_bytes:
+                return True
+            if speculative:
+                return self.used_bytes + size <= self.budget_bytes
+            victims = self._select_victims(exclude=model_id, incoming=size)
+            self._remove(victims)
+
+        self._evict(victims)
+        return True
+
+    def admit(self, model_id: str, model: Any, speculative: bool = False) -> List[str]:
+        """
+        Регистрирует загруженную модель и освобождает место под бюджет
+
+        Спекулятивно загруженная модель, которая не помещается в свободный бюджет,
+        сразу выгружается сама и попадает в список вытесненных.
+
+        Returns:
+            List[str]: Идентификаторы вытесненных моделей
+        """
+        size = self._size_of(model)
+        now = self._clock()
+        with self._lock:
+            self._known_sizes[model_id] = size
+            if speculative and self.budget_bytes and self.used_bytes + size > self.budget_bytes:
+                logger.info(
+                    f"Предзагрузка {model_id} отменена: {size / 2**20:.0f} МБ не помещаются "
+                    f"в бюджет {self.budget_bytes / 2**20:.0f} МБ"
+                )
+                victims = [model_id]
+            else:
+                self._models[model_id] = ResidentModel(model_id, size, now, now)
+                victims = self._select_victims(exclude=model_id)
+                self._remove(victims)
+                logger.info(f"Модель {model_id} в памяти: {size / 2**20:.0f} МБ")
+
+                if self.budget_bytes and self.used_bytes > self.budget_bytes:
+                    logger.warning(
+                        f"Модели в памяти занимают {self.used_bytes / 2**20:.0f} МБ при "
+                        f"бюджете {self.budget_bytes / 2**20:.0f} МБ: остальные модели "
+                        "закреплены"
+                    )
+
+        self._evict(victims)
+        return victims
+
+    def touch(self, model_id: str):
+        """Отмечает обращение к модели"""
+        with self._lock:
+            entry = self._models.get(model_id)
+            if entry:
+                entry.hits += 1
+                entry.last_used = self._clock()
+
+    def discard(self, model_id: str):
+        """Убирает модель из учёта (после явной выгрузки)"""
+        with self._lock:
+            self._models.pop(model_id, None)
+
+    def pin(self, model_id: str):
+        """Запрещает вытеснение модели"""
+        with self._lock:
+            self._pinned.add(model_id)
+
+    def unpin(self, model_id: str):
+        """Снимает запрет на вытеснение модели"""
+        with self._lock:
+            self._pinned.discard(model_id)
+
+    def record_selection(self, model_id: str):
+        """Запоминает переход от предыдущей выбранной модели к model_id"""
+        with self._lock:
+            previous = self._last_selected
+            if previous and previous != model_id:
+                self._transitions[previous][model_id] += 1
+            self._last_selected = model_id
+
+    def predict_next(self, model_id: str) -> Optional[str]:
+        """Возвращает модель, которую чаще всего выбирали после model_id"""
+        with self._lock:
+            transitions = self._transitions.get(model_id)
+            if not transitions:
+                return None
+            return transitions.most_common(1)[0][0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает состояние учёта памяти"""
+        with self._lock:
+            return {
+                "policy": self.policy,
+                "budget_bytes": self.budget_bytes,
+                "used_bytes": self.used_bytes,
+                "evictions": self._evictions,
+                "pinned": sorted(self._pinned),
+                "models": {
+                    entry.model_id: {"size_bytes": entry.size_bytes, "hits": entry.hits}
+                    for entry in self._models.values()
+                },
+            }
+
+    def _select_victims(self, exclude: str, incoming: int = 0) -> List[str]:
+        """Выбирает модели для вытеснения, пока не уложимся в бюджет с учётом incoming"""
+        if not self.budget_bytes:
+            return []
+
+        candidates = [
+            entry
+            for entry in self._models.values()
+            if entry.model_id != exclude and entry.model_id not in self._pinned
+        ]
+        if self.policy == "lfu":
+            candidates.sort(key=lambda entry: (entry.hits, entry.last_used))
+        else:
+            candidates.sort(key=lambda entry: entry.last_used)
+
+        used = self.used_bytes + incoming
+        victims = []
+        for entry in candidates:
+            if used <= self.budget_bytes:
+                break
+            victims.append(entry.model_id)
+            used -= entry.size_bytes
+        return victims
+
+    def _remove(self, victims: List[str]):
+        """Убирает выбранные модели из учёта (вызывается под блокировкой)"""
+        for victim in victims:
+            self._models.pop(victim, None)
+        self._evictions += len(victims)
+
+    def _evict(self, victims: List[str]):
+        """Выгружает вытесненные модели колбэком on_evict"""
+        for victim in victims:
+            logger.info(f"Модель {victim} вытеснена из памяти ({self.policy})")
+            if self.on_evict:
+                try:
+                    self.on_evict(victim)
+                except Exception as e:
+                    logger.error(f"Ошибка выгрузки модели {victim}: {e}")
@@ -0,0 +1,116 @@
+"""
+Общие клиенты OpenAI API с пулом соединений.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger("neuro_assistant")
+
+try:
+    import httpx
+    import openai
+
+    OPENAI_CLIENT_AVAILABLE = hasattr(openai, "OpenAI")
+except ImportError:
+    OPENAI_CLIENT_AVAILABLE = False
+
+ClientKey = Tuple[str, Optional[str]]
+
+_clients: Dict[ClientKey, Any] = {}
+_clients_lock = threading.Lock()
+
+# Асинхронный httpx-клиент привязан к событийному циклу, поэтому кэшируется
+# отдельно для каждого цикла и освобождается вместе с ним
+_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _limits() -> "httpx.Limits":
+    """Размер пула соединений"""
+    return httpx.Limits(
+        max_connections=Config.OPENAI_POOL_SIZE,
+        max_keepalive_connections=Config.OPENAI_POOL_SIZE,
+    )
+
+
+def _timeout() -> "httpx.Timeout":
+    """Таймауты запросов: общий и на установку соединения"""
+    return httpx.Timeout(Config.OPENAI_TIMEOUT, connect=Config.OPENAI_CONNECT_TIMEOUT)
+
+
+def get_openai_client(api_key: str, base_url: Optional[str] = None):
+    """
+    Получить общий клиент OpenAI для ключа и адреса API
+
+    Клиент и его пул соединений создаются один раз и переиспользуются всеми
+    запросами, поэтому соединения остаются открытыми (keep-alive).
+
+    Args:
+        api_key: Ключ OpenAI API
+        base_url: Адрес OpenAI-совместимого API (None - по умолчанию)
+
+    Returns:
+        openai.OpenAI: Клиент
+    """
+    if not OPENAI_CLIENT_AVAILABLE:
+        raise RuntimeError("OpenAI библиотека недоступна")
+
+    key = (api_key, base_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            logger.info(f"Создаём клиент OpenAI для {base_url or 'api.openai.com'}")
+            client = openai.OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=_timeout(),
+                max_retries=Config.OPENAI_MAX_RETRIES,
+                http_client=httpx.Client(limits=_limits(), timeout=_timeout()),
+            )
+            _clients[key] = client
+        return client
+
+
+def get_async_openai_client(api_key: str, base_url: Optional[str] = None):
+    """
+    Получить асинхронный клиент OpenAI для текущего событийного цикла
+
+    Args:
+        api_key: Ключ OpenAI API
+        base_url: Адрес OpenAI-совместимого API (None - по умолчанию)
+
+    Returns:
+        openai.AsyncOpenAI: Клиент
+    """
+    if not OPENAI_CLIENT_AVAILABLE:
+        raise RuntimeError("OpenAI библиотека недоступна")
+
+    loop = asyncio.get_running_loop()
+    key = (api_key, base_url)
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=_timeout(),
+                max_retries=Config.OPENAI_MAX_RETRIES,
+                http_client=httpx.AsyncClient(limits=_limits(), timeout=_timeout()),
+            )
+            clients[key] = client
+        return client
+
+
+def close_openai_clients():
+    """Закрывает синхронные клиенты и их соединения"""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
@@ -0,0 +1,224 @@
+"""
+Кэш ответов AI-моделей по точному совпадению запроса.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("neuro_assistant")
+
+
+def normalize_prompt(prompt: Any) -> Any:
+    """
+    Нормализует промпт для ключа кэша
+
+    В строках схлопываются пробельные символы; список сообщений чата
+    нормализуется поэлементно. Регистр сохраняется - он может менять смысл.
+    """
+    if isinstance(prompt, str):
+        return " ".join(prompt.split())
+    if isinstance(prompt, dict):
+        return {key: normalize_prompt(value) for key, value in prompt.items()}
+    if isinstance(prompt, (list, tuple)):
+        return [normalize_prompt(item) for item in prompt]
+    return prompt
+
+
+def make_cache_key(model_id: str, prompt: Any, params: Optional[Dict[str, Any]] = None) -> str:
+    """Ключ кэша: хэш (модель, нормализованный промпт, параметры генерации)"""
+    payload = json.dumps(
+        [model_id, normalize_prompt(prompt), params or {}],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU-кэш ответов с ограничением размера и временем жизни записей.
+
+    Кэшируются только детерминированные вызовы: с do_sample=False или с явно
+    заданной temperature не выше max_temperature. Вызов без temperature
+    считается сэмплирующим (провайдер использует свои значения по умолчанию). При указании disk_path записи
+    дублируются в SQLite и переживают перезапуск приложения; промах в памяти
+    проверяется на диске.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl: float = 3600,
+        max_temperature: float = 0.3,
+        disk_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            max_entries: Максимальное число записей в памяти
+            ttl: Время жизни записи (секунды)
+            max_temperature: Наибольшая temperature, при которой ответ кэшируется
+            disk_path: Путь к файлу SQLite для дискового уровня (None - без него)
+            clock: Источник времени (подменяется в тестах)
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self._clock = clock
+
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path:
+            self._open_disk(disk_path)
+
+    def is_cacheable(self, params: Optional[Dict[str, Any]] = None) -> bool:
+        """Проверяет, детерминирован ли вызов с такими параметрами"""
+        params = params or {}
+        if params.get("do_sample") is False:
+            return True
+        temperature = params.get("temperature")
+        return temperature is not None and temperature <= self.max_temperature
+
+    def get(self, key: str) -> Optional[str]:
+        """Возвращает ответ из кэша или None"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                del self._entries[key]
+                self._stats["expired"] += 1
+
+            entry = self._disk_get(key, now)
+            if entry is not None:
+                self._store(key, *entry)
+                self._stats["hits"] += 1
+                self._stats["disk_hits"] += 1
+                return entry[0]
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str):
+        """Сохраняет ответ в кэш"""
+        expires_at = self._clock() + self.ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+            self._disk_set(key, value, expires_at)
+
+    def get_or_compute(
+        self,
+        model_id: str,
+        prompt: Any,
+        params: Optional[Dict[str, Any]],
+        compute: Callable[[], Optional[str]],
+    ) -> Optional[str]:
+        """
+        Возвращает ответ из кэша или вычисляет и сохраняет его
+
+        Пустые ответы и None не кэшируются, как и вызовы без temperature или
+        с высокой temperature.
+        """
+        if not self.is_cacheable(params):
+            return compute()
+
+        key = make_cache_key(model_id, prompt, params)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        value = compute()
+        if value and value.strip():
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        """Очищает кэш в памяти и на диске"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает счётчики попаданий и промахов"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        """Закрывает файл дискового уровня"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _store(self, key: str, value: str, expires_at: float):
+        """Кладёт запись в память, вытесняя самые старые при переполнении"""
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _open_disk(self, path: str):
+        """Открывает (создаёт) файл SQLite дискового уровня"""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (self._clock(),))
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Дисковый кэш ответов недоступен ({path}): {e}")
+            self._db = None
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        """Читает неистёкшую запись с диска"""
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Ошибка чтения дискового кэша ответов: {e}")
+            return None
+        return (row[0], row[1]) if row else None
+
+    def _disk_set(self, key: str, value: str, expires_at: float):
+        """Записывает запись на диск"""
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Ошибка записи дискового кэша ответов: {e}")
@@ -0,0 +1,88 @@
+"""
+Планирование шагов составной команды: разбиение на шаги и граф зависимостей.
+"""
+
+from typing import List
+
+from models.command_models import CommandStep
+
+# Разделители, после которых шаг ждёт завершения предыдущих
+SEQUENTIAL_SEPARATORS = [" затем ", " после этого ", " потом ", ", "]
+# Разделители независимых шагов
+PARALLEL_SEPARATORS = [" и "]
+
+
+def _split(parts: List[str], separators: List[str]) -> List[str]:
+    """Разбивает каждую часть по всем разделителям"""
+    for separator in separators:
+        parts = [piece for part in parts for piece in part.split(separator)]
+    return parts
+
+
+def plan_steps(text: str) -> List[CommandStep]:
+    """
+    Разбивает команду на шаги с зависимостями
+
+    Команда делится на этапы по последовательным разделителям ("затем",
+    "потом", запятая), этапы - на независимые шаги по "и". Каждый шаг этапа
+    зависит от всех шагов предыдущего этапа. Повторяющиеся шаги удаляются.
+
+    Returns:
+        list: Шаги с заполненным depends_on (номера шагов)
+    """
+    steps: List[CommandStep] = []
+    seen = set()
+    previous_stage: List[int] = []
+
+    for stage_text in _split([text], SEQUENTIAL_SEPARATORS):
+        stage = []
+        for part in _split([stage_text], PARALLEL_SEPARATORS):
+            part = part.strip()
+            if not part or part in seen:
+                continue
+            seen.add(part)
+            step = CommandStep(
+                step_number=len(steps) + 1,
+                description=part,
+                status="pending",
+                completion_percentage=0.0,
+                depends_on=list(previous_stage),
+            )
+            steps.append(step)
+            stage.append(step.step_number)
+        if stage:
+            previous_stage = stage
+
+    return steps
+
+
+def step_levels(steps: List[CommandStep]) -> List[List[CommandStep]]:
+    """
+    Группирует шаги по уровням графа зависимостей
+
+    Шаги одного уровня не зависят друг от друга и могут выполняться
+    параллельно; уровень начинается после завершения всех предыдущих.
+    Зависимости от неизвестных шагов игнорируются.
+
+    Raises:
+        ValueError: Если в зависимостях есть цикл
+    """
+    numbers = {step.step_number for step in steps}
+    remaining = {step.step_number: {n for n in step.depends_on if n in numbers} for step in steps}
+    done = set()
+    levels = []
+
+    while remaining:
+        ready = [
+            step
+            for step in steps
+            if step.step_number in remaining and remaining[step.step_number] <= done
+        ]
+        if not ready:
+            raise ValueError(f"Циклическая зависимость шагов: {sorted(remaining)}")
+        for step in ready:
+            del remaining[step.step_number]
+            done.add(step.step_number)
+        levels.append(ready)
+
+    return levels
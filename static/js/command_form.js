@@ -279,21 +279,9 @@ function handleCommandSubmit(e) {
 	// Показываем элементы управления командой
 	showCommandControls()
 
-	// Отправляем запрос на сервер
-	// ✅ ИСПРАВЛЕНО: /api/query → /api/tasks/query
-	fetch('/api/tasks/query', {
-		method: 'POST',
-		headers: {
-			'Content-Type': 'application/json',
-		},
-		body: JSON.stringify({ input: input }),
-	})
-		.then((response) => {
-			if (!response.ok) {
-				throw new Error(`HTTP error! Status: ${ response.status }`)
-			}
-			return response.json()
-		})
+	// Отправляем команду в очередь и следим за ходом выполнения
+	window.mainModule
+		.runTaskQuery(input, (execution) => updateProgressBar(execution.completion_percentage))
 		.then((data) => {
 			console.log('Ответ сервера:', data)
 
@@ -254,22 +254,12 @@ class Dashboard {
     this.updateProgress(0, 'Отправка команды...');
 
     try {
-      // ✅ ИСПРАВЛЕНО: /api/query → /api/tasks/query
-      const response = await fetch('/api/tasks/query', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ input: command })
+      // Команда выполняется в фоне; прогресс приходит по мере выполнения шагов
+      this.updateProgress(10, 'Выполнение...');
+      const data = await window.mainModule.runTaskQuery(command, (execution) => {
+        this.updateProgress(execution.completion_percentage, 'Выполнение...');
       });
 
-      if (!response.ok) throw new Error(`HTTP ${ response.status }`);
-
-      const data = await response.json();
-
-      // Обновляем прогресс
-      this.updateProgress(50, 'Выполнение...');
-
       if (data.is_compound) {
         // Составная команда - показываем прогресс по шагам
         await this.handleCompoundCommand(data);
@@ -12,6 +12,8 @@ function interruptCommand() {
 			headers: {
 				'Content-Type': 'application/json',
 			},
+			// Отменяем только своё задание, не затрагивая команды других пользователей
+			body: JSON.stringify({ job_id: currentTaskJobId }),
 		})
 			.then((response) => response.json())
 			.then((data) => {
@@ -131,12 +133,67 @@ function updateProgressBar(percentage) {
 	}
 }
 
+// Идентификатор выполняемого задания команды
+let currentTaskJobId = null
+
+/**
+ * Отправляет команду в очередь и ждёт её выполнения
+ * @param {string} input - Текст команды
+ * @param {Function} onProgress - Вызывается со снимком выполнения (CommandExecution)
+ * @returns {Promise<Object>} Результат выполнения команды
+ */
+async function runTaskQuery(input, onProgress) {
+	const response = await fetch('/api/tasks/query', {
+		method: 'POST',
+		headers: {
+			'Content-Type': 'application/json',
+		},
+		body: JSON.stringify({ input: input }),
+	})
+	if (!response.ok) {
+		throw new Error(`HTTP error! Status: ${ response.status }`)
+	}
+
+	const job = await response.json()
+	currentTaskJobId = job.job_id
+
+	try {
+		return await new Promise((resolve, reject) => {
+			const source = new EventSource(job.stream_url)
+
+			source.addEventListener('progress', (event) => {
+				const data = JSON.parse(event.data)
+				if (data.progress && onProgress) {
+					onProgress(data.progress)
+				}
+			})
+			source.addEventListener('done', (event) => {
+				source.close()
+				const data = JSON.parse(event.data)
+				if (data.status === 'failed' || !data.result) {
+					reject(new Error(data.error || 'Команда не выполнена'))
+				} else {
+					resolve(data.result)
+				}
+			})
+			source.addEventListener('error', (event) => {
+				source.close()
+				const message = event.data ? JSON.parse(event.data).error : 'Соединение прервано'
+				reject(new Error(message))
+			})
+		})
+	} finally {
+		currentTaskJobId = null
+	}
+}
+
 // Экспортируем функции для использования в других модулях
 window.mainModule = {
 	showCommandControls,
 	hideCommandControls,
 	updateProgressBar,
 	interruptCommand,
+	runTaskQuery,
 }
 
 /**
@@ -363,7 +363,7 @@ class ModalManager {
     this.promptInput.style.height = 'auto';
 
     try {
-      const response = await fetch(`/api/chat/chats/${ this.currentSessionId }/messages`, {
+      const response = await fetch(`/api/chat/chats/${ this.currentSessionId }/messages/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -378,8 +378,7 @@ class ModalManager {
         throw new Error(errorMessage);
       }
 
-      const aiMessage = await response.json();
-      this.addMessageToUI(aiMessage.role, aiMessage.content);
+      await this.readMessageStream(response);
     } catch (error) {
       console.error("Error sending message:", error);
 
@@ -401,6 +400,46 @@ class ModalManager {
     }
   }
 
+  // Читает ответ AI в формате Server-Sent Events и дописывает фрагменты в сообщение
+  async readMessageStream(response) {
+    const messageDiv = this.addMessageToUI('assistant', '');
+    const contentEl = messageDiv.querySelector('.message-content');
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let content = '';
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split('\n\n');
+      buffer = events.pop();
+
+      for (const rawEvent of events) {
+        let event = 'message';
+        let data = '';
+        for (const line of rawEvent.split('\n')) {
+          if (line.startsWith('event:')) event = line.slice(6).trim();
+          else if (line.startsWith('data:')) data += line.slice(5).trim();
+        }
+        if (!data) continue;
+
+        const payload = JSON.parse(data);
+        if (event === 'token') {
+          content += payload.content;
+        } else if (event === 'done') {
+          content = payload.content;
+        } else if (event === 'error') {
+          throw new Error(payload.error);
+        }
+        contentEl.innerHTML = content.replace(/\n/g, '<br>');
+        this.chatHistoryEl.scrollTop = this.chatHistoryEl.scrollHeight;
+      }
+    }
+  }
+
   renderMessages(messages) {
     this.chatHistoryEl.innerHTML = '';
     if (messages.length === 0) {
@@ -429,6 +468,7 @@ class ModalManager {
     if (scroll) {
       this.chatHistoryEl.scrollTop = this.chatHistoryEl.scrollHeight;
     }
+    return messageDiv;
   }
 
   setLoading(isLoading) {
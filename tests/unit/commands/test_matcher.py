@@ -0,0 +1,72 @@
+import pytest
+
+from commands.matcher import CommandMatcher, benchmark
+
+
+class TestCommandMatcher:
+    """Тесты для поиска команд автоматом Ахо-Корасик"""
+
+    @pytest.fixture
+    def matcher(self):
+        commands = {"открыть": None, "открыть браузер": None, "сделать скриншот": None}
+        aliases = {"скрин": "сделать скриншот", "браузер": "открыть браузер"}
+        intents = {"работа_с_экраном": ["сделать скриншот"]}
+        return CommandMatcher(commands, aliases, intents)
+
+    def test_finds_all_overlapping_matches(self, matcher):
+        """Тест поиска всех вхождений за один проход"""
+        patterns = [m.pattern for m in matcher.find_all("открыть браузер")]
+
+        assert sorted(patterns) == ["браузер", "открыть", "открыть браузер"]
+
+    def test_longest_match_wins(self, matcher):
+        """Тест выбора самого длинного совпадения"""
+        match = matcher.match("пожалуйста, открыть браузер")
+
+        assert match.pattern == "открыть браузер"
+        assert (match.start, match.end) == (12, 27)
+
+    def test_exact_match_wins(self):
+        """Тест приоритета полного совпадения с текстом"""
+        matcher = CommandMatcher({"громче": None, "сделай громче": None}, {})
+
+        assert matcher.match("громче").pattern == "громче"
+
+    def test_alias_resolves_to_command(self, matcher):
+        """Тест псевдонима"""
+        match = matcher.match("сделай скрин")
+
+        assert match.is_alias
+        assert match.command == "сделать скриншот"
+        assert match.intent == "работа_с_экраном"
+
+    def test_command_wins_over_alias_of_same_length(self):
+        """Тест детерминированного выбора при равной длине"""
+        aliases = {"пуск": "старт", "стоп": "старт"}
+
+        for order in (aliases, dict(reversed(list(aliases.items())))):
+            matcher = CommandMatcher({"тише": None}, order)
+            assert matcher.match("пуск тише").pattern == "тише"
+            assert matcher.match("стоп пуск").pattern == "стоп"
+
+    def test_no_match(self, matcher):
+        """Тест текста без команд"""
+        assert matcher.match("какая погода") is None
+
+    def test_agrees_with_substring_search(self):
+        """Тест совпадения результатов с наивным поиском подстрок"""
+        patterns = {"he": None, "she": None, "his": None, "hers": None, "ушер": None}
+        matcher = CommandMatcher(patterns)
+        text = "ushers and his sheep, ушерс"
+
+        found = {(m.pattern, m.start) for m in matcher.find_all(text)}
+        expected = {(p, i) for p in patterns for i in range(len(text)) if text.startswith(p, i)}
+        assert found == expected
+
+
+def test_benchmark():
+    """Тест бенчмарка на тысячах псевдонимов"""
+    result = benchmark(alias_count=2000, text_count=100)
+
+    assert result["patterns"] == pytest.approx(2200, rel=0.01)
+    assert result["matcher_us_per_text"] > 0
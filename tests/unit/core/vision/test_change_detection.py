@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+
+from core.vision.change_detection import TileChangeDetector
+
+
+class TestTileChangeDetector(unittest.TestCase):
+    """Тесты обнаружения изменений по хешам плиток"""
+
+    def setUp(self):
+        """Настройка перед каждым тестом"""
+        self.detector = TileChangeDetector(tile_size=32, scale=0.5)
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+
+    def test_identical_frames(self):
+        """Тест сравнения одинаковых кадров"""
+        report = self.detector.compare(self.frame, self.frame.copy())
+
+        self.assertFalse(report.changed)
+        self.assertEqual(report.change_percentage, 0.0)
+        self.assertEqual(report.regions, [])
+
+    def test_single_pixel_change(self):
+        """Тест обнаружения изменения одного пикселя на большом кадре"""
+        changed = self.frame.copy()
+        changed[700, 5] = 255 if self.frame[700, 5].mean() < 128 else 0
+
+        report = self.detector.compare(self.frame, changed)
+
+        self.assertTrue(report.changed)
+        self.assertEqual(report.changed_tiles, 1)
+        self.assertEqual(report.regions, [(0, 640, 64, 64)])
+        self.assertLess(report.change_percentage, 1.0)
+
+    def test_dirty_rectangles_are_merged(self):
+        """Тест объединения соседних плиток в прямоугольники"""
+        changed = self.frame.copy()
+        changed[0:100, 0:100] = 0
+        changed[600:610, 1270:1280] = 0
+
+        report = self.detector.compare(self.frame, changed)
+
+        self.assertEqual(sorted(report.regions), [(0, 0, 128, 128), (1216, 576, 64, 64)])
+        expected = (128 * 128 + 64 * 64) / (1280 * 720) * 100
+        self.assertAlmostEqual(report.change_percentage, expected)
+
+    def test_partial_edge_tiles(self):
+        """Тест кадра, размер которого не кратен плитке"""
+        detector = TileChangeDetector(tile_size=8, scale=1.0)
+        frame = np.zeros((20, 30), dtype=np.uint8)
+        changed = frame.copy()
+        changed[19, 29] = 255
+
+        report = detector.compare(frame, changed)
+
+        self.assertEqual(report.regions, [(24, 16, 6, 4)])
+        self.assertAlmostEqual(report.change_percentage, 6 * 4 / (20 * 30) * 100)
+
+    def test_update_keeps_previous_signature(self):
+        """Тест сравнения с предыдущим кадром"""
+        self.assertFalse(self.detector.update(self.frame).changed)
+        self.assertFalse(self.detector.update(self.frame).changed)
+
+        changed = self.frame.copy()
+        changed[100:120, 100:120] = 0
+        self.assertTrue(self.detector.update(changed).changed)
+        self.assertFalse(self.detector.update(changed).changed)
+
+    def test_invalid_tile_size(self):
+        """Тест проверки размера плитки"""
+        with self.assertRaises(ValueError):
+            TileChangeDetector(tile_size=12)
+
+
+if __name__ == "__main__":
+    unittest.main()
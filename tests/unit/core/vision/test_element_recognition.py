@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import patch
 
+import cv2
 import numpy as np
 
 from core.vision.element_recognition import ElementRecognition
@@ -13,17 +14,16 @@ class TestElementRecognition(unittest.TestCase):
         """Настройка перед каждым тестом"""
         self.element_recognition = ElementRecognition()
 
-    @patch("cv2.matchTemplate")
-    @patch("cv2.minMaxLoc")
-    def test_find_template(self, mock_min_max_loc, mock_match_template):
-        """Тест поиска шаблона на изображении"""
-        # Создаем тестовые изображения
-        screen = np.zeros((1080, 1920, 3), dtype=np.uint8)
-        template = np.zeros((100, 100, 3), dtype=np.uint8)
+    def _make_screen(self):
+        """Гладкое случайное изображение, похожее на экран"""
+        rng = np.random.default_rng(0)
+        small = rng.integers(0, 256, (68, 120, 3), dtype=np.uint8)
+        return cv2.resize(small, (1920, 1080), interpolation=cv2.INTER_CUBIC)
 
-        # Настраиваем моки
-        mock_match_template.return_value = np.zeros((980, 1820), dtype=np.float32)
-        mock_min_max_loc.return_value = (0, 0.95, (0, 0), (500, 300))
+    def test_find_template(self):
+        """Тест поиска шаблона на изображении"""
+        screen = self._make_screen()
+        template = screen[300:400, 500:600].copy()
 
         # Ищем шаблон
         result = self.element_recognition.find_template(screen, template, threshold=0.8)
@@ -38,23 +38,13 @@ class TestElementRecognition(unittest.TestCase):
         self.assertEqual(result[1], 300)  # y
         self.assertEqual(result[2], 100)  # width
         self.assertEqual(result[3], 100)  # height
-        self.assertAlmostEqual(result[4], 0.95)  # confidence
-
-        # Проверяем вызовы функций
-        mock_match_template.assert_called_once()
-        mock_min_max_loc.assert_called_once()
+        self.assertGreater(result[4], 0.99)  # confidence
 
-    @patch("cv2.matchTemplate")
-    @patch("cv2.minMaxLoc")
-    def test_find_template_not_found(self, mock_min_max_loc, mock_match_template):
+    def test_find_template_not_found(self):
         """Тест поиска шаблона, который не найден на изображении"""
-        # Создаем тестовые изображения
-        screen = np.zeros((1080, 1920, 3), dtype=np.uint8)
-        template = np.zeros((100, 100, 3), dtype=np.uint8)
-
-        # Настраиваем моки для имитации низкой уверенности
-        mock_match_template.return_value = np.zeros((980, 1820), dtype=np.float32)
-        mock_min_max_loc.return_value = (0, 0.7, (0, 0), (500, 300))
+        screen = self._make_screen()
+        rng = np.random.default_rng(1)
+        template = rng.integers(0, 256, (100, 100, 3), dtype=np.uint8)
 
         # Ищем шаблон с порогом 0.8
         result = self.element_recognition.find_template(screen, template, threshold=0.8)
@@ -62,9 +52,37 @@ class TestElementRecognition(unittest.TestCase):
         # Проверяем результат
         self.assertIsNone(result)
 
-        # Проверяем вызовы функций
-        mock_match_template.assert_called_once()
-        mock_min_max_loc.assert_called_once()
+    def test_find_template_in_region(self):
+        """Тест поиска шаблона в области: координаты относительно всего изображения"""
+        screen = self._make_screen()
+        template = screen[300:400, 500:600].copy()
+
+        result = self.element_recognition.find_template(
+            screen, template, region=(400, 200, 400, 400)
+        )
+        self.assertEqual(result[:4], (500, 300, 100, 100))
+
+        # Вне области шаблон не ищется
+        result = self.element_recognition.find_template(
+            screen, template, region=(1000, 500, 400, 400)
+        )
+        self.assertIsNone(result)
+
+    def test_find_template_scaled(self):
+        """Тест поиска шаблона, увеличенного на экране (HiDPI)"""
+        screen = self._make_screen()
+        template = screen[300:360, 500:560].copy()
+        scaled_screen = cv2.resize(screen, None, fx=1.5, fy=1.5, interpolation=cv2.INTER_LINEAR)
+
+        result = self.element_recognition.find_template(
+            scaled_screen, template, scales=(1.0, 1.25, 1.5, 2.0)
+        )
+        if result is None:
+            self.fail("Увеличенный шаблон должен быть найден")
+            return
+        self.assertEqual(result[2:4], (90, 90))
+        self.assertLessEqual(abs(result[0] - 750), 1)
+        self.assertLessEqual(abs(result[1] - 450), 1)
 
     def test_get_element_center(self):
         """Тест получения центра элемента"""
@@ -0,0 +1,116 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from core.vision.capture_backends import FakeCaptureBackend
+from core.vision.frame_stream import FrameStream
+from core.vision.screen_capture import ScreenCapture
+from core.vision.screen_changes import ScreenChanges
+
+
+class TestFrameStream(unittest.TestCase):
+    """Тесты потока кадров экрана"""
+
+    def setUp(self):
+        """Настройка перед каждым тестом"""
+        self.backend = FakeCaptureBackend(width=80, height=60)
+        self.stream = FrameStream(ScreenCapture(backend=self.backend), fps=200, buffer_size=4)
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        self.stream.stop()
+
+    def test_subscribers_share_frames(self):
+        """Тест получения одних и тех же кадров всеми подписчиками"""
+        with self.stream.subscribe() as first, self.stream.subscribe() as second:
+            frame = first.next_frame(timeout=2)
+            same = self.stream.wait_for_frame(frame.index - 1, timeout=2)
+            newer = second.next_frame(timeout=2)
+
+        self.assertGreaterEqual(same.index, frame.index)
+        self.assertGreaterEqual(newer.index, frame.index)
+        self.assertFalse(frame.image.flags.writeable)
+        # Каждый кадр захвачен один раз, независимо от числа подписчиков
+        self.assertLessEqual(len(self.stream.frames()), 4)
+        self.assertEqual(self.backend.grab_count, self.stream.latest().index + 1)
+
+    def test_capture_stops_without_subscribers(self):
+        """Тест остановки захвата после закрытия последней подписки"""
+        subscription = self.stream.subscribe()
+        self.assertIsNotNone(subscription.next_frame(timeout=2))
+        subscription.close()
+
+        deadline = time.monotonic() + 2
+        while self.stream.running and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self.stream.running)
+
+        # Повторная подписка снова запускает захват
+        with self.stream.subscribe() as subscription:
+            self.assertIsNotNone(subscription.next_frame(timeout=2))
+
+    def test_next_frame_respects_not_before(self):
+        """Тест ожидания кадра, захваченного не раньше заданного момента"""
+        with self.stream.subscribe() as subscription:
+            first = subscription.next_frame(timeout=2)
+            second = subscription.next_frame(timeout=2, not_before=first.timestamp + 0.05)
+
+        self.assertGreaterEqual(second.timestamp - first.timestamp, 0.05)
+
+    def test_waiters_detect_region_change(self):
+        """Тест обнаружения изменения в области двумя ожидающими задачами"""
+        screen_changes = ScreenChanges(frame_stream=self.stream)
+        results = []
+
+        def wait():
+            results.append(
+                screen_changes.wait_for_changes_in_region((10, 10, 20, 20), timeout=2, delay=0.01)
+            )
+
+        waiters = [threading.Thread(target=wait) for _ in range(2)]
+        for waiter in waiters:
+            waiter.start()
+        time.sleep(0.1)
+        self.backend.frame = np.full((60, 80, 3), 255, dtype=np.uint8)
+        for waiter in waiters:
+            waiter.join()
+
+        self.assertEqual(results, [True, True])
+
+    def _wait_stopped(self):
+        deadline = time.monotonic() + 2
+        while self.stream.running and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self.stream.running)
+
+    def test_new_subscription_skips_stale_frames(self):
+        """Тест: кадры прежней подписки не выдаются новой"""
+        with self.stream.subscribe() as subscription:
+            old = subscription.next_frame(timeout=2)
+        self._wait_stopped()
+
+        with self.stream.subscribe() as subscription:
+            frame = subscription.next_frame(timeout=2)
+
+        self.assertGreater(frame.index, old.index)
+        self.assertGreaterEqual(frame.timestamp, subscription.started)
+
+    def test_static_screen_after_previous_session(self):
+        """Тест: изменение между сессиями ожидания не считается новым изменением"""
+        screen_changes = ScreenChanges(frame_stream=self.stream)
+        self.assertFalse(screen_changes.wait_for_changes(timeout=0.1, delay=0.01))
+        self._wait_stopped()
+
+        # Экран изменился, пока никто не ждал, и дальше не меняется
+        self.backend.frame = np.full((60, 80, 3), 255, dtype=np.uint8)
+
+        self.assertFalse(screen_changes.wait_for_changes(timeout=0.3, delay=0.01))
+        self._wait_stopped()
+        report = screen_changes.detect_change_regions(delay=0.01)
+        self.assertFalse(report.changed)
+
+
+if __name__ == "__main__":
+    unittest.main()
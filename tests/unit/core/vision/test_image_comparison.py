@@ -55,53 +55,84 @@ class TestImageComparison(unittest.TestCase):
 
     def test_compare_images_different_size(self):
         """Тест сравнения изображений разного размера"""
-        # Создаем изображения разного размера
+        # Создаем изображения разного размера с одинаковым содержимым
         img1 = np.zeros((100, 100, 3), dtype=np.uint8)
-        img2 = np.zeros((200, 200, 3), dtype=np.uint8)
+        img1[20:40, 20:40] = 255
+        img2 = cv2.resize(img1, (200, 200), interpolation=cv2.INTER_NEAREST)
 
-        # Сравниваем изображения
-        similarity = self.image_comparison.compare_images(img1, img2)
+        # Сравниваем изображения с разными политиками
+        resized = self.image_comparison.compare_images(img1, img2, resize_policy="resize")
+        padded = self.image_comparison.compare_images(img1, img2, resize_policy="pad")
+        cropped = self.image_comparison.compare_images(img1, img2, resize_policy="crop")
 
         # Проверяем результат
-        self.assertLess(similarity, 1.0)  # Изображения разного размера не могут быть идентичными
+        self.assertEqual(resized, 1.0)  # После масштабирования содержимое совпадает
+        self.assertLess(padded, 1.0)
+        self.assertLess(cropped, 1.0)
+
+        with self.assertRaises(ValueError):
+            self.image_comparison.compare_images(img1, img2, resize_policy="reject")
 
-    @patch("cv2.resize")
+    @patch("cv2.resize", wraps=cv2.resize)
     def test_compare_images_with_resize(self, mock_resize):
         """Тест сравнения изображений с изменением размера"""
         # Создаем изображения
         img1 = np.zeros((100, 100, 3), dtype=np.uint8)
         img2 = np.zeros((200, 200, 3), dtype=np.uint8)
 
-        # Настраиваем мок для resize
-        mock_resize.return_value = np.zeros((100, 100, 3), dtype=np.uint8)
-
-        # Переопределяем метод compare_images для этого теста
-        original_compare_images = self.image_comparison.compare_images
-
-        def mock_compare_images(img1, img2):
-            # Вызываем cv2.resize для проверки вызова
-            if img1.shape != img2.shape:
-                # Изменяем переменную img2_resized на просто результат вызова cv2.resize
-                # Это исправляет проблему с неиспользуемой переменной
-                cv2.resize(img2, (img1.shape[1], img1.shape[0]))
-                return 1.0
-            return original_compare_images(img1, img2)
-
-        # Заменяем метод
-        self.image_comparison.compare_images = mock_compare_images
+        # Сравниваем изображения
+        similarity = self.image_comparison.compare_images(img1, img2)
 
+        # Проверяем результат
+        self.assertEqual(similarity, 1.0)  # После изменения размера изображения идентичны
+
+        # Проверяем вызов функции resize
+        mock_resize.assert_called_once()
+
+    def test_compare_images_metrics(self):
+        """Тест метрик сходства"""
+        rng = np.random.default_rng(0)
+        img1 = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+        img2 = img1.copy()
+        img2[:60] = 255
+
+        for metric in ("mse", "ssim", "histogram"):
+            with self.subTest(metric=metric):
+                self.assertAlmostEqual(
+                    self.image_comparison.compare_images(img1, img1.copy(), metric=metric),
+                    1.0,
+                    places=5,
+                )
+                similarity = self.image_comparison.compare_images(img1, img2, metric=metric)
+                self.assertGreater(similarity, 0.0)
+                self.assertLess(similarity, 0.9)
+
+    def test_compare_images_mse_matches_definition(self):
+        """Тест MSE по определению"""
+        rng = np.random.default_rng(1)
+        img1 = rng.integers(0, 256, (50, 70, 3), dtype=np.uint8)
+        img2 = rng.integers(0, 256, (50, 70, 3), dtype=np.uint8)
+
+        gray1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY).astype(float)
+        gray2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY).astype(float)
+        expected = 1.0 - np.mean((gray1 - gray2) ** 2) / 255.0**2
+
+        self.assertAlmostEqual(self.image_comparison.compare_images(img1, img2), expected)
+
+    def test_register_metric(self):
+        """Тест подключения своей метрики"""
+        from core.vision.image_comparison import METRICS, register_metric
+
+        register_metric("constant", lambda gray1, gray2, scratch: 0.25)
         try:
-            # Сравниваем изображения
-            similarity = self.image_comparison.compare_images(img1, img2)
-
-            # Проверяем результат
-            self.assertEqual(similarity, 1.0)  # После изменения размера изображения идентичны
-
-            # Проверяем вызов функции resize
-            mock_resize.assert_called_once()
+            img = np.zeros((10, 10, 3), dtype=np.uint8)
+            similarity = ImageComparison(metric="constant").compare_images(img, img)
+            self.assertEqual(similarity, 0.25)
         finally:
-            # Восстанавливаем оригинальный метод
-            self.image_comparison.compare_images = original_compare_images
+            del METRICS["constant"]
+
+        with self.assertRaises(ValueError):
+            ImageComparison(metric="unknown")
 
 
 if __name__ == "__main__":
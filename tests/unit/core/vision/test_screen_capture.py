@@ -10,7 +10,7 @@ class TestScreenCapture(unittest.TestCase):
         """Подготовка перед каждым тестом"""
         from core.vision.screen_capture import ScreenCapture
 
-        self.screen_capture = ScreenCapture()
+        self.screen_capture = ScreenCapture(backend="pyautogui")
 
         # Создаем директорию для тестовых скриншотов
         self.test_dir = "test_screenshots"
@@ -25,7 +25,7 @@ class TestScreenCapture(unittest.TestCase):
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
 
-    @patch("core.vision.screen_capture.pyautogui.screenshot")
+    @patch("pyautogui.screenshot")
     def test_capture_screen(self, mock_screenshot):
         """Тест захвата всего экрана"""
         # Создаем мок-объект для скриншота
@@ -46,12 +46,12 @@ class TestScreenCapture(unittest.TestCase):
         if screenshot is not None:
             self.assertEqual(screenshot.shape[0], 1080)  # Высота
             self.assertEqual(screenshot.shape[1], 1920)  # Ширина
-            self.assertEqual(screenshot.shape[2], 3)  # Каналы (RGB)
+            self.assertEqual(screenshot.shape[2], 3)  # Каналы (BGR)
 
         # Проверяем, что pyautogui.screenshot был вызван
         mock_screenshot.assert_called_once()
 
-    @patch("core.vision.screen_capture.pyautogui.screenshot")
+    @patch("pyautogui.screenshot")
     def test_capture_region(self, mock_screenshot):
         """Тест захвата области экрана"""
         # Создаем мок-объект для скриншота
@@ -75,12 +75,12 @@ class TestScreenCapture(unittest.TestCase):
         if screenshot is not None:
             self.assertEqual(screenshot.shape[0], 300)  # Высота
             self.assertEqual(screenshot.shape[1], 500)  # Ширина
-            self.assertEqual(screenshot.shape[2], 3)  # Каналы (RGB)
+            self.assertEqual(screenshot.shape[2], 3)  # Каналы (BGR)
 
         # Проверяем, что pyautogui.screenshot был вызван с правильными параметрами
         mock_screenshot.assert_called_once_with(region=region)
 
-    @patch("core.vision.screen_capture.pyautogui.screenshot")
+    @patch("pyautogui.screenshot")
     @patch("cv2.imwrite")
     def test_save_screenshot(self, mock_imwrite, mock_screenshot):
         """Тест сохранения скриншота в файл"""
@@ -105,7 +105,7 @@ class TestScreenCapture(unittest.TestCase):
         mock_screenshot.assert_called_once()
         mock_imwrite.assert_called_once()
 
-    @patch("core.vision.screen_capture.pyautogui.size")
+    @patch("pyautogui.size")
     def test_get_screen_size(self, mock_size):
         """Тест получения размеров экрана"""
         # Настраиваем мок для size
@@ -119,7 +119,7 @@ class TestScreenCapture(unittest.TestCase):
         self.assertEqual(height, 1080)
         mock_size.assert_called_once()
 
-    @patch("core.vision.screen_capture.pyautogui.screenshot")
+    @patch("pyautogui.screenshot")
     def test_capture_screen_error(self, mock_screenshot):
         """Тест обработки ошибки при захвате экрана"""
         # Настраиваем мок для имитации ошибки
@@ -131,3 +131,62 @@ class TestScreenCapture(unittest.TestCase):
         # Проверяем результат
         self.assertIsNone(screenshot)
         mock_screenshot.assert_called_once()
+
+    @patch("pyautogui.screenshot")
+    def test_capture_returns_bgr(self, mock_screenshot):
+        """Тест преобразования кадра pyautogui (RGB) в BGR"""
+        mock_img = MagicMock()
+        mock_array = np.zeros((10, 20, 3), dtype=np.uint8)
+        mock_array[:, :, 0] = 255  # Красный канал RGB
+        mock_img.__array__ = lambda *args, **kwargs: mock_array
+        mock_screenshot.return_value = mock_img
+
+        screenshot = self.screen_capture.capture_screen()
+
+        self.assertTrue((screenshot[:, :, 2] == 255).all())
+        self.assertTrue((screenshot[:, :, 0] == 0).all())
+
+
+class TestFakeCaptureBackend(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        from core.vision.capture_backends import FakeCaptureBackend
+        from core.vision.screen_capture import ScreenCapture
+
+        frame = np.arange(40 * 60 * 3, dtype=np.uint32).reshape(40, 60, 3).astype(np.uint8)
+        self.backend = FakeCaptureBackend(frame)
+        self.screen_capture = ScreenCapture(backend=self.backend)
+
+    def test_capture_region(self):
+        """Тест захвата области виртуального экрана"""
+        region = (10, 5, 20, 15)
+        screenshot = self.screen_capture.capture_region(region)
+
+        self.assertEqual(screenshot.shape, (15, 20, 3))
+        np.testing.assert_array_equal(screenshot, self.backend.frame[5:20, 10:30])
+        self.assertEqual(self.screen_capture.get_screen_size(), (60, 40))
+
+    def test_capture_reuses_buffer(self):
+        """Тест записи кадра в переданный буфер"""
+        first = self.screen_capture.capture_screen()
+        self.backend.frame[0, 0] = (1, 2, 3)
+
+        second = self.screen_capture.capture_screen(out=first)
+
+        self.assertIs(second, first)
+        np.testing.assert_array_equal(second[0, 0], (1, 2, 3))
+
+    def test_capture_region_outside_screen(self):
+        """Тест захвата области за пределами экрана"""
+        self.assertIsNone(self.screen_capture.capture_region((50, 30, 20, 20)))
+
+    def test_benchmark_capture(self):
+        """Тест замера частоты кадров"""
+        from core.vision.capture_backends import benchmark_capture
+
+        result = benchmark_capture(self.backend, frames=5)
+
+        self.assertEqual(result["backend"], "fake")
+        self.assertEqual((result["width"], result["height"]), (60, 40))
+        self.assertGreater(result["fps_reused_buffer"], 0)
+        self.assertEqual(self.backend.grab_count, 10)
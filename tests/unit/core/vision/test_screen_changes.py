@@ -1,8 +1,12 @@
+import threading
 import unittest
 from unittest.mock import patch
 
 import numpy as np
 
+from core.vision.capture_backends import FakeCaptureBackend
+from core.vision.frame_stream import FrameStream
+from core.vision.screen_capture import ScreenCapture
 from core.vision.screen_changes import ScreenChanges
 
 
@@ -84,29 +88,65 @@ class TestScreenChanges(unittest.TestCase):
         self.assertEqual(mock_capture_region.call_args_list[1][0][0], region)
         mock_compare_images.assert_called_once_with(img1, img2)
 
-    @patch("core.vision.screen_capture.ScreenCapture.capture_screen")
-    @patch("core.vision.image_comparison.ImageComparison.compare_images")
-    @patch("time.sleep")
-    def test_wait_for_changes(self, mock_sleep, mock_compare_images, mock_capture_screen):
+    def test_wait_for_changes(self):
         """Тест ожидания изменений на экране"""
-        # Создаем тестовые изображения
-        img1 = np.zeros((100, 100, 3), dtype=np.uint8)
-        img2 = np.ones((100, 100, 3), dtype=np.uint8) * 255
+        # Кадры захватывает общий поток с виртуального экрана
+        backend = FakeCaptureBackend(width=200, height=100)
+        stream = FrameStream(ScreenCapture(backend=backend), fps=100)
+        screen_changes = ScreenChanges(frame_stream=stream)
 
-        # Настраиваем моки
-        mock_capture_screen.side_effect = [img1, img1, img2]
-        mock_compare_images.side_effect = [0.9, 0.3]  # Сначала нет изменений, потом есть
+        # Через некоторое время на экране меняется один пиксель
+        def change_pixel():
+            frame = backend.frame.copy()
+            frame[50, 150] = 255
+            backend.frame = frame
+
+        timer = threading.Timer(0.1, change_pixel)
+        timer.start()
 
         # Ожидаем изменений
-        changes_detected = self.screen_changes.wait_for_changes(timeout=5, threshold=0.8)
+        changes_detected = screen_changes.wait_for_changes(timeout=5, delay=0.01)
+        timer.join()
 
         # Проверяем результат
         self.assertTrue(changes_detected)
-
-        # Проверяем вызовы функций
-        self.assertEqual(mock_capture_screen.call_count, 3)
-        self.assertEqual(mock_compare_images.call_count, 2)
-        mock_sleep.assert_called_with(0.5)  # Проверяем, что была задержка между проверками
+        self.assertGreaterEqual(backend.grab_count, 3)
+
+        # После завершения ожидания захват останавливается
+        stream.stop()
+        self.assertFalse(stream.running)
+
+    def test_wait_for_changes_timeout(self):
+        """Тест ожидания изменений без изменений на экране"""
+        stream = FrameStream(
+            ScreenCapture(backend=FakeCaptureBackend(width=64, height=64)), fps=100
+        )
+        screen_changes = ScreenChanges(frame_stream=stream)
+
+        self.assertFalse(screen_changes.wait_for_changes(timeout=0.2, delay=0.01))
+        stream.stop()
+
+    def test_detect_change_regions(self):
+        """Тест поиска изменившихся областей"""
+        backend = FakeCaptureBackend(width=256, height=128)
+        stream = FrameStream(ScreenCapture(backend=backend), fps=100)
+        screen_changes = ScreenChanges(frame_stream=stream)
+
+        def change_block():
+            frame = backend.frame.copy()
+            frame[10:20, 200:210] = 255
+            backend.frame = frame
+
+        timer = threading.Timer(0.05, change_block)
+        timer.start()
+        report = screen_changes.detect_change_regions(delay=0.2)
+        timer.join()
+        stream.stop()
+
+        self.assertTrue(report.changed)
+        self.assertEqual(len(report.regions), 1)
+        x, y, width, height = report.regions[0]
+        self.assertTrue(x <= 200 and x + width >= 210 and y <= 10 and y + height >= 20)
 
 
 if __name__ == "__main__":
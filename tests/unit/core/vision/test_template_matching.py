@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from core.vision.template_matching import PreparedTemplate, TemplateMatcher
+
+
+class TestTemplateMatcher(unittest.TestCase):
+    """Тесты поиска шаблонов по пирамиде изображений"""
+
+    def setUp(self):
+        """Настройка перед каждым тестом"""
+        self.matcher = TemplateMatcher(cache_size=2)
+        rng = np.random.default_rng(0)
+        small = rng.integers(0, 256, (90, 160, 3), dtype=np.uint8)
+        self.screen = cv2.resize(small, (2560, 1440), interpolation=cv2.INTER_CUBIC)
+
+    def test_matches_full_search(self):
+        """Тест: результат совпадает с полным поиском cv2.matchTemplate"""
+        rng = np.random.default_rng(1)
+        for _ in range(10):
+            size = int(rng.integers(20, 120))
+            x, y = int(rng.integers(0, 2560 - size)), int(rng.integers(0, 1440 - size))
+            template = self.screen[y : y + size, x : x + size].copy()
+
+            result = self.matcher.find(self.screen, template)
+            full = cv2.matchTemplate(self.screen, template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(full)
+
+            self.assertEqual(result[:2], max_loc)
+            self.assertAlmostEqual(result[4], max_val, places=4)
+
+    def test_text_templates_at_odd_offsets(self):
+        """Тест мелкого текста со смещением на нечётное число пикселей"""
+        rng = np.random.default_rng(0)
+        screen = np.full((540, 960, 3), 240, dtype=np.uint8)
+        for _ in range(25):
+            x, y = int(rng.integers(0, 860)), int(rng.integers(0, 490))
+            size = (int(rng.integers(50, 300)), int(rng.integers(20, 150)))
+            color = tuple(int(c) for c in rng.integers(150, 256, 3))
+            cv2.rectangle(screen, (x, y), (x + size[0], y + size[1]), color, -1)
+        for _ in range(220):
+            text = "".join(chr(code) for code in rng.integers(65, 123, rng.integers(3, 10)))
+            origin = (int(rng.integers(0, 900)), int(rng.integers(10, 540)))
+            color = tuple(int(c) for c in rng.integers(0, 120, 3))
+            scale = float(rng.uniform(0.3, 0.6))
+            cv2.putText(
+                screen, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, color, 1, cv2.LINE_AA
+            )
+
+        rng = np.random.default_rng(0)
+        tested = 0
+        while tested < 40:
+            width, height = int(rng.integers(24, 80)), int(rng.integers(24, 40))
+            x = int(rng.integers(0, (960 - width) // 2)) * 2 + 1
+            y = int(rng.integers(0, (540 - height) // 2)) * 2 + 1
+            template = screen[y : y + height, x : x + width].copy()
+            if template.std() < 20:
+                continue
+            tested += 1
+
+            result = self.matcher.find(screen, template)
+            full = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, _ = cv2.minMaxLoc(full)
+
+            # Шаблон может совпадать в нескольких местах - сравниваем уверенность
+            self.assertIsNotNone(result, f"Шаблон {(x, y, width, height)} не найден")
+            self.assertAlmostEqual(result[4], max_val, places=4)
+            self.assertAlmostEqual(float(full[result[1], result[0]]), max_val, places=4)
+
+    def test_small_template_without_pyramid(self):
+        """Тест шаблона меньше двух минимальных размеров: поиск на исходном разрешении"""
+        template = self.screen[100:110, 200:210].copy()
+        prepared = PreparedTemplate(template)
+
+        result = self.matcher.find(self.screen, prepared)
+
+        self.assertEqual(len(prepared.scaled(1.0, 4, self.matcher.min_size)[1]), 1)
+        self.assertEqual(result[:4], (200, 100, 10, 10))
+
+    def test_template_larger_than_region(self):
+        """Тест шаблона больше области поиска"""
+        template = self.screen[0:100, 0:100].copy()
+
+        self.assertIsNone(self.matcher.find(self.screen, template, region=(0, 0, 50, 50)))
+
+    def test_template_cache(self):
+        """Тест кеша шаблонов: повторная загрузка и обновление изменённого файла"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "icon.png")
+            cv2.imwrite(path, self.screen[0:40, 0:40])
+
+            first = self.matcher.load_template(path)
+            self.assertIs(self.matcher.load_template(path), first)
+
+            # Изменённый файл загружается заново
+            cv2.imwrite(path, self.screen[100:140, 100:140])
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            second = self.matcher.load_template(path)
+            self.assertIsNot(second, first)
+            np.testing.assert_array_equal(second.image, self.screen[100:140, 100:140])
+
+            self.assertIsNone(self.matcher.load_template(os.path.join(directory, "missing.png")))
+
+    def test_cache_size_limit(self):
+        """Тест вытеснения давно использованных шаблонов"""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for index in range(3):
+                path = os.path.join(directory, f"icon{index}.png")
+                cv2.imwrite(path, self.screen[0:20, index * 20 : (index + 1) * 20])
+                paths.append(path)
+
+            first = self.matcher.load_template(paths[0])
+            self.matcher.load_template(paths[1])
+            self.matcher.load_template(paths[2])
+
+            self.assertEqual(len(self.matcher._cache), 2)
+            self.assertIsNot(self.matcher.load_template(paths[0]), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,4 @@
 import os
-from unittest.mock import patch
 
 import cv2
 import numpy as np
@@ -123,27 +122,18 @@ class TestElementRecognition:
 
     def test_find_template(self):
         """Тест поиска шаблона на изображении"""
-        # Создаем тестовые изображения вместо загрузки из файла
-        screen = np.zeros((200, 200, 3), dtype=np.uint8)
-        template = np.zeros((50, 50, 3), dtype=np.uint8)
-
-        # Добавляем патч для имитации успешного поиска
-        with patch("cv2.matchTemplate") as mock_match_template:
-            with patch("cv2.minMaxLoc") as mock_min_max_loc:
-                # Настраиваем моки
-                mock_match_template.return_value = np.zeros((150, 150), dtype=np.float32)
-                mock_min_max_loc.return_value = (0, 0.95, (0, 0), (100, 100))
-
-                # Ищем шаблон
-                result = self.element_recognition.find_template(screen, template, threshold=0.8)
-
-                # Проверяем результат
-                assert result is not None
-                assert result[0] == 100  # x
-                assert result[1] == 100  # y
-                assert result[2] == 50  # width
-                assert result[3] == 50  # height
-                assert result[4] == 0.95  # confidence
+        # Ищем шаблон с прямоугольником по путям к файлам
+        result = self.element_recognition.find_template(
+            self.test_image_path, self.template_path, threshold=0.8
+        )
+
+        # Проверяем результат
+        assert result is not None
+        assert result[0] == 90  # x
+        assert result[1] == 90  # y
+        assert result[2] == 120  # width
+        assert result[3] == 120  # height
+        assert result[4] > 0.99  # confidence
 
     def test_get_element_center(self):
         """Тест получения центра элемента"""
@@ -0,0 +1,216 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services import ai_service
+from services.http_client import HttpClient
+from services.response_cache import ResponseCache
+
+
+class SSEHandler(BaseHTTPRequestHandler):
+    """Обработчик, отдающий заданные события в формате text/event-stream"""
+
+    def do_POST(self):
+        server = self.server
+        server.payloads.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+
+        self.send_response(server.status)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for event in server.events:
+            self.wfile.write(f"data: {event}\n\n".encode())
+            self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+def chunk(content):
+    """Событие OpenAI chat completions с фрагментом ответа"""
+    return json.dumps({"choices": [{"delta": {"content": content}}]}, ensure_ascii=False)
+
+
+class TestStreamHuggingFaceResponse:
+    """Тесты потокового ответа HuggingFace Inference API"""
+
+    @pytest.fixture
+    def server(self, monkeypatch):
+        """Фикстура локального SSE-сервера вместо HuggingFace"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SSEHandler)
+        server.daemon_threads = True
+        server.status = 200
+        server.events = []
+        server.payloads = []
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        client = HttpClient(max_retries=0)
+        monkeypatch.setattr(ai_service, "get_http_client", lambda: client)
+        monkeypatch.setattr(
+            ai_service, "HF_CHAT_COMPLETIONS_URL", f"http://127.0.0.1:{server.server_port}/"
+        )
+        yield server
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+    def test_yields_tokens_until_done(self, server):
+        """Тест разбора событий до маркера [DONE]"""
+        server.events = [chunk("При"), chunk("вет"), json.dumps({"choices": []}), "[DONE]"]
+        server.events.append(chunk("лишнее"))
+
+        tokens = list(ai_service.stream_huggingface_response([{"role": "user", "content": "hi"}]))
+
+        assert tokens == ["При", "вет"]
+        assert server.payloads[0]["stream"] is True
+
+    def test_error_status_raises(self, server):
+        """Тест ошибки HTTP до начала потока"""
+        server.status = 500
+
+        with pytest.raises(RuntimeError, match="HTTP 500"):
+            list(ai_service.stream_huggingface_response([{"role": "user", "content": "hi"}]))
+
+    def test_error_event_raises(self, server):
+        """Тест ошибки, пришедшей событием посреди потока"""
+        server.events = [chunk("a"), json.dumps({"error": "overloaded"})]
+
+        stream = ai_service.stream_huggingface_response([{"role": "user", "content": "hi"}])
+
+        assert next(stream) == "a"
+        with pytest.raises(RuntimeError, match="overloaded"):
+            next(stream)
+
+
+class TestStreamAiResponse:
+    """Тесты выбора источника потокового ответа"""
+
+    def test_requires_ready_model(self, monkeypatch):
+        """Тест проверки модели до начала потока"""
+        monkeypatch.setattr(
+            ai_service, "get_current_ai_model", lambda: {"id": "m", "name": "M", "status": "error"}
+        )
+
+        with pytest.raises(RuntimeError, match="недоступна"):
+            ai_service.stream_ai_response([{"role": "user", "content": "hi"}])
+
+    def test_openai_model_uses_inference_service(self, monkeypatch):
+        """Тест генерации OpenAI модели через ModelInferenceService"""
+        model = {
+            "id": "gpt",
+            "name": "GPT",
+            "status": "ready",
+            "api_type": "openai",
+            "huggingface_id": "openai/gpt-3.5-turbo",
+        }
+
+        class FakeInference:
+            loaded_models = {}
+
+            def stream_text(self, model_id, prompt, max_length, **kwargs):
+                assert prompt.endswith("User: hi\n\nAssistant: ")
+                yield from ["a", "b"]
+
+        statuses = []
+
+        def update_status(model_id, status, error=None):
+            statuses.append(status)
+
+        monkeypatch.setattr(ai_service, "get_current_ai_model", lambda: model)
+        monkeypatch.setattr(ai_service, "get_model_inference_service", FakeInference)
+        monkeypatch.setattr(ai_service, "update_model_status", update_status)
+
+        tokens = list(ai_service.stream_ai_response([{"role": "user", "content": "hi"}]))
+
+        assert tokens == ["a", "b"]
+        assert statuses == []
+
+    @pytest.fixture
+    def inference_model(self, monkeypatch):
+        """Фикстура локальной модели с записью смен статуса"""
+        model = {"id": "local", "name": "Local", "status": "ready", "huggingface_id": "org/local"}
+        statuses = []
+
+        def update_status(model_id, status, error=None):
+            statuses.append(status)
+
+        monkeypatch.setattr(ai_service, "get_current_ai_model", lambda: model)
+        monkeypatch.setattr(ai_service, "update_model_status", update_status)
+        return statuses
+
+    def _set_inference(self, monkeypatch, stream_text):
+        class FakeInference:
+            loaded_models = {"org/local": object()}
+
+        FakeInference.stream_text = lambda self, **kwargs: stream_text()
+        monkeypatch.setattr(ai_service, "get_model_inference_service", FakeInference)
+
+    def test_client_disconnect_keeps_status(self, monkeypatch, inference_model):
+        """Тест: закрытие потока клиентом не меняет статус модели"""
+        self._set_inference(monkeypatch, lambda: iter(["a", "b", "c"]))
+
+        stream = ai_service.stream_ai_response([{"role": "user", "content": "hi"}])
+        assert next(stream) == "a"
+        stream.close()
+
+        assert inference_model == []
+        # Второй поток во время первого не отклоняется
+        first = ai_service.stream_ai_response([{"role": "user", "content": "hi"}])
+        second = ai_service.stream_ai_response([{"role": "user", "content": "hi"}])
+        assert next(first) == "a" and next(second) == "a"
+
+    def test_generation_error_marks_model(self, monkeypatch, inference_model):
+        """Тест: ошибка генерации переводит модель в статус error"""
+
+        def failing():
+            yield "a"
+            raise ValueError("boom")
+
+        self._set_inference(monkeypatch, failing)
+
+        with pytest.raises(ValueError):
+            list(ai_service.stream_ai_response([{"role": "user", "content": "hi"}]))
+
+        assert inference_model == ["error"]
+
+
+class TestHuggingFaceResponseCache:
+    """Тесты кэширования ответов HuggingFace Inference API"""
+
+    @pytest.fixture
+    def payloads(self, monkeypatch):
+        """Фикстура запросов к API вместо реальной сети"""
+        payloads = []
+
+        def request(messages, debug_info, params=None):
+            payloads.append(params)
+            return f"ответ {len(payloads)}"
+
+        cache = ResponseCache(max_entries=8, ttl=60, max_temperature=0.3)
+        monkeypatch.setattr(ai_service, "_request_huggingface_response", request)
+        monkeypatch.setattr(ai_service, "get_response_cache", lambda: cache)
+        return payloads
+
+    def test_chat_is_not_cached(self, payloads):
+        """Тест: ответы с сэмплированием по умолчанию не кэшируются"""
+        messages = [{"role": "user", "content": "hi"}]
+
+        first = ai_service.get_huggingface_response(messages)
+        second = ai_service.get_huggingface_response(messages)
+
+        assert (first, second) == ("ответ 1", "ответ 2")
+        assert payloads == [None, None]
+
+    def test_deterministic_call_is_cached(self, payloads):
+        """Тест: вызов с temperature=0 отправляет её в запросе и кэшируется"""
+        messages = [{"role": "user", "content": "hi"}]
+
+        first = ai_service.get_huggingface_response(messages, temperature=0)
+        debug_info = {}
+        second = ai_service.get_huggingface_response(messages, debug_info, temperature=0)
+
+        assert first == second == "ответ 1"
+        assert payloads == [{"temperature": 0}]
+        assert debug_info["cache"] == "hit"
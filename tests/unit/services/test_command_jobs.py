@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+from services.command_jobs import CommandJobQueue, JobQueueFull
+
+
+class TestCommandJobQueue:
+    """Тесты очереди заданий выполнения команд"""
+
+    @pytest.fixture
+    def release(self):
+        return threading.Event()
+
+    @pytest.fixture
+    def queue(self, release):
+        def run(job, token, report):
+            report({"step": 1})
+            # Ждём разрешения завершиться или отмены
+            while not release.wait(0.01):
+                if token.cancelled:
+                    return {"overall_status": "interrupted"}
+            return {"echo": job.command_text}
+
+        queue = CommandJobQueue(run, max_workers=1, max_pending=2, keep_finished=2)
+        yield queue
+        release.set()
+        queue.shutdown()
+
+    def wait_finished(self, queue, job_id):
+        version = 0
+        while True:
+            job = queue.wait(job_id, version, timeout=2)
+            assert job is not None
+            if job["status"] in ("completed", "failed", "cancelled"):
+                return job
+            version = job["version"]
+
+    def test_submit_returns_immediately(self, queue, release):
+        """Тест выполнения задания в фоне"""
+        job = queue.submit("открой блокнот")
+        assert queue.get(job.id)["status"] in ("queued", "running")
+
+        release.set()
+        finished = self.wait_finished(queue, job.id)
+
+        assert finished["status"] == "completed"
+        assert finished["result"] == {"echo": "открой блокнот"}
+        assert finished["progress"] == {"step": 1}
+
+    def test_cancel_only_affects_own_job(self, queue, release):
+        """Тест отдельного токена отмены у каждого задания"""
+        running = queue.submit("a")
+        queued = queue.submit("b")
+
+        assert queue.cancel(running.id)
+        assert self.wait_finished(queue, running.id)["status"] == "cancelled"
+
+        release.set()
+        assert self.wait_finished(queue, queued.id)["status"] == "completed"
+
+    def test_cancel_queued_job(self, queue):
+        """Тест отмены ещё не начатого задания"""
+        queue.submit("a")
+        queued = queue.submit("b")
+
+        assert queue.cancel(queued.id)
+        assert queue.get(queued.id)["status"] == "cancelled"
+        assert not queue.cancel(queued.id)
+
+    def test_queue_is_bounded(self, queue):
+        """Тест ограничения числа ожидающих заданий"""
+        queue.submit("a")
+        # Если первое задание ещё не начато, очередь переполнится на третьем
+        queue.submit("b")
+        with pytest.raises(JobQueueFull):
+            queue.submit("c")
+            queue.submit("d")
+
+    def test_failed_job(self):
+        """Тест задания, завершившегося исключением"""
+
+        def run(job, token, report):
+            raise RuntimeError("сбой")
+
+        queue = CommandJobQueue(run, max_workers=1)
+        job = queue.submit("a")
+        finished = self.wait_finished(queue, job.id)
+        queue.shutdown()
+
+        assert finished["status"] == "failed"
+        assert finished["error"] == "сбой"
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from services.command_stats import CommandStatsAggregator
+
+
+def entry(command, status):
+    return f"2026-01-01 10:00:00 - INFO\nКоманда: {command}\nСтатус: {status}\n"
+
+
+class TestCommandStatsAggregator:
+    """Тесты инкрементальной статистики команд"""
+
+    @pytest.fixture
+    def log_path(self, tmp_path):
+        return str(tmp_path / "command_history.log")
+
+    def write(self, path, text, mode="a"):
+        with open(path, mode, encoding="utf-8") as f:
+            f.write(text)
+
+    def test_reads_only_appended_lines(self, log_path):
+        """Тест учёта только дописанных записей"""
+        self.write(log_path, entry("открой браузер", "completed"))
+        aggregator = CommandStatsAggregator(log_path)
+        assert aggregator.get_statistics()["total"] == 1
+
+        self.write(log_path, entry("открой браузер", "failed") + entry("закрой окно", "completed"))
+        stats = aggregator.get_statistics()
+        assert stats["total"] == 3
+        assert stats["successful"] == 2
+        assert stats["failed"] == 1
+        assert stats["popular"][0] == {"command": "открой браузер", "count": 2}
+        assert aggregator.offset == os.path.getsize(log_path)
+
+    def test_partial_line_waits_for_newline(self, log_path):
+        """Тест незаконченной строки в конце журнала"""
+        self.write(log_path, "Команда: откр")
+        aggregator = CommandStatsAggregator(log_path)
+        assert aggregator.get_statistics()["total"] == 0
+
+        self.write(log_path, "ой браузер\n")
+        stats = aggregator.get_statistics()
+        assert stats["popular"] == [{"command": "открой браузер", "count": 1}]
+
+    def test_rotation_reads_rest_of_old_file(self, log_path):
+        """Тест ротации журнала между обновлениями"""
+        self.write(log_path, entry("первая", "completed"))
+        aggregator = CommandStatsAggregator(log_path)
+        aggregator.get_statistics()
+
+        # Запись после последнего обновления, затем ротация
+        self.write(log_path, entry("вторая", "completed"))
+        os.rename(log_path, f"{log_path}.1")
+        self.write(log_path, entry("третья", "failed"), mode="w")
+
+        stats = aggregator.get_statistics()
+        assert stats["total"] == 3
+        assert stats["successful"] == 2
+        assert stats["failed"] == 1
+
+    def test_checkpoint_restores_state(self, log_path, tmp_path):
+        """Тест восстановления состояния после перезапуска"""
+        checkpoint = str(tmp_path / "command_stats.json")
+        self.write(log_path, entry("открой браузер", "completed"))
+        CommandStatsAggregator(log_path, checkpoint).get_statistics()
+
+        self.write(log_path, entry("открой браузер", "completed"))
+        restored = CommandStatsAggregator(log_path, checkpoint)
+        assert restored.offset > 0
+        stats = restored.get_statistics()
+        assert stats["total"] == 2
+        assert stats["popular"] == [{"command": "открой браузер", "count": 2}]
+
+    def test_popular_keeps_top_k(self, log_path):
+        """Тест выбора популярных команд"""
+        text = "".join(
+            entry(command, "completed") * count
+            for command, count in [("a", 1), ("b", 3), ("c", 2), ("d", 5), ("a", 4)]
+        )
+        self.write(log_path, text)
+        stats = CommandStatsAggregator(log_path, top_k=3).get_statistics()
+        assert stats["popular"] == [
+            {"command": "a", "count": 5},
+            {"command": "d", "count": 5},
+            {"command": "b", "count": 3},
+        ]
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+from config import Config
+from services.feasibility import FeasibilityClassifier, FeasibilityRule
+
+
+@pytest.fixture
+def classifier():
+    """Классификатор с правилами по умолчанию из конфигурации"""
+    return FeasibilityClassifier([FeasibilityRule.from_config(r) for r in Config.FEASIBILITY_RULES])
+
+
+class TestFeasibilityClassifier:
+    """Тесты для проверки целесообразности команд"""
+
+    def test_safe_command(self, classifier):
+        """Тест безопасной команды"""
+        assert classifier.classify("открой блокнот") == {
+            "feasible": True,
+            "requires_confirmation": False,
+            "matched_rules": [],
+        }
+
+    def test_dangerous_command_is_blocked(self, classifier):
+        """Тест запрета опасной команды"""
+        verdict = classifier.classify("Удали все файлы")
+
+        assert verdict["feasible"] is False
+        assert "'удали'" in verdict["reason"]
+
+    def test_confirmation_required(self, classifier):
+        """Тест команды, требующей подтверждения"""
+        verdict = classifier.classify("выключи компьютер")
+
+        assert verdict["feasible"] is True
+        assert verdict["requires_confirmation"] is True
+        assert verdict["matched_rules"] == ["power"]
+
+    def test_all_rules_matched_in_one_pass(self, classifier):
+        """Тест поиска всех правил и выбора самого строгого"""
+        verdict = classifier.classify("скачай обновление и потом удали установщик")
+
+        assert verdict["feasible"] is False
+        assert verdict["matched_rules"] == ["long_running", "dangerous"]
+
+    def test_rule_order_breaks_ties(self, classifier):
+        """Тест приоритета правил одной строгости"""
+        verdict = classifier.classify("install updates and reboot")
+
+        assert verdict["reason"] == "Команда 'reboot' требует подтверждения пользователя"
+
+    def test_regex_rule(self):
+        """Тест правила с регулярным выражением"""
+        rule = FeasibilityRule.from_config(
+            {"name": "sudo", "regex": r"\bsudo\b", "severity": "block", "reason": "{match}"}
+        )
+        classifier = FeasibilityClassifier([rule])
+
+        assert classifier.classify("sudo apt")["feasible"] is False
+        assert classifier.classify("pseudocode")["feasible"] is True
+
+    def test_overlapping_rules(self):
+        """Тест перекрывающихся правил: одно совпадение не скрывает другое"""
+        rules = [
+            FeasibilityRule.from_config(data)
+            for data in (
+                {"name": "delete", "keywords": ["rm"], "severity": "confirm"},
+                {"name": "recursive", "regex": r"rm -rf", "severity": "block"},
+                {"name": "root", "regex": r"-rf /$", "severity": "block"},
+            )
+        ]
+        classifier = FeasibilityClassifier(rules)
+
+        matches = classifier.match("sudo rm -rf /")
+
+        assert [(m.rule.name, m.text, m.start) for m in matches] == [
+            ("delete", "rm", 5),
+            ("recursive", "rm -rf", 5),
+            ("root", "-rf /", 8),
+        ]
+        verdict = classifier.classify("sudo rm -rf /")
+        assert verdict["feasible"] is False
+        assert verdict["matched_rules"] == ["delete", "recursive", "root"]
+        assert verdict["reason"] == "Команда 'rm -rf' требует проверки"
+
+    def test_verdict_is_cached(self, classifier, monkeypatch):
+        """Тест кэширования вердикта по нормализованному тексту"""
+        first = classifier.classify("Скачай  файл")
+        monkeypatch.setattr(classifier, "_classify", lambda text: pytest.fail("не из кэша"))
+        second = classifier.classify("скачай файл")
+
+        assert first == second
+        second["matched_rules"].append("x")
+        assert classifier.classify("скачай файл")["matched_rules"] == ["long_running"]
+
+    def test_unknown_severity(self):
+        """Тест проверки строгости правила"""
+        with pytest.raises(ValueError):
+            FeasibilityRule.from_config({"name": "x", "keywords": ["x"], "severity": "warn"})
+
+    def test_rules_file(self, tmp_path, monkeypatch):
+        """Тест загрузки правил из файла"""
+        path = tmp_path / "rules.json"
+        path.write_text(
+            json.dumps([{"name": "kill", "keywords": ["kill"], "severity": "block"}]),
+            encoding="utf-8",
+        )
+        monkeypatch.setattr(Config, "FEASIBILITY_RULES_FILE", str(path))
+
+        classifier = FeasibilityClassifier.from_config()
+
+        assert classifier.classify("kill -9")["matched_rules"] == ["kill"]
+        assert classifier.classify("удали")["feasible"] is True
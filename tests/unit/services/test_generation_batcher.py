@@ -0,0 +1,105 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.generation_batcher import GenerationBatcher
+
+
+class TestGenerationBatcher:
+    """Тесты для объединения запросов генерации в пакеты"""
+
+    @pytest.fixture
+    def batches(self):
+        return []
+
+    @pytest.fixture
+    def batcher(self, batches):
+        """Фикстура с подменённой пакетной генерацией"""
+
+        def run_batch(model_id, prompts, max_new_tokens, params):
+            batches.append((model_id, list(prompts), list(max_new_tokens), params))
+            time.sleep(0.02)
+            if "fail" in prompts:
+                raise RuntimeError("generation failed")
+            return [f"{model_id}:{prompt}" for prompt in prompts]
+
+        batcher = GenerationBatcher(run_batch, max_batch_size=4, max_wait=0.1)
+        yield batcher
+        batcher.shutdown()
+
+    def test_single_request(self, batcher, batches):
+        """Тест одиночного запроса"""
+        assert batcher.generate("m1", "hi", 10, temperature=0.7) == "m1:hi"
+        assert batches == [("m1", ["hi"], [10], {"temperature": 0.7})]
+
+    def test_concurrent_requests_are_batched(self, batcher, batches):
+        """Тест объединения одновременных запросов в один вызов"""
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda i: batcher.generate("m1", f"p{i}", i), range(4)))
+
+        assert results == [f"m1:p{i}" for i in range(4)]
+        assert len(batches) == 1
+        assert sorted(batches[0][1]) == ["p0", "p1", "p2", "p3"]
+
+    def test_batch_size_is_limited(self, batcher, batches):
+        """Тест ограничения размера пакета"""
+        futures = [batcher.submit("m1", f"p{i}", 5) for i in range(6)]
+
+        assert [f.result() for f in futures] == [f"m1:p{i}" for i in range(6)]
+        assert [len(batch[1]) for batch in batches] == [4, 2]
+
+    def test_different_models_and_params_are_not_mixed(self, batcher, batches):
+        """Тест разделения пакетов по модели и параметрам"""
+        futures = [
+            batcher.submit("m1", "a", 5, temperature=0.7),
+            batcher.submit("m2", "b", 5, temperature=0.7),
+            batcher.submit("m1", "c", 5, temperature=0.2),
+        ]
+
+        assert [f.result() for f in futures] == ["m1:a", "m2:b", "m1:c"]
+        assert len(batches) == 3
+
+    def test_error_is_propagated_to_every_caller(self, batcher):
+        """Тест передачи ошибки всем запросам пакета"""
+        futures = [batcher.submit("m1", prompt, 5) for prompt in ("ok", "fail")]
+
+        for future in futures:
+            with pytest.raises(RuntimeError, match="generation failed"):
+                future.result()
+        assert batcher.get_metrics()["failed_batches"] == 1
+
+    def test_metrics(self, batches):
+        """Тест метрик очереди"""
+        release = threading.Event()
+
+        def run_batch(model_id, prompts, max_new_tokens, params):
+            release.wait()
+            return prompts
+
+        batcher = GenerationBatcher(run_batch, max_batch_size=2, max_wait=0)
+        futures = [batcher.submit("m1", f"p{i}", 5) for i in range(5)]
+        time.sleep(0.05)
+
+        metrics = batcher.get_metrics()
+        assert metrics["requests"] == 5
+        assert metrics["queue_depth"]["m1"] > 0
+
+        release.set()
+        for future in futures:
+            future.result()
+        batcher.shutdown()
+
+        metrics = batcher.get_metrics()
+        assert metrics["queue_depth"] == {"m1": 0}
+        assert metrics["batched_requests"] == 5
+        assert metrics["max_batch_size_seen"] == 2
+        assert metrics["avg_batch_size"] == pytest.approx(5 / metrics["batches"])
+
+    def test_submit_after_shutdown_fails(self, batcher):
+        """Тест отказа в приёме запросов после остановки"""
+        batcher.shutdown()
+
+        with pytest.raises(RuntimeError):
+            batcher.submit("m1", "hi", 5)
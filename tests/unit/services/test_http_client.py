@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from services.http_client import HttpClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Обработчик, отдающий заранее заданные ответы по очереди"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        # Вычитываем тело, чтобы соединение можно было использовать повторно
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.requests += 1
+            server.ports.add(self.client_address[1])
+            status, headers = server.responses.pop(0) if server.responses else (200, {})
+
+        if server.delay:
+            with server.lock:
+                server.active += 1
+                server.max_active = max(server.max_active, server.active)
+            time.sleep(server.delay)
+            with server.lock:
+                server.active -= 1
+
+        body = json.dumps({"status": status}).encode()
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpClient:
+    """Тесты для общего HTTP-клиента"""
+
+    @pytest.fixture
+    def server(self):
+        """Фикстура локального HTTP-сервера"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        server.daemon_threads = True
+        server.lock = threading.Lock()
+        server.responses = []
+        server.requests = 0
+        server.ports = set()
+        server.delay = 0
+        server.active = 0
+        server.max_active = 0
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture
+    def sleeps(self):
+        return []
+
+    @pytest.fixture
+    def client(self, sleeps):
+        """Фикстура клиента без реального ожидания между попытками"""
+        client = HttpClient(max_retries=3, backoff_base=1, backoff_max=10, sleep=sleeps.append)
+        yield client
+        client.close()
+
+    def url(self, server):
+        return f"http://127.0.0.1:{server.server_address[1]}/api"
+
+    def test_connection_is_reused(self, server, client):
+        """Тест переиспользования соединения между запросами"""
+        for _ in range(5):
+            assert client.get(self.url(server)).status_code == 200
+
+        assert server.requests == 5
+        assert len(server.ports) == 1
+
+    def test_retries_with_backoff(self, server, client, sleeps):
+        """Тест повторов при временных ошибках с экспоненциальной задержкой"""
+        server.responses = [(503, {}), (502, {}), (200, {})]
+
+        response = client.get(self.url(server))
+
+        assert response.status_code == 200
+        assert server.requests == 3
+        assert len(sleeps) == 2
+        assert 0 <= sleeps[0] <= 1 and 0 <= sleeps[1] <= 2
+
+    def test_retry_after_header(self, server, client, sleeps):
+        """Тест соблюдения заголовка Retry-After"""
+        server.responses = [(429, {"Retry-After": "3"}), (429, {"Retry-After": "120"})]
+
+        response = client.post(self.url(server), json={})
+
+        assert response.status_code == 200
+        # Значение ограничено backoff_max
+        assert sleeps == [3.0, 10.0]
+
+    def test_returns_last_response_when_retries_exhausted(self, server, client, sleeps):
+        """Тест возврата ошибочного ответа после исчерпания попыток"""
+        server.responses = [(503, {})] * 5
+
+        response = client.get(self.url(server), max_retries=1)
+
+        assert response.status_code == 503
+        assert server.requests == 2
+        assert len(sleeps) == 1
+
+    def test_client_errors_are_not_retried(self, server, client, sleeps):
+        """Тест отсутствия повторов для ошибок клиента"""
+        server.responses = [(404, {})]
+
+        assert client.get(self.url(server)).status_code == 404
+        assert server.requests == 1
+        assert sleeps == []
+
+    def test_connection_errors_raise_after_retries(self, client, sleeps):
+        """Тест исключения при недоступном хосте"""
+        with pytest.raises(requests.ConnectionError):
+            client.get("http://127.0.0.1:1/api", max_retries=2)
+
+        assert len(sleeps) == 2
+
+    def test_per_host_limit(self, server):
+        """Тест ограничения одновременных запросов к одному хосту"""
+        server.delay = 0.05
+        client = HttpClient(per_host_limit=2)
+        try:
+            threads = [
+                threading.Thread(target=client.get, args=(self.url(server),)) for _ in range(6)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            client.close()
+
+        assert server.requests == 6
+        assert server.max_active <= 2
@@ -0,0 +1,394 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.huggingface_service import (
+    HFModelInfo,
+    HubPageLimitReached,
+    HuggingFaceService,
+    ModelSyncService,
+    SyncStateStore,
+)
+
+
+def make_model_info(model_id, downloads=100, last_modified="2024-01-01T00:00:00.000Z"):
+    return HFModelInfo(
+        id=model_id,
+        author="org",
+        sha="abc",
+        created_at="2023-01-01T00:00:00.000Z",
+        last_modified=last_modified,
+        pipeline_tag="text-generation",
+        tags=["pytorch"],
+        downloads=downloads,
+        likes=1,
+        library_name="transformers",
+        model_size=None,
+        description="",
+        language=[],
+        license="mit",
+    )
+
+
+def make_row(row_id, model_info, **overrides):
+    values = {
+        "id": row_id,
+        "hf_model_id": model_info.id,
+        "downloads": model_info.downloads,
+        "likes": model_info.likes,
+        "description": model_info.description,
+        "tags": model_info.tags,
+        "is_featured": model_info.downloads > 10000,
+        "last_modified_hf": datetime(2024, 1, 1, tzinfo=timezone.utc),
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class TestModelSyncBatching:
+    """Тесты пакетной синхронизации моделей с базой данных"""
+
+    @pytest.fixture
+    def sync_service(self, tmp_path):
+        return ModelSyncService(MagicMock(), SyncStateStore(str(tmp_path / "state.json")))
+
+    def make_db(self, rows):
+        """Сессия, возвращающая rows на SELECT и фиксирующая остальные запросы"""
+        db = MagicMock()
+        db.execute.side_effect = lambda statement, *args: (
+            iter(rows) if statement.is_select else MagicMock()
+        )
+        return db
+
+    def test_diff_created_updated_unchanged(self, sync_service):
+        """Тест разделения моделей на новые, изменённые и неизменённые"""
+        new = make_model_info("org/new")
+        changed = make_model_info("org/changed", downloads=500)
+        same = make_model_info("org/same")
+        rows = [make_row(1, changed, downloads=10), make_row(2, same)]
+        db = self.make_db(rows)
+
+        created, updated, unchanged, filtered = sync_service._sync_batch(db, [new, changed, same])
+
+        assert (created, updated, unchanged, filtered) == (1, 1, 1, 0)
+        # SELECT, INSERT, UPDATE изменённых и UPDATE last_sync_at неизменённых
+        assert db.execute.call_count == 4
+
+        insert_rows = db.execute.call_args_list[1].args[1]
+        assert [row["hf_model_id"] for row in insert_rows] == ["org/new"]
+
+        update_rows = db.execute.call_args_list[2].args[1]
+        assert update_rows[0]["id"] == 1
+        assert update_rows[0]["downloads"] == 500
+        assert update_rows[0]["sync_status"] == "synced"
+
+    def test_round_trips_scale_with_batches(self, sync_service):
+        """Тест количества запросов: по пакетам, а не по моделям"""
+        models = [make_model_info(f"org/m{i}") for i in range(250)]
+        db = self.make_db([])
+
+        stats = sync_service._sync_models_batched(db, models, batch_size=100)
+
+        assert stats == {"created": 250, "updated": 0, "unchanged": 0, "filtered": 0, "errors": 0}
+        # 3 пакета: SELECT + INSERT на каждый
+        assert db.execute.call_count == 6
+        assert db.commit.call_count == 3
+
+    def test_failed_batch_is_rolled_back(self, sync_service):
+        """Тест отката только неудачного пакета"""
+        models = [make_model_info(f"org/m{i}") for i in range(4)]
+        db = MagicMock()
+        calls = {"count": 0}
+
+        def execute(statement, *args):
+            calls["count"] += 1
+            if statement.is_select:
+                return iter([])
+            if calls["count"] == 2:
+                raise RuntimeError("db error")
+            return MagicMock()
+
+        db.execute.side_effect = execute
+
+        stats = sync_service._sync_models_batched(db, models, batch_size=2)
+
+        assert stats["created"] == 2
+        assert stats["errors"] == 2
+        assert db.rollback.call_count == 1
+        assert db.commit.call_count == 1
+
+
+class TestIncrementalSync:
+    """Тесты инкрементальной синхронизации по отметкам"""
+
+    @pytest.fixture
+    def state(self, tmp_path):
+        return SyncStateStore(str(tmp_path / "state.json"))
+
+    @pytest.fixture
+    def sync_service(self, state):
+        return ModelSyncService(MagicMock(), state)
+
+    def test_state_roundtrip(self, state):
+        """Тест сохранения и дополнения отметок"""
+        first = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        second = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+        assert state.get_watermarks() == {}
+
+        state.save_watermarks({"translation": first})
+        state.save_watermarks({"summarization": second})
+
+        assert state.get_watermarks() == {"translation": first, "summarization": second}
+
+    def test_fetch_stops_at_watermark(self, sync_service):
+        """Тест остановки обхода выдачи на отметке"""
+        fetched = []
+
+        def iter_models(**kwargs):
+            for model_info in [
+                make_model_info("org/a", last_modified="2024-03-01T00:00:00.000Z"),
+                make_model_info("org/b", last_modified="2024-02-01T00:00:00.000Z"),
+                make_model_info("org/c", last_modified="2024-01-01T00:00:00.000Z"),
+                make_model_info("org/d", last_modified="2023-12-01T00:00:00.000Z"),
+            ]:
+                fetched.append(model_info.id)
+                yield model_info
+
+        sync_service.hf_service.iter_models.side_effect = iter_models
+        watermark = datetime(2024, 1, 15, tzinfo=timezone.utc)
+
+        models, complete, next_url = sync_service._fetch_models_since("translation", watermark)
+
+        assert complete
+        assert next_url is None
+        assert [m.id for m in models] == ["org/a", "org/b"]
+        # Итератор не дочитывается после отметки
+        assert fetched == ["org/a", "org/b", "org/c"]
+
+        new_watermark = sync_service._next_watermark(watermark, models, datetime.now(timezone.utc))
+        assert new_watermark == datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+    def test_long_description_unchanged(self, sync_service):
+        """Тест: описание длиннее 1000 символов сравнивается в обрезанном виде"""
+        model_info = make_model_info("org/long")
+        model_info.description = "x" * 1500
+        rows = [make_row(1, model_info, description="x" * 1000)]
+        db = MagicMock()
+        db.execute.side_effect = lambda statement, *args: (
+            iter(rows) if statement.is_select else MagicMock()
+        )
+
+        created, updated, unchanged, _ = sync_service._sync_batch(db, [model_info])
+
+        assert (created, updated, unchanged) == (0, 0, 1)
+
+    def test_incremental_skips_unchanged_models(self, sync_service):
+        """Тест пропуска моделей с прежней датой изменения"""
+        same = make_model_info("org/same", downloads=999_999)
+        changed = make_model_info("org/changed", last_modified="2024-05-01T00:00:00.000Z")
+        unpopular = make_model_info("org/unpopular", downloads=1)
+        rows = [
+            make_row(1, same, downloads=1),
+            make_row(2, changed),
+        ]
+        db = MagicMock()
+        db.execute.side_effect = lambda statement, *args: (
+            iter(rows) if statement.is_select else MagicMock()
+        )
+
+        created, updated, unchanged, filtered = sync_service._sync_batch(
+            db, [same, changed, unpopular], incremental=True
+        )
+
+        assert (created, updated, unchanged, filtered) == (0, 1, 1, 1)
+        # SELECT и UPDATE изменённой модели, без записи неизменённых
+        assert db.execute.call_count == 2
+        assert db.execute.call_args_list[1].args[1][0]["id"] == 2
+
+    def test_watermarks_saved_after_sync(self, sync_service, state):
+        """Тест сохранения отметок после успешной синхронизации"""
+        sync_service.hf_service.get_models.return_value = []
+
+        with patch("services.huggingface_service.get_db", return_value=iter([MagicMock()])):
+            result = sync_service.sync_popular_models(limit=60, incremental=True)
+
+        assert result["success"]
+        assert len(state.get_watermarks()) == 6
+
+    def test_page_limit_keeps_watermark(self, sync_service, state):
+        """Тест: при обрыве обхода по лимиту страниц отметка задачи не сдвигается"""
+        watermark = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        state.save_watermarks({task: watermark for task in ("translation", "summarization")})
+
+        def iter_models(task, **kwargs):
+            yield make_model_info(f"org/{task}", last_modified="2024-03-01T00:00:00.000Z")
+            if task == "translation":
+                raise HubPageLimitReached("лимит")
+
+        sync_service.hf_service.iter_models.side_effect = iter_models
+        sync_service.hf_service.get_models.return_value = []
+
+        with patch("services.huggingface_service.get_db", return_value=iter([MagicMock()])):
+            with patch.object(
+                sync_service,
+                "_sync_models_batched",
+                return_value={
+                    "created": 2,
+                    "updated": 0,
+                    "unchanged": 0,
+                    "filtered": 0,
+                    "errors": 0,
+                },
+            ) as sync_batched:
+                result = sync_service.sync_popular_models(incremental=True)
+
+        # Полученные модели всё равно записываются
+        assert {m.id for m in sync_batched.call_args.args[1]} == {
+            "org/translation",
+            "org/summarization",
+        }
+        assert result["truncated_tasks"] == ["translation"]
+        watermarks = state.get_watermarks()
+        assert watermarks["translation"] == watermark
+        assert watermarks["summarization"] == datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+    def test_truncated_task_resumes_from_cursor(self, sync_service, state):
+        """Тест: обход, оборванный лимитом страниц, продолжается со следующей страницы"""
+        watermark = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        state.save_watermarks({"translation": watermark})
+        calls = []
+
+        def iter_models(task, start_url=None, **kwargs):
+            if task != "translation":
+                return
+            calls.append(start_url)
+            if start_url is None:
+                yield make_model_info("org/new", last_modified="2024-03-01T00:00:00.000Z")
+                raise HubPageLimitReached("лимит", next_url="https://hub/api/models?cursor=2")
+            yield make_model_info("org/older", last_modified="2024-02-01T00:00:00.000Z")
+            yield make_model_info("org/synced", last_modified="2023-12-01T00:00:00.000Z")
+
+        sync_service.hf_service.iter_models.side_effect = iter_models
+        sync_service.hf_service.get_models.return_value = []
+
+        def run_sync():
+            with patch("services.huggingface_service.get_db", return_value=iter([MagicMock()])):
+                with patch.object(
+                    sync_service,
+                    "_sync_models_batched",
+                    return_value={
+                        "created": 1,
+                        "updated": 0,
+                        "unchanged": 0,
+                        "filtered": 0,
+                        "errors": 0,
+                    },
+                ) as sync_batched:
+                    result = sync_service.sync_popular_models(incremental=True)
+            return result, [m.id for m in sync_batched.call_args.args[1]]
+
+        result, synced = run_sync()
+        assert result["truncated_tasks"] == ["translation"]
+        assert synced == ["org/new"]
+        assert state.get_watermarks()["translation"] == watermark
+        assert state.get_cursors()["translation"] == {
+            "url": "https://hub/api/models?cursor=2",
+            "head": datetime(2024, 3, 1, tzinfo=timezone.utc),
+        }
+
+        # Следующий запуск дочитывает отставание и сдвигает отметку до head
+        result, synced = run_sync()
+        assert calls == [None, "https://hub/api/models?cursor=2"]
+        assert result["truncated_tasks"] == []
+        assert synced == ["org/older"]
+        assert state.get_watermarks()["translation"] == datetime(2024, 3, 1, tzinfo=timezone.utc)
+        assert state.get_cursors() == {}
+
+    def test_filtered_models_reported(self, sync_service):
+        """Тест: новые модели с малым числом загрузок учитываются в результате"""
+        sync_service.hf_service.get_models.return_value = [
+            make_model_info("org/popular", downloads=5000),
+            make_model_info("org/unpopular", downloads=1),
+        ]
+        db = MagicMock()
+        db.execute.side_effect = lambda statement, *args: (
+            iter([]) if statement.is_select else MagicMock()
+        )
+
+        with patch("services.huggingface_service.get_db", return_value=iter([db])):
+            result = sync_service.sync_popular_models(incremental=True)
+
+        assert result["total_synced"] == 1
+        assert result["total_filtered"] == 1
+
+
+class TestModelPagination:
+    """Тесты постраничного обхода выдачи Hub"""
+
+    def make_response(self, models, next_url=None):
+        response = MagicMock()
+        response.json.return_value = [{"id": model_id} for model_id in models]
+        response.links = {"next": {"url": next_url}} if next_url else {}
+        return response
+
+    def test_follows_link_header(self):
+        """Тест перехода по курсору из заголовка Link"""
+        http = MagicMock()
+        http.get.side_effect = [
+            self.make_response(["a", "b"], next_url="https://hub/api/models?cursor=1"),
+            self.make_response(["c"]),
+        ]
+        service = HuggingFaceService(api_token="token", http_client=http)
+
+        models = [m.id for m in service.iter_models(task="translation", page_size=2)]
+
+        assert models == ["a", "b", "c"]
+        assert http.get.call_args_list[0].kwargs["params"]["filter"] == "translation"
+        assert http.get.call_args_list[1].args[0] == "https://hub/api/models?cursor=1"
+        assert http.get.call_args_list[1].kwargs["params"] is None
+
+    def test_pages_are_fetched_lazily(self):
+        """Тест отсутствия лишних запросов при остановке итерации"""
+        http = MagicMock()
+        http.get.return_value = self.make_response(["a"], next_url="https://hub/next")
+        service = HuggingFaceService(api_token="token", http_client=http)
+
+        iterator = service.iter_models()
+        next(iterator)
+        iterator.close()
+
+        assert http.get.call_count == 1
+
+    def test_page_limit_raises(self):
+        """Тест сообщения об обрыве обхода по лимиту страниц"""
+        http = MagicMock()
+        http.get.return_value = self.make_response(["a"], next_url="https://hub/next")
+        service = HuggingFaceService(api_token="token", http_client=http)
+        models = []
+
+        with pytest.raises(HubPageLimitReached):
+            for model_info in service.iter_models(max_pages=2):
+                models.append(model_info.id)
+
+        assert models == ["a", "a"]
+
+    def test_resume_from_cursor(self):
+        """Тест продолжения обхода с курсора из HubPageLimitReached"""
+        http = MagicMock()
+        http.get.side_effect = [
+            self.make_response(["a"], next_url="https://hub/api/models?cursor=1"),
+            self.make_response(["b"]),
+        ]
+        service = HuggingFaceService(api_token="token", http_client=http)
+
+        with pytest.raises(HubPageLimitReached) as error:
+            list(service.iter_models(max_pages=1))
+        models = [m.id for m in service.iter_models(start_url=error.value.next_url)]
+
+        assert error.value.next_url == "https://hub/api/models?cursor=1"
+        assert models == ["b"]
+        assert http.get.call_args_list[1].args[0] == "https://hub/api/models?cursor=1"
+        assert http.get.call_args_list[1].kwargs["params"] is None
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from services.model_availability import ModelAvailabilityChecker
+
+
+class TestModelAvailabilityChecker:
+    """Тесты для параллельной проверки доступности моделей"""
+
+    @pytest.fixture
+    def calls(self):
+        return []
+
+    @pytest.fixture
+    def checker(self, calls):
+        """Фикстура с подменённой функцией проверки"""
+
+        def probe(model):
+            calls.append(model["id"])
+            time.sleep(0.05)
+            if model["id"].startswith("bad"):
+                raise RuntimeError("not found")
+            return True, None
+
+        checker = ModelAvailabilityChecker(max_workers=4, ttl=60, negative_ttl=60, probe=probe)
+        yield checker
+        checker.shutdown()
+
+    def test_results_are_cached(self, checker, calls):
+        """Тест повторной проверки в пределах TTL"""
+        model = {"id": "m1", "huggingface_id": "org/m1"}
+
+        first = checker.check(model)
+        second = checker.check(model)
+
+        assert first.available and not first.cached
+        assert second.available and second.cached
+        assert calls == ["m1"]
+
+    def test_failures_are_cached(self, checker, calls):
+        """Тест негативного кэширования ошибок"""
+        model = {"id": "bad1", "huggingface_id": "org/bad1"}
+
+        result = checker.check(model)
+        checker.check(model)
+
+        assert not result.available
+        assert result.status == "unavailable"
+        assert "not found" in result.error
+        assert calls == ["bad1"]
+
+    def test_force_bypasses_cache(self, checker, calls):
+        """Тест принудительной проверки"""
+        model = {"id": "m1", "huggingface_id": "org/m1"}
+
+        checker.check(model)
+        checker.check(model, force=True)
+
+        assert calls == ["m1", "m1"]
+
+    def test_check_many_runs_concurrently(self, checker):
+        """Тест параллельной проверки и потоковой выдачи результатов"""
+        models = [{"id": f"m{i}", "huggingface_id": f"org/m{i}"} for i in range(8)]
+
+        start = time.monotonic()
+        results = list(checker.check_many(models))
+        elapsed = time.monotonic() - start
+
+        assert sorted(r.model_id for r in results) == sorted(m["id"] for m in models)
+        # 8 проверок по 50 мс в 4 потоках - около двух "волн", а не восьми
+        assert elapsed < 0.3
+
+    def test_concurrent_checks_are_deduplicated(self, calls):
+        """Тест объединения одновременных проверок одной модели"""
+        release = threading.Event()
+
+        def probe(model):
+            calls.append(model["id"])
+            release.wait(1)
+            return True, None
+
+        checker = ModelAvailabilityChecker(max_workers=2, probe=probe)
+        model = {"id": "m1", "huggingface_id": "org/m1"}
+        try:
+            futures = [checker._submit(model, force=False) for _ in range(3)]
+            release.set()
+            assert all(f.result().available for f in futures)
+            assert calls == ["m1"]
+        finally:
+            checker.shutdown()
+
+    def test_openai_results_are_not_cached(self, calls, monkeypatch):
+        """Тест проверки OpenAI моделей по переменной окружения"""
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        checker = ModelAvailabilityChecker(max_workers=1)
+        model = {"id": "gpt", "huggingface_id": "openai/gpt-3.5-turbo", "api_type": "openai"}
+        try:
+            assert not checker.check(model).available
+
+            monkeypatch.setenv("OPENAI_API_KEY", "test")
+            assert checker.check(model).available
+        finally:
+            checker.shutdown()
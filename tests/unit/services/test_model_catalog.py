@@ -0,0 +1,108 @@
+import json
+import os
+
+import pytest
+
+from services.model_catalog import ModelCatalog
+
+
+class TestModelCatalog:
+    """Тесты для каталога моделей с отложенной записью"""
+
+    @pytest.fixture
+    def models_file(self, tmp_path):
+        """Фикстура с файлом моделей"""
+        path = tmp_path / "ai_models.json"
+        data = {
+            "models": [
+                {"id": "a", "name": "A", "status": "ready", "is_current": True},
+                {"id": "b", "name": "B", "status": "unavailable", "is_current": False},
+            ]
+        }
+        path.write_text(json.dumps(data), encoding="utf-8")
+        return str(path)
+
+    @pytest.fixture
+    def catalog(self, models_file):
+        """Фикстура каталога без автоматической записи"""
+        catalog = ModelCatalog(models_file, flush_delay=60, check_interval=0)
+        yield catalog
+        catalog.flush()
+
+    def read_file(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_reads_from_memory(self, catalog):
+        """Тест чтения моделей по индексу"""
+        assert catalog.get("b")["name"] == "B"
+        assert catalog.get("missing") is None
+        assert catalog.get_current()["id"] == "a"
+
+    def test_returned_models_are_copies(self, catalog):
+        """Тест изоляции возвращаемых данных от внутреннего состояния"""
+        model = catalog.get("a")
+        model["status"] = "broken"
+
+        snapshot = catalog.snapshot()
+        snapshot["models"][0]["name"] = "changed"
+
+        assert catalog.get("a")["status"] == "ready"
+        assert catalog.get("a")["name"] == "A"
+
+    def test_updates_are_coalesced_until_flush(self, catalog, models_file):
+        """Тест объединения нескольких изменений в одну запись"""
+        catalog.update_model("b", {"status": "busy"})
+        catalog.update_model("b", {"status": "ready"})
+        catalog.set_current("b")
+
+        # До flush файл не изменяется
+        assert self.read_file(models_file)["models"][1]["status"] == "unavailable"
+
+        assert catalog.flush()
+
+        data = self.read_file(models_file)
+        assert data["models"][1]["status"] == "ready"
+        assert [m["is_current"] for m in data["models"]] == [False, True]
+        assert not [f for f in os.listdir(os.path.dirname(models_file)) if f.endswith(".tmp")]
+
+    def test_remove_keys(self, catalog):
+        """Тест удаления полей модели"""
+        catalog.update_model("a", {"error": "boom"})
+        catalog.update_model("a", {"status": "ready"}, remove_keys=("error",))
+
+        assert "error" not in catalog.get("a")
+
+    def test_reload_on_external_change(self, catalog, models_file):
+        """Тест перечитывания файла при изменении mtime"""
+        assert catalog.get("a")["name"] == "A"
+
+        data = self.read_file(models_file)
+        data["models"][0]["name"] = "A2"
+        with open(models_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        stat = os.stat(models_file)
+        os.utime(models_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert catalog.get("a")["name"] == "A2"
+
+    def test_add_and_remove(self, catalog, models_file):
+        """Тест добавления и удаления моделей"""
+        assert catalog.add_model({"id": "c", "name": "C"})
+        assert not catalog.add_model({"id": "c", "name": "C"})
+        assert catalog.remove_model("a")
+        assert catalog.get_current() is None
+
+        catalog.flush()
+        assert [m["id"] for m in self.read_file(models_file)["models"]] == ["b", "c"]
+
+    def test_missing_file(self, tmp_path):
+        """Тест каталога без файла на диске"""
+        catalog = ModelCatalog(str(tmp_path / "none.json"), flush_delay=0)
+
+        assert not catalog.exists()
+        assert catalog.snapshot() == {"models": []}
+
+        catalog.replace({"models": [{"id": "x", "is_current": True}]})
+        assert catalog.exists()
+        assert os.path.exists(tmp_path / "none.json")
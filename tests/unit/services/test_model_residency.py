@@ -0,0 +1,175 @@
+import pytest
+
+from services.model_residency import ModelResidencyManager, estimate_model_size
+
+MB = 2**20
+
+
+class FakeClock:
+    """Управляемый источник времени"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+class TestModelResidencyManager:
+    """Тесты для учёта моделей в памяти"""
+
+    @pytest.fixture
+    def evicted(self):
+        return []
+
+    def make_manager(self, evicted, policy="lru", budget_mb=100):
+        # В тестах "модель" - это её размер в мегабайтах
+        return ModelResidencyManager(
+            budget_bytes=budget_mb * MB,
+            policy=policy,
+            on_evict=evicted.append,
+            size_of=lambda model: model * MB,
+            clock=FakeClock(),
+        )
+
+    def test_no_eviction_within_budget(self, evicted):
+        """Тест загрузки моделей в пределах бюджета"""
+        manager = self.make_manager(evicted)
+
+        manager.admit("a", 40)
+        manager.admit("b", 60)
+
+        assert evicted == []
+        assert manager.used_bytes == 100 * MB
+
+    def test_lru_evicts_least_recently_used(self, evicted):
+        """Тест вытеснения давно не использовавшейся модели"""
+        manager = self.make_manager(evicted)
+        manager.admit("a", 40)
+        manager.admit("b", 40)
+        manager.touch("a")
+
+        assert manager.admit("c", 40) == ["b"]
+        assert evicted == ["b"]
+        assert set(manager.get_stats()["models"]) == {"a", "c"}
+
+    def test_lfu_evicts_least_frequently_used(self, evicted):
+        """Тест вытеснения редко используемой модели"""
+        manager = self.make_manager(evicted, policy="lfu")
+        manager.admit("a", 40)
+        manager.admit("b", 40)
+        manager.touch("a")
+        manager.touch("a")
+        manager.touch("b")
+
+        manager.admit("c", 40)
+
+        assert evicted == ["b"]
+
+    def test_pinned_model_is_not_evicted(self, evicted):
+        """Тест закрепления текущей модели"""
+        manager = self.make_manager(evicted)
+        manager.admit("a", 60)
+        manager.pin("a")
+
+        manager.admit("b", 60)
+
+        assert evicted == []
+        assert manager.used_bytes == 120 * MB
+
+        manager.unpin("a")
+        manager.admit("c", 30)
+        assert evicted == ["a"]
+
+    def test_evicts_several_models_for_large_one(self, evicted):
+        """Тест вытеснения нескольких моделей ради одной большой"""
+        manager = self.make_manager(evicted)
+        for model_id in ("a", "b", "c"):
+            manager.admit(model_id, 30)
+
+        manager.admit("d", 80)
+
+        assert evicted == ["a", "b", "c"]
+
+    def test_speculative_admit_over_budget_is_aborted(self, evicted):
+        """Тест отмены предзагрузки, которая не помещается рядом с закреплённой моделью"""
+        manager = self.make_manager(evicted)
+        manager.admit("a", 80)
+        manager.pin("a")
+
+        assert manager.admit("b", 80, speculative=True) == ["b"]
+        assert evicted == ["b"]
+        assert manager.used_bytes == 80 * MB
+        assert set(manager.get_stats()["models"]) == {"a"}
+
+    def test_speculative_admit_does_not_evict(self, evicted):
+        """Тест: предзагрузка не вытесняет уже загруженные модели"""
+        manager = self.make_manager(evicted)
+        manager.admit("a", 60)
+
+        manager.admit("b", 60, speculative=True)
+
+        assert evicted == ["b"]
+        assert set(manager.get_stats()["models"]) == {"a"}
+
+    def test_reserve_evicts_before_load(self, evicted):
+        """Тест освобождения места до загрузки: старая и новая модели не в памяти вместе"""
+        manager = self.make_manager(evicted)
+        manager.admit("a", 80)
+
+        assert manager.reserve("b", 80 * MB)
+        assert evicted == ["a"]
+        assert manager.used_bytes == 0
+
+        manager.admit("b", 80)
+        assert manager.used_bytes == 80 * MB
+
+    def test_speculative_reserve_skipped(self, evicted):
+        """Тест пропуска предзагрузки, которая не помещается в свободный бюджет"""
+        manager = self.make_manager(evicted)
+        manager.admit("a", 80)
+        manager.pin("a")
+
+        assert not manager.reserve("b", 80 * MB, speculative=True)
+        assert manager.reserve("c", 20 * MB, speculative=True)
+        assert evicted == []
+
+    def test_reserve_uses_known_size(self, evicted):
+        """Тест оценки размера по прошлой загрузке модели"""
+        manager = self.make_manager(evicted)
+        manager.admit("a", 70)
+        manager.discard("a")
+        manager.admit("b", 50)
+
+        assert manager.known_size("a") == 70 * MB
+        manager.reserve("a")
+        assert evicted == ["b"]
+
+    def test_unlimited_budget(self, evicted):
+        """Тест работы без ограничения памяти"""
+        manager = self.make_manager(evicted, budget_mb=0)
+        for model_id in ("a", "b", "c"):
+            manager.admit(model_id, 1000)
+
+        assert evicted == []
+
+    def test_predict_next(self, evicted):
+        """Тест предсказания следующей выбираемой модели"""
+        manager = self.make_manager(evicted)
+        for model_id in ("a", "b", "a", "c", "a", "b"):
+            manager.record_selection(model_id)
+
+        assert manager.predict_next("a") == "b"
+        assert manager.predict_next("b") == "a"
+        assert manager.predict_next("unknown") is None
+
+    def test_unknown_policy(self):
+        """Тест проверки политики вытеснения"""
+        with pytest.raises(ValueError):
+            ModelResidencyManager(policy="fifo")
+
+
+def test_estimate_model_size_without_parameters():
+    """Тест оценки размера объекта без параметров"""
+    assert estimate_model_size("openai_api") == 0
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("openai")
+
+from services.model_inference_service import ModelInferenceService  # noqa: E402
+from services.openai_client import close_openai_clients, get_openai_client  # noqa: E402
+
+
+class ChatCompletionsHandler(BaseHTTPRequestHandler):
+    """OpenAI-совместимый обработчик /v1/chat/completions"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.ports.add(self.client_address[1])
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+
+        prompt = request["messages"][-1]["content"]
+        body = json.dumps(
+            {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": request["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": f"echo: {prompt}"},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestOpenAIClient:
+    """Тесты общего клиента OpenAI на локальном сервере-заглушке"""
+
+    @pytest.fixture
+    def server(self, monkeypatch):
+        """Фикстура OpenAI-совместимого сервера"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), ChatCompletionsHandler)
+        server.daemon_threads = True
+        server.lock = threading.Lock()
+        server.ports = set()
+        server.delay = 0
+        server.active = 0
+        server.max_active = 0
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+        yield server
+        close_openai_clients()
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture
+    def service(self):
+        service = ModelInferenceService()
+        yield service
+        service.batcher.shutdown()
+
+    def test_client_is_shared(self, server):
+        """Тест кэширования клиента по ключу и адресу API"""
+        url = f"http://127.0.0.1:{server.server_port}/v1"
+
+        assert get_openai_client("test-key", url) is get_openai_client("test-key", url)
+        assert get_openai_client("test-key", url) is not get_openai_client("other-key", url)
+
+    def test_connection_is_reused(self, server, service):
+        """Тест повторного использования соединения между запросами"""
+        results = [service.generate_text("gpt-3.5-turbo", f"q{i}", 10) for i in range(3)]
+
+        assert results == ["echo: q0", "echo: q1", "echo: q2"]
+        assert len(server.ports) == 1
+
+    def test_async_requests_are_concurrent(self, server, service):
+        """Тест одновременной обработки асинхронных запросов"""
+        server.delay = 0.3
+
+        async def run():
+            return await asyncio.gather(
+                *(service.agenerate_text("gpt-3.5-turbo", f"q{i}", 10) for i in range(4))
+            )
+
+        started = time.monotonic()
+        results = asyncio.run(run())
+        elapsed = time.monotonic() - started
+
+        assert results == [f"echo: q{i}" for i in range(4)]
+        assert server.max_active == 4
+        assert elapsed < 4 * server.delay
@@ -0,0 +1,114 @@
+import pytest
+
+from services.response_cache import ResponseCache, make_cache_key
+
+# Параметры детерминированного вызова
+DETERMINISTIC = {"temperature": 0}
+
+
+class FakeClock:
+    """Управляемый источник времени"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache:
+    """Тесты для кэша ответов моделей"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def cache(self, clock):
+        return ResponseCache(max_entries=2, ttl=60, clock=clock)
+
+    @pytest.fixture
+    def calls(self):
+        return []
+
+    def compute(self, calls, value="ответ"):
+        def run():
+            calls.append(value)
+            return value
+
+        return run
+
+    def test_repeated_prompt_hits_cache(self, cache, calls):
+        """Тест повторного запроса"""
+        first = cache.get_or_compute("m", "привет", DETERMINISTIC, self.compute(calls))
+        second = cache.get_or_compute("m", "  привет \n", DETERMINISTIC, self.compute(calls))
+
+        assert first == second == "ответ"
+        assert len(calls) == 1
+        assert cache.get_stats()["hits"] == 1
+
+    def test_key_depends_on_model_and_params(self):
+        """Тест состава ключа"""
+        base = make_cache_key("m", "привет", {"temperature": 0})
+
+        assert base == make_cache_key("m", "привет", {"temperature": 0})
+        assert base != make_cache_key("other", "привет", {"temperature": 0})
+        assert base != make_cache_key("m", "привет", {"temperature": 0.1})
+        assert base != make_cache_key("m", "Привет", {"temperature": 0})
+
+    def test_high_temperature_is_not_cached(self, cache, calls):
+        """Тест вызовов с высокой temperature"""
+        for _ in range(2):
+            cache.get_or_compute("m", "p", {"temperature": 0.9}, self.compute(calls))
+
+        assert len(calls) == 2
+        assert cache.is_cacheable({"temperature": 0.9, "do_sample": False})
+
+    def test_missing_temperature_is_not_cached(self, cache, calls):
+        """Тест вызовов без temperature: провайдер сэмплирует по умолчанию"""
+        for _ in range(2):
+            cache.get_or_compute("m", "p", None, self.compute(calls))
+
+        assert len(calls) == 2
+        assert not cache.is_cacheable({"top_p": 0.9})
+        assert cache.is_cacheable({"do_sample": False})
+
+    def test_empty_response_is_not_cached(self, cache, calls):
+        """Тест неудачных ответов"""
+        for _ in range(2):
+            cache.get_or_compute("m", "p", DETERMINISTIC, self.compute(calls, value=None))
+
+        assert len(calls) == 2
+
+    def test_ttl(self, cache, clock, calls):
+        """Тест истечения записи"""
+        cache.get_or_compute("m", "p", DETERMINISTIC, self.compute(calls))
+        clock.now += 61
+        cache.get_or_compute("m", "p", DETERMINISTIC, self.compute(calls))
+
+        assert len(calls) == 2
+        assert cache.get_stats()["expired"] == 1
+
+    def test_lru_eviction(self, cache):
+        """Тест вытеснения давно не использовавшейся записи"""
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_disk_tier_survives_restart(self, tmp_path, clock, calls):
+        """Тест дискового уровня"""
+        path = str(tmp_path / "cache" / "responses.sqlite")
+        cache = ResponseCache(ttl=60, disk_path=path, clock=clock)
+        cache.get_or_compute("m", "p", DETERMINISTIC, self.compute(calls))
+        cache.close()
+
+        restarted = ResponseCache(ttl=60, disk_path=path, clock=clock)
+        assert restarted.get_or_compute("m", "p", DETERMINISTIC, self.compute(calls)) == "ответ"
+        assert len(calls) == 1
+        assert restarted.get_stats()["disk_hits"] == 1
+        restarted.close()
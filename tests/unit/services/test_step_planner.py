@@ -0,0 +1,43 @@
+import pytest
+
+from models.command_models import CommandStep
+from services.step_planner import plan_steps, step_levels
+
+
+class TestStepPlanner:
+    """Тесты планирования шагов составной команды"""
+
+    def test_independent_and_dependent_steps(self):
+        """Тест зависимостей по разделителям"""
+        steps = plan_steps("открой блокнот и открой калькулятор затем сделай скриншот")
+
+        assert [step.description for step in steps] == [
+            "открой блокнот",
+            "открой калькулятор",
+            "сделай скриншот",
+        ]
+        assert [step.depends_on for step in steps] == [[], [], [1, 2]]
+
+    def test_levels(self):
+        """Тест группировки шагов по уровням"""
+        steps = plan_steps("a и b, c потом d и e")
+        levels = [[step.step_number for step in level] for level in step_levels(steps)]
+
+        assert levels == [[1, 2], [3], [4, 5]]
+
+    def test_duplicates_are_removed(self):
+        """Тест удаления повторяющихся шагов"""
+        steps = plan_steps("a затем a затем b")
+
+        assert [step.description for step in steps] == ["a", "b"]
+        assert steps[1].depends_on == [1]
+
+    def test_cycle_is_rejected(self):
+        """Тест циклической зависимости"""
+        steps = [
+            CommandStep(step_number=1, description="a", status="pending", depends_on=[2]),
+            CommandStep(step_number=2, description="b", status="pending", depends_on=[1]),
+        ]
+
+        with pytest.raises(ValueError):
+            step_levels(steps)
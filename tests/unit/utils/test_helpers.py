@@ -0,0 +1,84 @@
+import ast
+
+import pytest
+
+from utils.helpers import CommandInterrupted, add_interrupt_checks, interruptible
+
+
+class TestAddInterruptChecks:
+    """Тесты вставки проверок прерывания"""
+
+    @pytest.fixture
+    def calls(self):
+        return []
+
+    def run(self, code, calls, stop_after=None, every=1):
+        """Выполняет код с проверками; прерывает после stop_after проверок"""
+
+        def interrupt_point():
+            calls.append(1)
+            if stop_after is not None and len(calls) > stop_after:
+                raise CommandInterrupted()
+
+        namespace = {
+            "interrupt_point": interrupt_point,
+            "interruptible": interruptible,
+            "range": range,
+        }
+        exec(compile(add_interrupt_checks(code, every=every), "<test>", "exec"), namespace)
+        return namespace
+
+    def test_nested_loops_keep_indentation(self, calls):
+        """Тест вложенных циклов и циклов внутри функций"""
+        code = (
+            "def work(n):\n"
+            "    total = 0\n"
+            "    for i in range(n):\n"
+            "        for j in range(n):\n"
+            "            total += j\n"
+            "    return total\n"
+            "result = work(3)\n"
+        )
+        namespace = self.run(code, calls)
+
+        assert namespace["result"] == 9
+        # Начало кода, 3 итерации внешнего цикла, 9 итераций внутреннего
+        assert len(calls) == 1 + 3 + 9
+
+    def test_check_after_long_call(self):
+        """Тест проверки после time.sleep"""
+        code = "import time\nif True:\n    time.sleep(0)\n"
+        tree = ast.parse(add_interrupt_checks(code))
+        body = tree.body[2].body
+
+        assert ast.unparse(body[1]) == "interrupt_point()"
+
+    def test_interrupt_stops_infinite_loop(self, calls):
+        """Тест прерывания бесконечного цикла"""
+        with pytest.raises(CommandInterrupted):
+            self.run("while True:\n    pass\n", calls, stop_after=5)
+
+        assert len(calls) == 6
+
+    @pytest.mark.parametrize("loop", ["for i in range(100):", "i = 0\nwhile i < 100:\n    i += 1"])
+    def test_check_every_n_iterations(self, calls, loop):
+        """Тест частоты проверок в цикле"""
+        code = f"total = 0\n{loop}\n    total += 1\n"
+        namespace = self.run(code, calls, every=10)
+
+        assert namespace["total"] == 100
+        assert 10 <= len(calls) <= 12
+
+    def test_interruptible_is_lazy(self):
+        """Тест обёртки итерируемого"""
+        checks = []
+        items = interruptible(iter(range(7)), 3, lambda: checks.append(1))
+
+        assert next(items) == 0
+        assert len(checks) == 1
+        assert list(items) == [1, 2, 3, 4, 5, 6]
+        assert len(checks) == 4
+
+    def test_syntax_error_returns_code_unchanged(self):
+        """Тест кода с синтаксической ошибкой"""
+        assert add_interrupt_checks("for i in") == "for i in"
@@ -0,0 +1,92 @@
+import pytest
+
+from utils.history_store import CommandHistoryStore
+
+
+class TestCommandHistoryStore:
+    """Тесты хранилища истории команд"""
+
+    @pytest.fixture
+    def store(self):
+        store = CommandHistoryStore(":memory:")
+        yield store
+        store.close()
+
+    def fill(self, store, count):
+        for i in range(count):
+            store.append(
+                timestamp=f"2025-01-01 12:00:{i:02d}",
+                command=f"открой {'браузер' if i % 2 else 'блокнот'} {i}",
+                status="completed" if i % 3 else "failed",
+                completion=100.0,
+                accuracy=90.0,
+            )
+
+    def test_cursor_pagination(self, store):
+        """Тест постраничного чтения с курсором"""
+        self.fill(store, 7)
+
+        seen = []
+        cursor = None
+        while True:
+            records, cursor = store.query(limit=3, cursor=cursor)
+            seen.extend(record["id"] for record in records)
+            if cursor is None:
+                break
+
+        assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+    def test_filters(self, store):
+        """Тест фильтров по статусу, началу команды и времени"""
+        self.fill(store, 10)
+
+        failed, _ = store.query(status="failed")
+        browser, _ = store.query(command="открой браузер")
+        window, _ = store.query(since="2025-01-01 12:00:02", until="2025-01-01 12:00:05")
+
+        assert [r["id"] for r in failed] == [10, 7, 4, 1]
+        assert all(r["command"].startswith("открой браузер") for r in browser)
+        assert len(browser) == 5
+        assert [r["timestamp"][-2:] for r in window] == ["04", "03", "02"]
+
+    def test_queries_use_indexes(self, store):
+        """Тест плана запросов: фильтры не сканируют всю таблицу"""
+        for sql, params in [
+            ("SELECT id FROM command_history WHERE status = ? ORDER BY id DESC", ("failed",)),
+            ("SELECT id FROM command_history WHERE timestamp = ?", ("2025-01-01 12:00:00",)),
+        ]:
+            plan = " ".join(
+                row[3] for row in store._db.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            )
+            assert "USING" in plan and "INDEX" in plan
+
+    def test_details_by_timestamp(self, store):
+        """Тест поиска подробностей по времени записи"""
+        store.append(
+            timestamp="2025-01-01 12:00:00",
+            command="a",
+            status="completed",
+            steps=[{"number": 1, "description": "a", "status": "completed"}],
+            details="Команда: a\nСтатус: completed",
+        )
+
+        record = store.find_by_timestamp("2025-01-01 12:00:00")
+
+        assert record["details"].split("\n")[0] == "Команда: a"
+        assert record["steps"][0]["description"] == "a"
+        assert store.find_by_timestamp("2030-01-01 00:00:00") is None
+
+    def test_import_summary_log(self, store, tmp_path):
+        """Тест переноса записей из текстового журнала"""
+        log = tmp_path / "command_history.log"
+        log.write_text(
+            "2025-01-01 12:00:00,000 - command_history - INFO - 2025-01-01 12:00:00 - Выполнение"
+            " команды\nКоманда: открой блокнот\nСтатус: completed\nВыполнение: 100.0%\n"
+            "Точность: 90.0%\n" + "-" * 50 + "\n",
+            encoding="utf-8",
+        )
+
+        assert store.import_summary_log(str(log)) == 1
+        records, _ = store.query()
+        assert records[0]["command"] == "открой блокнот"
+        assert records[0]["completion"] == 100.0
@@ -0,0 +1,48 @@
+import gzip
+
+import pytest
+
+from utils.log_reader import RotatedLog, gzip_chunks
+
+
+class TestRotatedLog:
+    """Тесты чтения логов с резервными копиями"""
+
+    @pytest.fixture
+    def log(self, tmp_path):
+        """Лог с двумя резервными копиями: строки 0-9, 10-19 и 20-24"""
+        path = tmp_path / "system.log"
+        (tmp_path / "system.log.2").write_text("".join(f"line {i}\n" for i in range(10)))
+        (tmp_path / "system.log.1").write_text("".join(f"line {i}\n" for i in range(10, 20)))
+        path.write_text("".join(f"line {i}\n" for i in range(20, 25)))
+        return RotatedLog(str(path), backup_count=5, chunk_size=7)
+
+    def test_tail_spans_backups(self, log):
+        """Тест последних строк через границу файлов"""
+        assert log.tail(7) == [f"line {i}\n" for i in range(18, 25)]
+
+    def test_tail_offset(self, log):
+        """Тест постраничного чтения с конца"""
+        assert log.tail(3, offset=5) == [f"line {i}\n" for i in range(17, 20)]
+        assert log.tail(10, offset=20) == [f"line {i}\n" for i in range(5)]
+
+    def test_read_range(self, log):
+        """Тест чтения диапазона байтов в общем потоке"""
+        content = b"".join(f"line {i}\n".encode() for i in range(25))
+
+        assert log.size() == len(content)
+        assert log.read_range(0) == content
+        assert log.read_range(50, 140) == content[50:140]
+
+    def test_last_line_without_newline(self, tmp_path):
+        """Тест файла без перевода строки в конце"""
+        path = tmp_path / "a.log"
+        path.write_text("a\n\nb")
+
+        assert RotatedLog(str(path), backup_count=0, chunk_size=2).tail(5) == ["a\n", "\n", "b\n"]
+
+    def test_gzip_chunks(self, log):
+        """Тест сжатия потока"""
+        compressed = b"".join(gzip_chunks(log.iter_chunks()))
+
+        assert gzip.decompress(compressed) == log.read_range(0)
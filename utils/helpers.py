@@ -1,6 +1,8 @@
+import ast
 import logging
 import re
 import time
+from itertools import chain, islice
 
 logger = logging.getLogger("neuro_assistant")
 
@@ -41,41 +43,211 @@ def extract_math_expression(text):
     return None
 
 
-def add_interrupt_checks(code):
+class CommandInterrupted(Exception):
+    """Выполнение кода команды прервано пользователем"""
+
+
+def interruptible(iterable, every, check):
+    """
+    Итератор по iterable, вызывающий check() перед каждыми every элементами
+
+    Элементы выдаются лениво через islice, поэтому между проверками
+    итерация идёт без накладных расходов на уровне Python.
+    """
+    iterator = iter(iterable)
+    sentinel = object()
+
+    def chunks():
+        while True:
+            check()
+            first = next(iterator, sentinel)
+            if first is sentinel:
+                return
+            yield (first,)
+            yield islice(iterator, every - 1)
+
+    return chain.from_iterable(chunks())
+
+
+# Вызовы, после которых вставляется проверка прерывания
+LONG_CALLS = ("time.sleep", "sleep")
+
+
+class InterruptCheckInserter(ast.NodeTransformer):
+    """
+    Вставляет точки проверки прерывания в код.
+
+    Проверка - вызов функции check_name (она должна выбросить исключение, если
+    выполнение прервано) - ставится в начало кода, после вызовов из long_calls
+    и в начало тела каждого цикла. Если every > 1, в цикле проверка выполняется
+    раз в every итераций: итерируемое цикла for оборачивается в iter_name
+    (см. interruptible), в while и async for используется счётчик.
+    """
+
+    def __init__(
+        self,
+        check_name: str = "interrupt_point",
+        every: int = 1,
+        long_calls=LONG_CALLS,
+        iter_name: str = "interruptible",
+    ):
+        self.check_name = check_name
+        self.iter_name = iter_name
+        self.every = max(1, every)
+        self.long_calls = set(long_calls)
+        self._counters = 0
+
+    def transform(self, tree: ast.Module) -> ast.Module:
+        """Возвращает дерево с проверками прерывания"""
+        tree = self.visit(tree)
+        tree.body = [self._check()] + tree.body
+        return ast.fix_missing_locations(tree)
+
+    def generic_visit(self, node):
+        super().generic_visit(node)
+        for field in ("body", "orelse", "finalbody"):
+            statements = getattr(node, field, None)
+            if isinstance(statements, list) and statements and isinstance(statements[0], ast.stmt):
+                setattr(node, field, self._instrument_block(statements))
+        return node
+
+    def _instrument_block(self, statements):
+        """Добавляет проверки после долгих вызовов и счётчики перед циклами"""
+        result = []
+        for statement in statements:
+            if isinstance(statement, (ast.For, ast.AsyncFor, ast.While)):
+                result.extend(self._instrument_loop(statement))
+                continue
+            result.append(statement)
+            if self._has_long_call(statement):
+                result.append(self._check())
+        return result
+
+    def _instrument_loop(self, loop):
+        """Ставит проверку в начало каждой (или каждой every-й) итерации цикла"""
+        if self.every == 1:
+            loop.body = [self._check()] + loop.body
+            return [loop]
+
+        if isinstance(loop, ast.For):
+            # Итерируемое оборачивается: проверка раз в every элементов без кода в теле
+            loop.iter = ast.Call(
+                func=ast.Name(id=self.iter_name, ctx=ast.Load()),
+                args=[
+                    loop.iter,
+                    ast.Constant(self.every),
+                    ast.Name(id=self.check_name, ctx=ast.Load()),
+                ],
+                keywords=[],
+            )
+            return [loop]
+
+        # while и async for: счётчик итераций
+        self._counters += 1
+        counter = f"_interrupt_counter_{self._counters}"
+        check = ast.parse(
+            f"{counter} += 1\n"
+            f"if {counter} >= {self.every}:\n"
+            f"    {counter} = 0\n"
+            f"    {self.check_name}()"
+        ).body
+        loop.body = check + loop.body
+        return [ast.parse(f"{counter} = 0").body[0], loop]
+
+    def _has_long_call(self, statement) -> bool:
+        """Проверяет, есть ли в простом операторе вызов из long_calls"""
+        if not isinstance(statement, (ast.Expr, ast.Assign, ast.AugAssign, ast.AnnAssign)):
+            return False
+        for node in ast.walk(statement):
+            if isinstance(node, ast.Call):
+                try:
+                    name = ast.unparse(node.func)
+                except Exception:
+                    continue
+                if name in self.long_calls:
+                    return True
+        return False
+
+    def _check(self) -> ast.stmt:
+        """Оператор вызова проверки прерывания"""
+        return ast.Expr(
+            ast.Call(func=ast.Name(id=self.check_name, ctx=ast.Load()), args=[], keywords=[])
+        )
+
+
+def add_interrupt_checks(code, every=1, check_name="interrupt_point", long_calls=LONG_CALLS):
     """
     Добавляет проверки прерывания в код
 
-    Вставляет проверки check_interrupt() после каждого вызова time.sleep()
-    и в начало каждого цикла for/while
+    Разбирает код в AST и вставляет вызовы check_name() в начало кода, после
+    каждого вызова из long_calls (по умолчанию time.sleep) и в тело каждого
+    цикла for/while, включая вложенные и циклы внутри функций. Функция
+    check_name должна выбрасывать CommandInterrupted, если выполнение прервано.
+    При every > 1 код использует interruptible - её нужно передать в
+    пространство имён выполнения под тем же именем.
+
+    Args:
+        code: Исходный код
+        every: Проверять в циклах раз в every итераций
+        check_name: Имя функции проверки в пространстве имён выполнения
+        long_calls: Имена долгих вызовов, после которых ставится проверка
+
+    Returns:
+        str: Код с проверками; код с синтаксической ошибкой возвращается без изменений
     """
     if not code:
         return code
 
-    # Добавляем проверку после каждого time.sleep()
-    code = re.sub(
-        r"(time\.sleep\([^)]+\))",
-        r'\1\n    if check_interrupt(): return "Выполнение прервано пользователем"',
-        code,
-    )
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return code
 
-    # Добавляем проверку в начало каждого цикла for
-    code = re.sub(
-        r"(for\s+[^:]+:)",
-        r'\1\n    if check_interrupt(): return "Выполнение прервано пользователем"',
-        code,
-    )
+    inserter = InterruptCheckInserter(check_name=check_name, every=every, long_calls=long_calls)
+    return ast.unparse(inserter.transform(tree))
 
-    # Добавляем проверку в начало каждого цикла while
-    code = re.sub(
-        r"(while\s+[^:]+:)",
-        r'\1\n    if check_interrupt(): return "Выполнение прервано пользователем"',
-        code,
-    )
 
-    # Добавляем проверку в начало кода
-    code = 'if check_interrupt(): return "Выполнение прервано пользователем"\n' + code
+def benchmark_interrupt_checks(iterations=200_000, frequencies=(1, 10, 100), repeat=3):
+    """
+    Измеряет накладные расходы проверок прерывания в плотном цикле
+
+    Args:
+        iterations: Число итераций цикла
+        frequencies: Значения every для сравнения
+        repeat: Число повторов (берётся лучшее время)
+
+    Returns:
+        dict: Время цикла без проверок и с проверками (мс) и накладные расходы (%)
+    """
+    code = f"total = 0\nfor i in range({iterations}):\n    total += i\n"
 
-    return code
+    interrupted = [False]
+
+    def interrupt_point():
+        if interrupted[0]:
+            raise CommandInterrupted()
+
+    def measure(source):
+        compiled = compile(source, "<benchmark>", "exec")
+        best = float("inf")
+        for _ in range(repeat):
+            namespace = {
+                "interrupt_point": interrupt_point,
+                "interruptible": interruptible,
+                "range": range,
+            }
+            started = time.perf_counter()
+            exec(compiled, namespace)
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    baseline = measure(code)
+    results = {"baseline_ms": baseline * 1000}
+    for every in frequencies:
+        elapsed = measure(add_interrupt_checks(code, every=every))
+        results[f"every_{every}_ms"] = elapsed * 1000
+        results[f"every_{every}_overhead_pct"] = (elapsed / baseline - 1) * 100
+    return results
 
 
 def check_interrupt_during_operation(operation_name, interval=0.5, max_time=30):
@@ -116,3 +288,8 @@ def check_interrupt_during_operation(operation_name, interval=0.5, max_time=30):
         f"Операция '{operation_name}' превысила максимальное время выполнения ({max_time} секунд)"
     )
     return False
+
+
+if __name__ == "__main__":
+    for key, value in benchmark_interrupt_checks().items():
+        print(f"{key}: {value:.1f}")
@@ -0,0 +1,279 @@
+"""
+Структурированное хранилище истории команд (SQLite с индексами).
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger("neuro_assistant")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS command_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    command TEXT NOT NULL,
+    status TEXT NOT NULL,
+    completion REAL,
+    accuracy REAL,
+    start_time TEXT,
+    end_time TEXT,
+    steps TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_timestamp ON command_history (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_history_status ON command_history (status, id);
+CREATE INDEX IF NOT EXISTS idx_history_command ON command_history (command, id);
+"""
+
+# Поля записи без подробностей (для списков)
+SUMMARY_COLUMNS = "id, timestamp, command, status, completion, accuracy, start_time, end_time"
+
+
+class CommandHistoryStore:
+    """
+    Журнал выполненных команд в SQLite, только на добавление.
+
+    Записи индексированы по времени, статусу и тексту команды. Списки
+    отдаются страницами в обратном порядке с курсором (id последней записи
+    страницы), поэтому каждая страница - поиск по индексу, а не чтение и
+    разбор всего файла журнала.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Путь к файлу базы (":memory:" - в памяти)
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        if path != ":memory:":
+            # Чтение не блокирует запись
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def append(
+        self,
+        timestamp: str,
+        command: str,
+        status: str,
+        completion: Optional[float] = None,
+        accuracy: Optional[float] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        steps: Optional[List[Dict[str, Any]]] = None,
+        details: Optional[str] = None,
+    ) -> int:
+        """Добавляет запись и возвращает её id"""
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO command_history (timestamp, command, status, completion, accuracy,"
+                " start_time, end_time, steps, details) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    timestamp,
+                    command,
+                    status,
+                    completion,
+                    accuracy,
+                    start_time,
+                    end_time,
+                    json.dumps(steps, ensure_ascii=False) if steps is not None else None,
+                    details,
+                ),
+            )
+            self._db.commit()
+            return cursor.lastrowid
+
+    def query(
+        self,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+        status: Optional[str] = None,
+        command: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Возвращает страницу записей, от новых к старым
+
+        Args:
+            limit: Размер страницы
+            cursor: id последней записи предыдущей страницы
+            status: Точный статус
+            command: Начало текста команды
+            since: Нижняя граница времени (включительно, формат как у timestamp)
+            until: Верхняя граница времени (не включительно)
+
+        Returns:
+            tuple: Записи и курсор следующей страницы (None, если страница последняя)
+        """
+        conditions, params = [], []
+        if cursor is not None:
+            conditions.append("id < ?")
+            params.append(cursor)
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if command:
+            # Диапазон по индексу вместо LIKE, который индекс не использует
+            conditions.append("command >= ? AND command < ?")
+            params.extend([command, command + "\U0010ffff"])
+        if since:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            conditions.append("timestamp < ?")
+            params.append(until)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        limit = max(1, limit)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM command_history {where}"
+                " ORDER BY id DESC LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+
+        records = [dict(row) for row in rows[:limit]]
+        next_cursor = records[-1]["id"] if len(rows) > limit else None
+        return records, next_cursor
+
+    def get(self, record_id: int) -> Optional[Dict[str, Any]]:
+        """Возвращает запись с шагами и подробностями"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM command_history WHERE id = ?", (record_id,)
+            ).fetchone()
+        return self._full_record(row)
+
+    def find_by_timestamp(self, timestamp: str) -> Optional[Dict[str, Any]]:
+        """Возвращает последнюю запись с указанным временем"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM command_history WHERE timestamp = ? ORDER BY id DESC LIMIT 1",
+                (timestamp,),
+            ).fetchone()
+        return self._full_record(row)
+
+    def count(self) -> int:
+        """Возвращает число записей"""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM command_history").fetchone()[0]
+
+    def import_summary_log(self, path: str) -> int:
+        """
+        Переносит записи из текстового журнала истории команд
+
+        Returns:
+            int: Число перенесённых записей
+        """
+        if not os.path.exists(path):
+            return 0
+
+        with open(path, "rb") as f:
+            content = f.read().decode("utf-8", errors="ignore")
+
+        rows = [
+            (
+                entry.get("timestamp", ""),
+                entry["command"],
+                entry.get("status", ""),
+                _parse_percentage(entry.get("completion")),
+                _parse_percentage(entry.get("accuracy")),
+            )
+            for entry in parse_summary_log(content)
+            if "command" in entry
+        ]
+        # Одной транзакцией: журнал может содержать тысячи записей
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO command_history (timestamp, command, status, completion, accuracy)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+        return len(rows)
+
+    def close(self):
+        """Закрывает базу"""
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _full_record(row) -> Optional[Dict[str, Any]]:
+        """Преобразует строку таблицы в запись с разобранными шагами"""
+        if row is None:
+            return None
+        record = dict(row)
+        record["steps"] = json.loads(record["steps"]) if record["steps"] else []
+        return record
+
+
+def parse_summary_log(content: str) -> List[Dict[str, str]]:
+    """Разбирает текстовый журнал истории команд на записи"""
+    entries = []
+    current_entry: Dict[str, str] = {}
+
+    for line in content.split("\n"):
+        if line.startswith("20"):  # Начало новой записи (с даты)
+            if current_entry:
+                entries.append(current_entry)
+                current_entry = {}
+            parts = line.split(" - ", 1)
+            if len(parts) > 1:
+                current_entry["timestamp"] = parts[0]
+        elif line.startswith("Команда:"):
+            current_entry["command"] = line.replace("Команда:", "").strip()
+        elif line.startswith("Статус:"):
+            current_entry["status"] = line.replace("Статус:", "").strip()
+        elif line.startswith("Выполнение:"):
+            current_entry["completion"] = line.replace("Выполнение:", "").strip()
+        elif line.startswith("Точность:"):
+            current_entry["accuracy"] = line.replace("Точность:", "").strip()
+
+    if current_entry:
+        entries.append(current_entry)
+    return entries
+
+
+def _parse_percentage(value: Optional[str]) -> Optional[float]:
+    """Преобразует строку вида "90.0%" в число"""
+    try:
+        return float(value.rstrip("%")) if value else None
+    except ValueError:
+        return None
+
+
+# Глобальный экземпляр хранилища
+_store: Optional[CommandHistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> CommandHistoryStore:
+    """
+    Получить хранилище истории команд
+
+    При первом создании базы в неё переносятся записи из текстового журнала.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            is_new = not os.path.exists(Config.HISTORY_DB_FILE)
+            _store = CommandHistoryStore(Config.HISTORY_DB_FILE)
+            if is_new:
+                imported = _store.import_summary_log(Config.SUMMARY_LOG_FILE)
+                if imported:
+                    logger.info(f"В хранилище истории перенесено записей журнала: {imported}")
+        return _store
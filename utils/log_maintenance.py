@@ -51,11 +51,17 @@ def clean_old_logs(max_age_days=30):
     # Проверяем все файлы в директории логов
     for root, dirs, files in os.walk(Config.LOGS_DIR):
         for file in files:
-            # Пропускаем текущие файлы логов
+            # Пропускаем текущие файлы логов, базу истории команд (с файлами WAL)
+            # и контрольную точку статистики команд
             if file in [
                 os.path.basename(f)
-                for f in [Config.SUMMARY_LOG_FILE, Config.DETAILED_LOG_FILE, Config.SYSTEM_LOG_FILE]
-            ]:
+                for f in [
+                    Config.SUMMARY_LOG_FILE,
+                    Config.DETAILED_LOG_FILE,
+                    Config.SYSTEM_LOG_FILE,
+                    Config.COMMAND_STATS_CHECKPOINT_FILE,
+                ]
+            ] or file.startswith(os.path.basename(Config.HISTORY_DB_FILE)):
                 continue
 
             file_path = os.path.join(root, file)
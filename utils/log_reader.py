@@ -0,0 +1,128 @@
+"""
+Чтение файлов логов с конца, по диапазонам байтов и потоком, с учётом ротации.
+"""
+
+import os
+import zlib
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+from config import Config
+
+CHUNK_SIZE = 64 * 1024
+
+
+class RotatedLog:
+    """
+    Файл лога вместе с резервными копиями RotatingFileHandler.
+
+    Копии (path.N ... path.1) и текущий файл рассматриваются как один поток
+    от старых записей к новым. Смещения в байтах считаются в этом потоке.
+    Последние строки читаются блоками с конца, поэтому их получение не
+    зависит от размера лога.
+    """
+
+    def __init__(self, path: str, backup_count: Optional[int] = None, chunk_size: int = CHUNK_SIZE):
+        """
+        Args:
+            path: Путь к текущему файлу лога
+            backup_count: Число резервных копий (по умолчанию Config.LOG_BACKUP_COUNT)
+            chunk_size: Размер блока чтения
+        """
+        self.path = path
+        self.backup_count = Config.LOG_BACKUP_COUNT if backup_count is None else backup_count
+        self.chunk_size = chunk_size
+
+    def files(self) -> List[Tuple[str, int]]:
+        """Возвращает существующие файлы и их размеры, от старых к новым"""
+        paths = [f"{self.path}.{i}" for i in range(self.backup_count, 0, -1)] + [self.path]
+        result = []
+        for path in paths:
+            try:
+                result.append((path, os.path.getsize(path)))
+            except OSError:
+                continue
+        return result
+
+    def exists(self) -> bool:
+        return bool(self.files())
+
+    def size(self) -> int:
+        """Общий размер лога с резервными копиями"""
+        return sum(size for _, size in self.files())
+
+    def iter_lines_reversed(self) -> Iterator[str]:
+        """Строки лога от последней к первой (с символом перевода строки)"""
+        for path, _ in reversed(self.files()):
+            for line in self._reverse_file_lines(path):
+                yield line.decode("utf-8", errors="replace") + "\n"
+
+    def tail(self, lines: int, offset: int = 0) -> List[str]:
+        """
+        Возвращает строки с конца лога в исходном порядке
+
+        Args:
+            lines: Число строк
+            offset: Сколько последних строк пропустить (для постраничного чтения)
+        """
+        page = list(islice(self.iter_lines_reversed(), offset, offset + lines))
+        page.reverse()
+        return page
+
+    def read_range(self, start: int, end: Optional[int] = None) -> bytes:
+        """Читает байты [start, end) лога; end=None - до конца"""
+        return b"".join(self.iter_chunks(start, end))
+
+    def iter_chunks(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Отдаёт байты [start, end) лога блоками, не загружая лог в память"""
+        position = 0
+        for path, size in self.files():
+            file_start, file_end = position, position + size
+            position = file_end
+            if end is not None and file_start >= end:
+                break
+            if file_end <= start:
+                continue
+
+            with open(path, "rb") as f:
+                f.seek(max(0, start - file_start))
+                remaining = (min(end, file_end) if end is not None else file_end) - max(
+                    start, file_start
+                )
+                while remaining > 0:
+                    chunk = f.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+
+    def _reverse_file_lines(self, path: str) -> Iterator[bytes]:
+        """Строки одного файла с конца (без перевода строки)"""
+        with open(path, "rb") as f:
+            position = f.seek(0, os.SEEK_END)
+            remainder = b""
+            at_end = True
+            while position > 0:
+                size = min(self.chunk_size, position)
+                position -= size
+                f.seek(position)
+                lines = (f.read(size) + remainder).split(b"\n")
+                if at_end:
+                    # Перевод строки в конце файла не образует пустую строку
+                    if lines[-1] == b"":
+                        lines.pop()
+                    at_end = False
+                remainder = lines.pop(0)
+                yield from reversed(lines)
+            if remainder or not at_end:
+                yield remainder
+
+
+def gzip_chunks(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    """Сжимает поток блоков в формат gzip на лету"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -1,74 +1,237 @@
+import atexit
 import logging
 import os
+import queue
+import re
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 from config import Config
 
+# Конфиденциальные данные: имя группы -> шаблон замены. Разделитель после
+# ключевого слова не захватывает перевод строки, чтобы маскирование всего
+# многострочного сообщения не задевало соседние строки.
+_SENSITIVE_REPLACEMENTS = {
+    # API ключи (общий паттерн)
+    "api_key": "{}=***FILTERED***",
+    # Пароли
+    "password": "{}=***FILTERED***",
+    # Токены авторизации
+    "auth": "{} ***FILTERED***",
+    # Учетные данные в URL
+    "url": "{}***FILTERED***:***FILTERED***@",
+}
+_SENSITIVE_PATTERN = re.compile(
+    "|".join(
+        [
+            r'(?P<api_key>api[_-]?key|apikey|api[_-]?token|access[_-]?token)[=:"\'\t ]+'
+            r"[a-zA-Z0-9]{16,}",
+            r'(?P<password>password|passwd|pwd)[=:"\'\t ]+[^\s,;]{3,}',
+            r'(?P<auth>Authorization|Bearer)[=:"\'\t ]+[^\s,;]{3,}',
+            r"(?P<url>https?://)[^:@\s]+:[^@\s]+@",
+        ]
+    ),
+    re.IGNORECASE,
+)
+
+# Фоновые потоки записи логов, запущенные setup_logging
+_listeners = []
+
+
+class RedactingFormatter(logging.Formatter):
+    """Форматтер, маскирующий конфиденциальные данные в готовой записи"""
+
+    def format(self, record):
+        return filter_sensitive_data(super().format(record))
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Передаёт запись в очередь без форматирования.
 
-def setup_logging(app):
-    """Настройка системы логирования"""
-    # Создаем директорию для логов, если она не существует
-    os.makedirs(Config.LOGS_DIR, exist_ok=True)
+    Стандартный QueueHandler форматирует запись в вызывающем потоке; здесь
+    форматирование и маскирование выполняет поток QueueListener.
+    """
 
-    # Форматтер для логов
-    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    def prepare(self, record):
+        return record
+
+
+class BatchRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler, записывающий пачку записей одной операцией"""
+
+    def emit_batch(self, records):
+        """Записывает записи в файл с одной синхронизацией в конце"""
+        self.acquire()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            size = os.fstat(self.stream.fileno()).st_size
+            parts = []
+            for record in records:
+                try:
+                    message = self.format(record) + self.terminator
+                except Exception:
+                    self.handleError(record)
+                    continue
+                length = len(message.encode(self.encoding or "utf-8", errors="replace"))
+                if self.maxBytes > 0 and size > 0 and size + length >= self.maxBytes:
+                    self.stream.write("".join(parts))
+                    parts = []
+                    self.doRollover()
+                    size = 0
+                parts.append(message)
+                size += length
+            self.stream.write("".join(parts))
+            self.stream.flush()
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+
+class BatchQueueListener(QueueListener):
+    """
+    QueueListener, обрабатывающий накопившиеся записи пачками.
 
-    # Настройка логгера для истории команд (для пользователя)
-    history_handler = RotatingFileHandler(
-        Config.SUMMARY_LOG_FILE,
+    Поток забирает из очереди до batch_size записей и передаёт их
+    BatchRotatingFileHandler за одну запись в файл; прочие обработчики
+    получают записи по одной.
+    """
+
+    def __init__(self, log_queue, *handlers, batch_size=256):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = max(1, batch_size)
+
+    def _monitor(self):
+        has_task_done = hasattr(self.queue, "task_done")
+        stopped = False
+        while not stopped:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            records = [record for record in batch if record is not self._sentinel]
+            stopped = len(records) < len(batch)
+            if records:
+                self.handle_batch(records)
+            if has_task_done:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def handle_batch(self, records):
+        """Передаёт записи обработчикам с учётом их уровня и фильтров"""
+        for handler in self.handlers:
+            selected = [
+                record
+                for record in records
+                if record.levelno >= handler.level and handler.filter(record)
+            ]
+            if not selected:
+                continue
+            if isinstance(handler, BatchRotatingFileHandler):
+                handler.emit_batch(selected)
+            else:
+                for record in selected:
+                    handler.handle(record)
+
+
+def _attach_queue(logger, level, handlers):
+    """Направляет записи логгера в очередь, которую пишет фоновый поток"""
+    log_queue = queue.Queue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.setLevel(level)
+    logger.setLevel(level)
+    logger.addHandler(queue_handler)
+
+    listener = BatchQueueListener(log_queue, *handlers, batch_size=Config.LOG_BATCH_SIZE)
+    listener.start()
+    _listeners.append((logger, queue_handler, listener))
+
+
+def _file_handler(path, level, formatter):
+    """Создаёт обработчик файла лога с ротацией"""
+    handler = BatchRotatingFileHandler(
+        path,
         maxBytes=Config.MAX_LOG_SIZE,
         backupCount=Config.LOG_BACKUP_COUNT,
         encoding="utf-8",
     )
-    history_handler.setFormatter(formatter)
-    history_handler.setLevel(logging.INFO)
+    handler.setFormatter(formatter)
+    handler.setLevel(level)
+    return handler
 
-    history_logger = logging.getLogger("command_history")
-    history_logger.setLevel(logging.INFO)
-    history_logger.addHandler(history_handler)
 
-    # Настройка логгера для детальных логов (для разработчика)
-    detailed_handler = RotatingFileHandler(
-        Config.DETAILED_LOG_FILE,
-        maxBytes=Config.MAX_LOG_SIZE,
-        backupCount=Config.LOG_BACKUP_COUNT,
-        encoding="utf-8",
-    )
-    detailed_handler.setFormatter(formatter)
-    detailed_handler.setLevel(logging.DEBUG)
+def stop_logging():
+    """Дописывает записи из очередей и останавливает фоновые потоки логирования"""
+    while _listeners:
+        logger, queue_handler, listener = _listeners.pop()
+        logger.removeHandler(queue_handler)
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
 
-    detailed_logger = logging.getLogger("detailed_log")
-    detailed_logger.setLevel(logging.DEBUG)
-    detailed_logger.addHandler(detailed_handler)
 
-    # Настройка логгера для системных сообщений (для разработчика)
-    system_handler = RotatingFileHandler(
-        Config.SYSTEM_LOG_FILE,
-        maxBytes=Config.MAX_LOG_SIZE,
-        backupCount=Config.LOG_BACKUP_COUNT,
-        encoding="utf-8",
-    )
-    system_handler.setFormatter(formatter)
-    system_handler.setLevel(logging.INFO)
+def setup_logging(app):
+    """
+    Настройка системы логирования
 
-    system_logger = logging.getLogger("neuro_assistant")
-    system_logger.setLevel(logging.INFO)
-    system_logger.addHandler(system_handler)
+    Логгеры только ставят записи в очереди; форматирование, маскирование
+    конфиденциальных данных и запись в файлы выполняют фоновые потоки,
+    поэтому время обработки запроса не зависит от скорости диска.
+    """
+    # Создаем директорию для логов, если она не существует
+    os.makedirs(Config.LOGS_DIR, exist_ok=True)
 
-    # Добавляем обработчик для вывода в консоль в режиме отладки
+    # Повторная настройка заменяет прежние очереди
+    stop_logging()
+
+    # Форматтер для логов
+    formatter = RedactingFormatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    # Обработчик для вывода в консоль в режиме отладки
+    console_handlers = []
     if app.debug:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
         console_handler.setLevel(logging.DEBUG)
+        console_handlers.append(console_handler)
 
-        system_logger.addHandler(console_handler)
-        detailed_logger.addHandler(console_handler)
+    # Настройка логгера для истории команд (для пользователя)
+    history_logger = logging.getLogger("command_history")
+    _attach_queue(
+        history_logger,
+        logging.INFO,
+        [_file_handler(Config.SUMMARY_LOG_FILE, logging.INFO, formatter)],
+    )
+
+    # Настройка логгера для детальных логов (для разработчика)
+    detailed_logger = logging.getLogger("detailed_log")
+    _attach_queue(
+        detailed_logger,
+        logging.DEBUG,
+        [_file_handler(Config.DETAILED_LOG_FILE, logging.DEBUG, formatter), *console_handlers],
+    )
+
+    # Настройка логгера для системных сообщений (для разработчика)
+    system_logger = logging.getLogger("neuro_assistant")
+    _attach_queue(
+        system_logger,
+        logging.INFO,
+        [_file_handler(Config.SYSTEM_LOG_FILE, logging.INFO, formatter), *console_handlers],
+    )
 
     app.logger.info("Логирование настроено")
     return history_logger, detailed_logger, system_logger
 
 
+# Записи, оставшиеся в очередях, дописываются при завершении процесса
+atexit.register(stop_logging)
+
+
 def ensure_log_files_exist():
     """Проверяет существование файлов журнала и создает их при необходимости"""
     os.makedirs(Config.LOGS_DIR, exist_ok=True)
@@ -91,35 +254,22 @@ def filter_sensitive_data(text):
     """
     Фильтрует конфиденциальные данные из текста
 
+    Все шаблоны объединены в одно выражение, поэтому текст просматривается
+    один раз.
+
     Args:
         text: Исходный текст
 
     Returns:
         Текст с замаскированными конфиденциальными данными
     """
-    import re
-
-    # Список паттернов для фильтрации
-    patterns = [
-        # API ключи (общий паттерн)
-        (
-            r'(api[_-]?key|apikey|api[_-]?token|access[_-]?token)[=:"\'\s]+([a-zA-Z0-9]{16,})',
-            r"\1=***FILTERED***",
-        ),
-        # Пароли
-        (r'(password|passwd|pwd)[=:"\'\s]+([^\s,;]{3,})', r"\1=***FILTERED***"),
-        # Токены авторизации
-        (r'(Authorization|Bearer)[=:"\'\s]+([^\s,;]{3,})', r"\1 ***FILTERED***"),
-        # Учетные данные в URL
-        (r"(https?://)([^:@\s]+):([^@\s]+)@", r"\1***FILTERED***:***FILTERED***@"),
-    ]
-
-    # Применяем каждый паттерн
-    filtered_text = text
-    for pattern, replacement in patterns:
-        filtered_text = re.sub(pattern, replacement, filtered_text, flags=re.IGNORECASE)
-
-    return filtered_text
+    return _SENSITIVE_PATTERN.sub(_mask_sensitive, text)
+
+
+def _mask_sensitive(match):
+    """Заменяет найденные конфиденциальные данные"""
+    name = match.lastgroup
+    return _SENSITIVE_REPLACEMENTS[name].format(match.group(name))
 
 
 def log_execution_summary(execution, final=False):
@@ -132,13 +282,14 @@ def log_execution_summary(execution, final=False):
     """
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    # Фильтруем конфиденциальные данные
-    filtered_command = filter_sensitive_data(execution.command_text)
+    # Конфиденциальные данные в записях логов маскирует RedactingFormatter
+    # в фоновом потоке записи
+    command = execution.command_text
 
     # Логируем в историю команд (для пользователя)
     history_entry = (
         f"{timestamp} - Выполнение команды\n"
-        f"Команда: {filtered_command}\n"
+        f"Команда: {command}\n"
         f"Статус: {execution.overall_status}\n"
         f"Выполнение: {execution.completion_percentage:.1f}%\n"
         f"Точность: {execution.accuracy_percentage:.1f}%\n"
@@ -149,7 +300,7 @@ def log_execution_summary(execution, final=False):
     # Логируем детальную информацию (для разработчика)
     detailed_entry = (
         f"{timestamp} - Детальное выполнение команды\n"
-        f"Команда: {filtered_command}\n"
+        f"Команда: {command}\n"
         f"Время начала: {execution.start_time}\n"
         f"Время окончания: {execution.end_time}\n"
         f"Статус: {execution.overall_status}\n"
@@ -161,27 +312,50 @@ def log_execution_summary(execution, final=False):
     if execution.steps:
         detailed_entry += "Шаги выполнения:\n"
         for step in execution.steps:
-            # Фильтруем конфиденциальные данные в описании и результатах
-            filtered_description = filter_sensitive_data(step.description)
-            filtered_result = filter_sensitive_data(step.result) if step.result else None
-            filtered_error = filter_sensitive_data(step.error) if step.error else None
-
             detailed_entry += (
-                f"  Шаг {step.step_number}: {filtered_description}\n  Статус: {step.status}\n"
+                f"  Шаг {step.step_number}: {step.description}\n  Статус: {step.status}\n"
             )
-            if filtered_result:
-                detailed_entry += f"  Результат: {filtered_result}\n"
-            if filtered_error:
-                detailed_entry += f"  Ошибка: {filtered_error}\n"
+            if step.result:
+                detailed_entry += f"  Результат: {step.result}\n"
+            if step.error:
+                detailed_entry += f"  Ошибка: {step.error}\n"
+            if getattr(step, "duration", None) is not None:
+                detailed_entry += f"  Время: {step.duration:.2f} с\n"
             detailed_entry += "  ---\n"
 
     detailed_entry += f"{'-' * 50}"
     detailed_logger.debug(detailed_entry)
 
+    # Итоговую запись сохраняем в хранилище истории для быстрых запросов
+    # (в базу запись попадает минуя форматтер, поэтому маскируем здесь)
+    if final:
+        from utils.history_store import get_history_store
+
+        try:
+            get_history_store().append(
+                timestamp=timestamp,
+                command=filter_sensitive_data(command),
+                status=execution.overall_status,
+                completion=execution.completion_percentage,
+                accuracy=execution.accuracy_percentage,
+                start_time=execution.start_time,
+                end_time=execution.end_time,
+                steps=[
+                    {
+                        "number": step.step_number,
+                        "description": filter_sensitive_data(step.description),
+                        "status": step.status,
+                        "duration": getattr(step, "duration", None),
+                    }
+                    for step in execution.steps
+                ],
+                details=filter_sensitive_data(detailed_entry),
+            )
+        except Exception as e:
+            system_logger.warning(f"Не удалось сохранить запись в историю команд: {e}")
+
     # Логируем системную информацию
-    system_logger.info(
-        f"Команда '{filtered_command}' выполнена со статусом '{execution.overall_status}'"
-    )
+    system_logger.info(f"Команда '{command}' выполнена со статусом '{execution.overall_status}'")
 
 
 def init_logging_system():